@@ -66,6 +66,10 @@ URLS = {
     }
 }
 
+# Processos usados pelo import_operadoras.py para carregar os trimestres em
+# paralelo (cada um com sua conexão); 1 carrega um arquivo por vez
+ETL_WORKERS = int(os.getenv('ETL_WORKERS', min(4, os.cpu_count() or 1)))
+
 # URL de conexão com o banco de dados
 DB_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}"
 
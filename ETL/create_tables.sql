@@ -21,7 +21,11 @@ CREATE TABLE IF NOT EXISTS public.operadoras_ativas (
     cargo_representante VARCHAR(100),
     data_registro_ans DATE,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    -- Cidade sem acento e em minúsculas, usada na busca por trigramas da API
+    cidade_norm TEXT GENERATED ALWAYS AS (
+        translate(lower(cidade), 'áàâãäéèêëíìîïóòôõöúùûüýÿçñ', 'aaaaaeeeeiiiiooooouuuuyycn')
+    ) STORED
 );
 
 -- Criar tabela de demonstrações contábeis
@@ -60,5 +64,7 @@ CREATE TRIGGER update_demonstracoes_updated_at
 -- Criar índices para melhorar a performance
 CREATE INDEX IF NOT EXISTS idx_registro_ans_op ON public.operadoras_ativas(registro_ans);
 CREATE INDEX IF NOT EXISTS idx_cnpj_op ON public.operadoras_ativas(cnpj);
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE INDEX IF NOT EXISTS idx_operadoras_ativas_cidade_trgm ON public.operadoras_ativas USING gin (cidade_norm gin_trgm_ops);
 CREATE INDEX IF NOT EXISTS idx_registro_ans_dem ON public.demonstracoes_contabeis(registro_ans);
 CREATE INDEX IF NOT EXISTS idx_data_base_dem ON public.demonstracoes_contabeis(data_base); 
\ No newline at end of file
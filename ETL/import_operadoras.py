@@ -2,16 +2,22 @@
 Script para importação dos dados de operadoras e demonstrações contábeis para o PostgreSQL
 """
 import os
+import re
+import time
+import argparse
+import hashlib
 import logging
 import pandas as pd
-from datetime import datetime
-from sqlalchemy import create_engine, text
+from datetime import date
 import zipfile
 import io
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from config import (
-    DIRETORIOS, ARQUIVOS, LOGGING, DB_NAME, DB_USER, 
-    DB_PASSWORD, DB_HOST, DB_PORT, ANO_ANTERIOR, ANO_ANTERIOR_2
+    DIRETORIOS, ARQUIVOS, DB_NAME, DB_USER,
+    DB_PASSWORD, DB_HOST, DB_PORT, ANO_ANTERIOR, ANO_ANTERIOR_2, ETL_WORKERS
 )
+from leitura_zip import ler_csv_do_zip_em_chunks
+from versao_dados import CRIAR_TABELA_VERSAO, registrar_carga
 import psycopg2
 from psycopg2 import sql
 
@@ -33,6 +39,16 @@ LINHAS_TESTE = 10000  # Número de linhas a processar no modo de teste
 # Criar diretório de logs se não existir
 os.makedirs('logs', exist_ok=True)
 
+def conectar():
+    """Nova conexão com o banco (cada processo de carga abre a sua)"""
+    return psycopg2.connect(
+        dbname=DB_NAME,
+        user=DB_USER,
+        password=DB_PASSWORD,
+        host=DB_HOST,
+        port=DB_PORT
+    )
+
 def criar_diretorios():
     """Cria os diretórios necessários se não existirem."""
     try:
@@ -50,7 +66,11 @@ def criar_tabelas(conn):
     try:
         with conn.cursor() as cursor:
             # Criar tabela de operadoras
+            # As colunas *_norm (sem acento, minúsculas) são geradas pelo banco e
+            # indexadas com trigramas para as buscas textuais da API
             cursor.execute("""
+                CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
                 CREATE TABLE IF NOT EXISTS operadoras (
                     registro_ans VARCHAR(20) PRIMARY KEY,
                     cnpj VARCHAR(20),
@@ -63,33 +83,106 @@ def criar_tabelas(conn):
                     bairro VARCHAR(100),
                     cidade VARCHAR(100),
                     uf CHAR(2),
-                    cep VARCHAR(10)
+                    cep VARCHAR(10),
+                    razao_social_norm TEXT GENERATED ALWAYS AS (
+                        translate(lower(razao_social), 'áàâãäéèêëíìîïóòôõöúùûüýÿçñ', 'aaaaaeeeeiiiiooooouuuuyycn')
+                    ) STORED,
+                    nome_fantasia_norm TEXT GENERATED ALWAYS AS (
+                        translate(lower(nome_fantasia), 'áàâãäéèêëíìîïóòôõöúùûüýÿçñ', 'aaaaaeeeeiiiiooooouuuuyycn')
+                    ) STORED,
+                    cidade_norm TEXT GENERATED ALWAYS AS (
+                        translate(lower(cidade), 'áàâãäéèêëíìîïóòôõöúùûüýÿçñ', 'aaaaaeeeeiiiiooooouuuuyycn')
+                    ) STORED
                 );
                 
                 CREATE INDEX IF NOT EXISTS idx_operadoras_cnpj ON operadoras(cnpj);
                 CREATE INDEX IF NOT EXISTS idx_operadoras_razao_social ON operadoras(razao_social);
+                CREATE INDEX IF NOT EXISTS idx_operadoras_uf ON operadoras(uf);
+                CREATE INDEX IF NOT EXISTS idx_operadoras_razao_social_trgm
+                    ON operadoras USING gin (razao_social_norm gin_trgm_ops);
+                CREATE INDEX IF NOT EXISTS idx_operadoras_nome_fantasia_trgm
+                    ON operadoras USING gin (nome_fantasia_norm gin_trgm_ops);
+                CREATE INDEX IF NOT EXISTS idx_operadoras_cidade_trgm
+                    ON operadoras USING gin (cidade_norm gin_trgm_ops);
             """)
 
-            # Criar tabela de demonstrações contábeis
+            # Criar tabela de demonstrações contábeis, particionada por trimestre.
+            # Cada trimestre é carregado em uma tabela própria e anexado como
+            # partição ao final (ver preparar_particao / anexar_particao); a
+            # partição default só recebe linhas de trimestres ainda não carregados.
+            # A chave primária (data_demonstracao, id) atende também a paginação
+            # por chave da API.
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS demonstracoes_contabeis (
-                    id SERIAL PRIMARY KEY,
-                    data_demonstracao DATE,
+                    id BIGSERIAL,
+                    data_demonstracao DATE NOT NULL,
                     registro_ans VARCHAR(20),
                     conta VARCHAR(20),
                     descricao TEXT,
                     saldo_inicial NUMERIC(15,2),
                     saldo_final NUMERIC(15,2),
+                    CONSTRAINT pk_demonstracoes
+                        PRIMARY KEY (data_demonstracao, id),
                     CONSTRAINT uk_demonstracao
                         UNIQUE (data_demonstracao, registro_ans, conta)
-                );
+                ) PARTITION BY RANGE (data_demonstracao);
+
+                CREATE TABLE IF NOT EXISTS demonstracoes_contabeis_default
+                    PARTITION OF demonstracoes_contabeis DEFAULT;
                 
-                CREATE INDEX IF NOT EXISTS idx_demonstracoes_data 
-                    ON demonstracoes_contabeis(data_demonstracao);
                 CREATE INDEX IF NOT EXISTS idx_demonstracoes_registro_ans 
                     ON demonstracoes_contabeis(registro_ans);
                 CREATE INDEX IF NOT EXISTS idx_demonstracoes_conta 
                     ON demonstracoes_contabeis(conta);
+                CREATE INDEX IF NOT EXISTS idx_demonstracoes_saldo_negativo
+                    ON demonstracoes_contabeis(data_demonstracao DESC, id DESC)
+                    WHERE saldo_final < 0;
+            """)
+
+            # Resumo por operadora x conta x trimestre, atualizado a cada
+            # trimestre carregado (ver atualizar_resumo_trimestre). As séries
+            # temporais da API leem daqui em vez de varrer as demonstrações.
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS resumo_demonstracoes_trimestre (
+                    registro_ans VARCHAR(20) NOT NULL,
+                    conta VARCHAR(20) NOT NULL,
+                    ano SMALLINT NOT NULL,
+                    trimestre SMALLINT NOT NULL,
+                    descricao TEXT,
+                    evento_medico_hospitalar BOOLEAN NOT NULL,
+                    saldo_inicial NUMERIC(17,2),
+                    saldo_final NUMERIC(17,2),
+                    valor_despesa NUMERIC(17,2),
+                    lancamentos INTEGER NOT NULL,
+                    CONSTRAINT pk_resumo_demonstracoes_trimestre
+                        PRIMARY KEY (registro_ans, conta, ano, trimestre)
+                );
+
+                -- Resumos criados antes de valor_despesa (preenchida por completar_resumo)
+                ALTER TABLE resumo_demonstracoes_trimestre
+                    ADD COLUMN IF NOT EXISTS valor_despesa NUMERIC(17,2);
+
+                CREATE INDEX IF NOT EXISTS idx_resumo_trimestre_conta
+                    ON resumo_demonstracoes_trimestre(conta, ano, trimestre);
+                CREATE INDEX IF NOT EXISTS idx_resumo_trimestre_eventos
+                    ON resumo_demonstracoes_trimestre(ano, trimestre)
+                    WHERE evento_medico_hospitalar;
+            """)
+            
+            # Registro das cargas concluídas (a API usa a maior versão para
+            # recarregar seu catálogo em memória)
+            cursor.execute(CRIAR_TABELA_VERSAO)
+
+            # Manifesto dos arquivos de origem carregados: uma nova execução só
+            # recarrega os arquivos novos ou alterados (ver selecionar_arquivos)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS etl_arquivos_carregados (
+                    arquivo VARCHAR(255) PRIMARY KEY,
+                    tamanho BIGINT NOT NULL,
+                    checksum CHAR(64) NOT NULL,
+                    linhas BIGINT NOT NULL,
+                    carregado_em TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+                );
             """)
             
             conn.commit()
@@ -105,7 +198,9 @@ def limpar_tabelas(conn):
         with conn.cursor() as cursor:
             cursor.execute("""
                 DROP TABLE IF EXISTS demonstracoes_contabeis CASCADE;
+                DROP TABLE IF EXISTS resumo_demonstracoes_trimestre CASCADE;
                 DROP TABLE IF EXISTS operadoras CASCADE;
+                DROP TABLE IF EXISTS etl_arquivos_carregados;
             """)
             conn.commit()
             logging.info("Tabelas removidas com sucesso")
@@ -114,6 +209,368 @@ def limpar_tabelas(conn):
         logging.error(f"Erro ao remover tabelas: {str(e)}")
         raise
 
+def demonstracoes_particionada(conn):
+    """
+    Se demonstracoes_contabeis é particionada: None se a tabela ainda não
+    existe, False se foi criada (sem partições) por uma versão anterior do ETL.
+    """
+    with conn.cursor() as cursor:
+        cursor.execute("""
+            SELECT p.partrelid IS NOT NULL
+            FROM (SELECT to_regclass('public.demonstracoes_contabeis') as oid) t
+            LEFT JOIN pg_partitioned_table p ON p.partrelid = t.oid
+            WHERE t.oid IS NOT NULL
+        """)
+        linha = cursor.fetchone()
+    conn.commit()
+    return None if linha is None else linha[0]
+
+def nome_particao(ano, trimestre):
+    """Nome da partição de um trimestre: demonstracoes_contabeis_2024t1"""
+    return f"demonstracoes_contabeis_{ano}t{trimestre}"
+
+def limites_trimestre(ano, trimestre):
+    """Intervalo [inicio, fim) de datas do trimestre"""
+    inicio = date(ano, 3 * (trimestre - 1) + 1, 1)
+    fim = date(ano + 1, 1, 1) if trimestre == 4 else date(ano, 3 * trimestre + 1, 1)
+    return inicio, fim
+
+def trimestre_do_arquivo(caminho):
+    """Extrai (ano, trimestre) do nome do arquivo no formato {trimestre}T{ano}.zip"""
+    correspondencia = re.search(r'([1-4])T(\d{4})', os.path.basename(caminho))
+    if not correspondencia:
+        raise ValueError(f"Nome de arquivo fora do padrão {{trimestre}}T{{ano}}.zip: {caminho}")
+    return int(correspondencia.group(2)), int(correspondencia.group(1))
+
+def preparar_particao(conn, ano, trimestre, arquivo=None):
+    """
+    Cria, fora da tabela particionada, a tabela que vai receber o trimestre.
+    Uma partição já existente do mesmo trimestre é descartada (recarga) e,
+    na mesma transação, saem as linhas do trimestre no resumo trimestral
+    (refeitas só depois do ATTACH, em atualizar_resumo_trimestre) e o
+    `arquivo` sai do manifesto: se a carga falhar, a API não serve o resumo
+    de dados que não existem mais e a próxima execução trata o arquivo como
+    novo em vez de ignorá-lo.
+    Só a restrição única é criada antes da carga (usada pelo ON CONFLICT);
+    os demais índices são construídos de uma vez ao anexar a partição.
+    """
+    tabela = nome_particao(ano, trimestre)
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(sql.SQL("""
+                DROP TABLE IF EXISTS {tabela};
+                CREATE TABLE {tabela} (LIKE demonstracoes_contabeis INCLUDING DEFAULTS);
+                ALTER TABLE {tabela} ADD CONSTRAINT {unica}
+                    UNIQUE (data_demonstracao, registro_ans, conta);
+            """).format(
+                tabela=sql.Identifier(tabela),
+                unica=sql.Identifier(f"uk_{tabela}")
+            ))
+            cursor.execute("""
+                DELETE FROM resumo_demonstracoes_trimestre
+                WHERE ano = %s AND trimestre = %s
+            """, (ano, trimestre))
+            if arquivo is not None:
+                cursor.execute("DELETE FROM etl_arquivos_carregados WHERE arquivo = %s", (arquivo,))
+            conn.commit()
+            logging.info(f"Tabela {tabela} preparada para carga")
+            return tabela
+    except Exception as e:
+        conn.rollback()
+        logging.error(f"Erro ao preparar partição {tabela}: {str(e)}")
+        raise
+
+def anexar_particao(conn, tabela, ano, trimestre):
+    """
+    Anexa a tabela carregada como partição do trimestre. Linhas de outros
+    trimestres são movidas para a tabela particionada e linhas deste trimestre
+    que estavam na partição default são trazidas para a nova partição.
+    Com cargas em paralelo, um advisory lock serializa esta etapa: todas mexem
+    na partição default e no ATTACH, e concorrendo entrariam em deadlock.
+    """
+    inicio, fim = limites_trimestre(ano, trimestre)
+    colunas = sql.SQL("id, data_demonstracao, registro_ans, conta, descricao, saldo_inicial, saldo_final")
+    atualizar = sql.SQL("""
+        ON CONFLICT (data_demonstracao, registro_ans, conta) DO UPDATE SET
+            descricao = EXCLUDED.descricao,
+            saldo_inicial = EXCLUDED.saldo_inicial,
+            saldo_final = EXCLUDED.saldo_final
+    """)
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_xact_lock(hashtext('demonstracoes_contabeis'))")
+            cursor.execute(sql.SQL("""
+                WITH fora AS (
+                    DELETE FROM {tabela}
+                    WHERE NOT (data_demonstracao >= %(inicio)s AND data_demonstracao < %(fim)s)
+                    RETURNING {colunas}
+                )
+                INSERT INTO demonstracoes_contabeis ({colunas})
+                SELECT {colunas} FROM fora
+                {atualizar}
+            """).format(tabela=sql.Identifier(tabela), colunas=colunas, atualizar=atualizar),
+                {'inicio': inicio, 'fim': fim})
+            if cursor.rowcount:
+                logging.warning(f"{cursor.rowcount} linhas de {tabela} fora do trimestre movidas")
+
+            cursor.execute(sql.SQL("""
+                WITH movidas AS (
+                    DELETE FROM demonstracoes_contabeis_default
+                    WHERE data_demonstracao >= %(inicio)s AND data_demonstracao < %(fim)s
+                    RETURNING {colunas}
+                )
+                INSERT INTO {tabela} ({colunas})
+                SELECT {colunas} FROM movidas
+                {atualizar}
+            """).format(tabela=sql.Identifier(tabela), colunas=colunas, atualizar=atualizar),
+                {'inicio': inicio, 'fim': fim})
+
+            # O CHECK equivalente ao intervalo evita que o ATTACH percorra a tabela
+            checagem = sql.Identifier(f"ck_{tabela}")
+            cursor.execute(sql.SQL("""
+                ALTER TABLE {tabela} ADD CONSTRAINT {checagem}
+                    CHECK (data_demonstracao >= {inicio} AND data_demonstracao < {fim});
+                ALTER TABLE demonstracoes_contabeis
+                    ATTACH PARTITION {tabela} FOR VALUES FROM ({inicio}) TO ({fim});
+                ALTER TABLE {tabela} DROP CONSTRAINT {checagem};
+            """).format(
+                tabela=sql.Identifier(tabela),
+                checagem=checagem,
+                inicio=sql.Literal(inicio),
+                fim=sql.Literal(fim)
+            ))
+            conn.commit()
+
+            cursor.execute(sql.SQL("ANALYZE {}").format(sql.Identifier(tabela)))
+            conn.commit()
+            logging.info(f"Partição {tabela} anexada ({inicio} a {fim})")
+    except Exception as e:
+        conn.rollback()
+        logging.error(f"Erro ao anexar partição {tabela}: {str(e)}")
+        raise
+
+def atualizar_resumo_trimestre(conn, ano, trimestre):
+    """
+    Recalcula o trimestre em resumo_demonstracoes_trimestre a partir das
+    demonstrações (o filtro por data lê apenas a partição do trimestre).
+    As contas de eventos/sinistros médico-hospitalares são marcadas com o
+    mesmo critério das views de ranking, e valor_despesa soma os saldos em
+    valor absoluto, como o valor_despesa dos rankings.
+    """
+    inicio, fim = limites_trimestre(ano, trimestre)
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("""
+                DELETE FROM resumo_demonstracoes_trimestre
+                WHERE ano = %(ano)s AND trimestre = %(trimestre)s;
+
+                INSERT INTO resumo_demonstracoes_trimestre (
+                    registro_ans, conta, ano, trimestre, descricao,
+                    evento_medico_hospitalar, saldo_inicial, saldo_final, valor_despesa, lancamentos
+                )
+                SELECT
+                    registro_ans,
+                    conta,
+                    %(ano)s,
+                    %(trimestre)s,
+                    MIN(descricao),
+                    COALESCE(BOOL_OR(descricao ILIKE %(eventos)s), FALSE),
+                    SUM(saldo_inicial),
+                    SUM(saldo_final),
+                    SUM(ABS(saldo_final)),
+                    COUNT(*)
+                FROM demonstracoes_contabeis
+                WHERE data_demonstracao >= %(inicio)s AND data_demonstracao < %(fim)s
+                  AND registro_ans IS NOT NULL AND conta IS NOT NULL
+                GROUP BY registro_ans, conta;
+            """, {
+                'ano': ano, 'trimestre': trimestre, 'inicio': inicio, 'fim': fim,
+                'eventos': '%EVENTOS%SINISTROS%CONHECIDOS%AVISADOS%MEDICO%HOSPITALAR%'
+            })
+            linhas = cursor.rowcount
+            conn.commit()
+            logging.info(f"Resumo do {trimestre}º trimestre de {ano} atualizado ({linhas} linhas)")
+    except Exception as e:
+        conn.rollback()
+        logging.error(f"Erro ao atualizar resumo trimestral: {str(e)}")
+        raise
+
+def completar_resumo(conn):
+    """
+    Recalcula os trimestres do resumo gravados sem valor_despesa (por versões
+    anteriores do ETL). Retorna quantos trimestres foram recalculados.
+    """
+    with conn.cursor() as cursor:
+        cursor.execute("""
+            SELECT DISTINCT ano, trimestre FROM resumo_demonstracoes_trimestre
+            WHERE valor_despesa IS NULL AND saldo_final IS NOT NULL
+            ORDER BY ano, trimestre
+        """)
+        trimestres = cursor.fetchall()
+    conn.commit()
+    for ano, trimestre in trimestres:
+        atualizar_resumo_trimestre(conn, ano, trimestre)
+    return len(trimestres)
+
+def criar_rankings(conn):
+    """
+    Cria as views materializadas com o ranking de despesas em eventos/sinistros
+    médico-hospitalares por trimestre e por ano (todas as operadoras).
+    """
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("""
+                CREATE MATERIALIZED VIEW IF NOT EXISTS ranking_despesas_trimestre AS
+                WITH despesas AS (
+                    SELECT 
+                        EXTRACT(YEAR FROM d.data_demonstracao)::int as ano,
+                        EXTRACT(QUARTER FROM d.data_demonstracao)::int as trimestre,
+                        d.registro_ans,
+                        SUM(ABS(d.saldo_final)) as valor_despesa,
+                        COUNT(*) as quantidade_eventos
+                    FROM demonstracoes_contabeis d
+                    WHERE d.descricao ILIKE '%EVENTOS%SINISTROS%CONHECIDOS%AVISADOS%MEDICO%HOSPITALAR%'
+                    GROUP BY 1, 2, d.registro_ans
+                )
+                SELECT 
+                    de.ano,
+                    de.trimestre,
+                    de.registro_ans,
+                    CASE 
+                        WHEN o.nome_fantasia = 'nan' OR o.nome_fantasia IS NULL OR o.nome_fantasia = '' 
+                        THEN COALESCE(NULLIF(o.razao_social, ''), 'Operadora ' || de.registro_ans)
+                        ELSE o.nome_fantasia
+                    END as nome_operadora,
+                    de.valor_despesa,
+                    de.quantidade_eventos,
+                    ROW_NUMBER() OVER (
+                        PARTITION BY de.ano, de.trimestre ORDER BY de.valor_despesa DESC
+                    ) as ranking
+                FROM despesas de
+                JOIN operadoras o ON de.registro_ans = o.registro_ans;
+
+                CREATE UNIQUE INDEX IF NOT EXISTS uk_ranking_despesas_trimestre
+                    ON ranking_despesas_trimestre(ano, trimestre, registro_ans);
+                CREATE INDEX IF NOT EXISTS idx_ranking_despesas_trimestre_ranking
+                    ON ranking_despesas_trimestre(ano, trimestre, ranking);
+
+                CREATE MATERIALIZED VIEW IF NOT EXISTS ranking_despesas_ano AS
+                WITH despesas AS (
+                    SELECT 
+                        EXTRACT(YEAR FROM d.data_demonstracao)::int as ano,
+                        d.registro_ans,
+                        SUM(ABS(d.saldo_final)) as valor_despesa,
+                        COUNT(*) as quantidade_eventos
+                    FROM demonstracoes_contabeis d
+                    WHERE d.descricao ILIKE '%EVENTOS%SINISTROS%CONHECIDOS%AVISADOS%MEDICO%HOSPITALAR%'
+                    GROUP BY 1, d.registro_ans
+                )
+                SELECT 
+                    de.ano,
+                    de.registro_ans,
+                    CASE 
+                        WHEN o.nome_fantasia = 'nan' OR o.nome_fantasia IS NULL OR o.nome_fantasia = '' 
+                        THEN COALESCE(NULLIF(o.razao_social, ''), 'Operadora ' || de.registro_ans)
+                        ELSE o.nome_fantasia
+                    END as nome_operadora,
+                    de.valor_despesa,
+                    de.quantidade_eventos,
+                    ROUND(de.valor_despesa / NULLIF(de.quantidade_eventos, 0), 2) as media_por_evento,
+                    ROW_NUMBER() OVER (
+                        PARTITION BY de.ano ORDER BY de.valor_despesa DESC
+                    ) as ranking
+                FROM despesas de
+                JOIN operadoras o ON de.registro_ans = o.registro_ans;
+
+                CREATE UNIQUE INDEX IF NOT EXISTS uk_ranking_despesas_ano
+                    ON ranking_despesas_ano(ano, registro_ans);
+                CREATE INDEX IF NOT EXISTS idx_ranking_despesas_ano_ranking
+                    ON ranking_despesas_ano(ano, ranking);
+            """)
+            conn.commit()
+            logging.info("Views de ranking de despesas criadas com sucesso")
+    except Exception as e:
+        conn.rollback()
+        logging.error(f"Erro ao criar views de ranking: {str(e)}")
+        raise
+
+def atualizar_rankings(conn):
+    """
+    Recalcula as views de ranking sem bloquear as leituras da API
+    (REFRESH ... CONCURRENTLY usa os índices únicos das views).
+    """
+    try:
+        with conn.cursor() as cursor:
+            for view in ('ranking_despesas_trimestre', 'ranking_despesas_ano'):
+                cursor.execute(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {view}")
+                conn.commit()
+                logging.info(f"View {view} atualizada")
+    except Exception as e:
+        conn.rollback()
+        logging.error(f"Erro ao atualizar views de ranking: {str(e)}")
+        raise
+
+def assinatura_arquivo(caminho):
+    """Nome, tamanho e SHA-256 do arquivo de origem, no formato do manifesto"""
+    checksum = hashlib.sha256()
+    with open(caminho, 'rb') as arquivo:
+        for bloco in iter(lambda: arquivo.read(1024 * 1024), b''):
+            checksum.update(bloco)
+    return {
+        'arquivo': os.path.basename(caminho),
+        'tamanho': os.path.getsize(caminho),
+        'checksum': checksum.hexdigest()
+    }
+
+def selecionar_arquivos(conn, arquivos, reprocessar=()):
+    """
+    Filtra os arquivos que precisam ser carregados: os que não estão no
+    manifesto, os que mudaram (tamanho ou checksum) desde a última carga e
+    os pedidos em `reprocessar` (nome com ou sem extensão, ex.: 1T2024).
+    """
+    reprocessar = {nome.lower() for nome in reprocessar}
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT arquivo, tamanho, checksum FROM etl_arquivos_carregados")
+        manifesto = {arquivo: (tamanho, checksum) for arquivo, tamanho, checksum in cursor.fetchall()}
+    conn.commit()
+
+    pendentes = []
+    for caminho in arquivos:
+        nome = os.path.basename(caminho)
+        registrado = manifesto.get(nome)
+        if nome.lower() in reprocessar or os.path.splitext(nome)[0].lower() in reprocessar:
+            logging.info(f"{nome}: recarga solicitada")
+        elif registrado is None:
+            logging.info(f"{nome}: arquivo novo")
+        elif registrado[0] != os.path.getsize(caminho):
+            logging.info(f"{nome}: tamanho alterado desde a última carga")
+        elif registrado[1] != assinatura_arquivo(caminho)['checksum']:
+            logging.info(f"{nome}: conteúdo alterado desde a última carga")
+        else:
+            logging.info(f"{nome}: sem alterações, ignorado")
+            continue
+        pendentes.append(caminho)
+    return pendentes
+
+def registrar_arquivo(conn, assinatura, linhas):
+    """Grava (ou atualiza) no manifesto a carga concluída de um arquivo"""
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("""
+                INSERT INTO etl_arquivos_carregados (arquivo, tamanho, checksum, linhas)
+                VALUES (%(arquivo)s, %(tamanho)s, %(checksum)s, %(linhas)s)
+                ON CONFLICT (arquivo) DO UPDATE SET
+                    tamanho = EXCLUDED.tamanho,
+                    checksum = EXCLUDED.checksum,
+                    linhas = EXCLUDED.linhas,
+                    carregado_em = CURRENT_TIMESTAMP
+            """, {**assinatura, 'linhas': linhas})
+            conn.commit()
+    except Exception as e:
+        conn.rollback()
+        logging.error(f"Erro ao registrar arquivo {assinatura['arquivo']}: {str(e)}")
+        raise
+
 def validar_arquivo_zip(arquivo_zip, ano, trimestre):
     """Valida se o arquivo ZIP contém os arquivos necessários."""
     try:
@@ -187,42 +644,90 @@ def extrair_operadoras_do_csv(arquivo_zip):
         logger.error(f"Erro ao extrair operadoras do CSV: {str(e)}")
         raise
 
+COLUNAS_OPERADORAS = {
+    'Registro_ANS': 'registro_ans',
+    'CNPJ': 'cnpj',
+    'Razao_Social': 'razao_social',
+    'Nome_Fantasia': 'nome_fantasia',
+    'Modalidade': 'modalidade',
+    'Logradouro': 'logradouro',
+    'Numero': 'numero',
+    'Complemento': 'complemento',
+    'Bairro': 'bairro',
+    'Cidade': 'cidade',
+    'UF': 'uf',
+    'CEP': 'cep',
+}
+
+def coluna_texto(serie):
+    """
+    Coluna como texto, mantendo os nulos. Colunas lidas como float só por
+    causa de valores vazios (CNPJ, CEP, registro ANS) voltam a inteiro antes,
+    para não virarem "12345678.0".
+    """
+    if pd.api.types.is_float_dtype(serie):
+        valores = serie.dropna()
+        if (valores == valores.round()).all():
+            serie = serie.astype('Int64')
+    return serie.astype('string').str.strip()
+
+def coluna_decimal(serie):
+    """Valores monetários do CSV da ANS (vírgula decimal) como float; vazios viram 0"""
+    if not pd.api.types.is_numeric_dtype(serie):
+        serie = pd.to_numeric(serie.astype('string').str.replace(',', '.', regex=False), errors='coerce')
+    return serie.fillna(0.0)
+
+def coluna_data(serie):
+    """Datas nos formatos usados pela ANS: AAAA-MM-DD ou DD/MM/AAAA"""
+    datas = pd.to_datetime(serie, format='%Y-%m-%d', errors='coerce')
+    faltantes = datas.isna() & serie.notna()
+    if faltantes.any():
+        datas[faltantes] = pd.to_datetime(serie[faltantes], format='%d/%m/%Y', errors='coerce')
+    return datas
+
+def copiar_dataframe(conn, df, tabela):
+    """
+    Envia o DataFrame (colunas com os nomes da tabela) por COPY FROM STDIN,
+    serializado de uma vez com to_csv; nulos vão como campo vazio (NULL).
+    Não faz commit.
+    """
+    buffer = io.StringIO()
+    df.to_csv(buffer, header=False, index=False, date_format='%Y-%m-%d')
+    buffer.seek(0)
+    with conn.cursor() as cursor:
+        cursor.copy_expert(sql.SQL("COPY {} ({}) FROM STDIN WITH (FORMAT csv)").format(
+            sql.Identifier(tabela),
+            sql.SQL(', ').join(map(sql.Identifier, df.columns))
+        ), buffer)
+    return len(df)
+
+def preparar_operadoras(df):
+    """Colunas do Relatorio_cadop.csv convertidas para as de operadoras, uma linha por registro ANS"""
+    preparado = pd.DataFrame({
+        destino: coluna_texto(df[origem]) for origem, destino in COLUNAS_OPERADORAS.items()
+    })
+    # Como no INSERT linha a linha, a última ocorrência de cada registro prevalece
+    return preparado.drop_duplicates('registro_ans', keep='last')
+
 def inserir_operadoras(conn, df):
-    """Insere os dados das operadoras no banco de dados."""
+    """
+    Insere (ou atualiza) os dados das operadoras no banco de dados e retorna
+    o número de operadoras carregadas. Registros que saíram do arquivo não são
+    apagados: a exclusão propagaria para operadoras_ativas (fk_operadora,
+    ON DELETE CASCADE em relacionar_tabelas.sql), que este script não recarrega.
+    """
     try:
+        operadoras = preparar_operadoras(df)
+        colunas = sql.SQL(', ').join(map(sql.Identifier, operadoras.columns))
         with conn.cursor() as cursor:
-            values = []
-            for _, row in df.iterrows():
-                values.append((
-                    str(row['Registro_ANS']),
-                    str(row['CNPJ']),
-                    str(row['Razao_Social']),
-                    str(row['Nome_Fantasia']),
-                    str(row['Modalidade']),
-                    str(row['Logradouro']),
-                    str(row['Numero']),
-                    str(row['Complemento']),
-                    str(row['Bairro']),
-                    str(row['Cidade']),
-                    str(row['UF']),
-                    str(row['CEP'])
-                ))
-
-            cursor.executemany("""
-                INSERT INTO operadoras (
-                    registro_ans,
-                    cnpj,
-                    razao_social,
-                    nome_fantasia,
-                    modalidade,
-                    logradouro,
-                    numero,
-                    complemento,
-                    bairro,
-                    cidade,
-                    uf,
-                    cep
-                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            cursor.execute("""
+                CREATE TEMP TABLE staging_operadoras
+                    (LIKE operadoras INCLUDING DEFAULTS) ON COMMIT DROP
+            """)
+            copiar_dataframe(conn, operadoras, 'staging_operadoras')
+            cursor.execute(sql.SQL("""
+                INSERT INTO operadoras ({colunas})
+                SELECT {colunas} FROM staging_operadoras
                 ON CONFLICT (registro_ans) DO UPDATE SET
                     cnpj = EXCLUDED.cnpj,
                     razao_social = EXCLUDED.razao_social,
@@ -235,10 +740,11 @@ def inserir_operadoras(conn, df):
                     cidade = EXCLUDED.cidade,
                     uf = EXCLUDED.uf,
                     cep = EXCLUDED.cep
-            """, values)
+            """).format(colunas=colunas))
             
             conn.commit()
-            logging.info(f"Inseridas {len(values)} operadoras com sucesso")
+            logging.info(f"Inseridas {len(operadoras)} operadoras com sucesso")
+            return len(operadoras)
     except Exception as e:
         conn.rollback()
         logging.error(f"Erro ao inserir operadoras: {str(e)}")
@@ -296,101 +802,195 @@ def extrair_demonstracoes_do_csv(arquivo_zip, ano, trimestre):
         logging.error(f"Erro ao extrair demonstrações do CSV: {str(e)}")
         raise
 
-def inserir_demonstracoes(conn, df_chunk):
+COLUNAS_DEMONSTRACOES = ('data_demonstracao', 'registro_ans', 'conta', 'descricao', 'saldo_inicial', 'saldo_final')
+
+def preparar_staging(conn, tabela):
+    """
+    Cria (vazia) a tabela de staging da carga de `tabela`: UNLOGGED, sem índices
+    nem restrições, só recebe o COPY. A coluna ordem guarda a ordem do arquivo
+    para que, em linhas repetidas, vença a última (como no INSERT linha a linha).
+    """
+    staging = f"staging_{tabela}"
     try:
         with conn.cursor() as cursor:
-            # Preparar os dados para inserção
-            values = []
-            for _, row in df_chunk.iterrows():
-                values.append((
-                    pd.to_datetime(row['DATA']).date(),
-                    str(row['REG_ANS']),
-                    str(row['CD_CONTA_CONTABIL']),
-                    str(row['DESCRICAO']),
-                    float(str(row['VL_SALDO_INICIAL']).replace(',', '.')) if pd.notna(row['VL_SALDO_INICIAL']) else 0.0,
-                    float(str(row['VL_SALDO_FINAL']).replace(',', '.')) if pd.notna(row['VL_SALDO_FINAL']) else 0.0
-                ))
-
-            # Inserir os dados em lote
-            cursor.executemany("""
-                INSERT INTO demonstracoes_contabeis (
-                    data_demonstracao,
-                    registro_ans,
-                    conta,
-                    descricao,
-                    saldo_inicial,
-                    saldo_final
-                ) VALUES (%s, %s, %s, %s, %s, %s)
+            cursor.execute(sql.SQL("""
+                DROP TABLE IF EXISTS {staging};
+                CREATE UNLOGGED TABLE {staging} (
+                    ordem BIGINT GENERATED ALWAYS AS IDENTITY,
+                    data_demonstracao DATE,
+                    registro_ans VARCHAR(20),
+                    conta VARCHAR(20),
+                    descricao TEXT,
+                    saldo_inicial NUMERIC(15,2),
+                    saldo_final NUMERIC(15,2)
+                );
+            """).format(staging=sql.Identifier(staging)))
+            conn.commit()
+            return staging
+    except Exception as e:
+        conn.rollback()
+        logging.error(f"Erro ao criar staging {staging}: {str(e)}")
+        raise
+
+def preparar_demonstracoes(df_chunk):
+    """Colunas brutas do CSV da ANS convertidas, coluna a coluna, nas de demonstracoes_contabeis"""
+    return pd.DataFrame({
+        'data_demonstracao': coluna_data(df_chunk['DATA']),
+        'registro_ans': coluna_texto(df_chunk['REG_ANS']),
+        'conta': coluna_texto(df_chunk['CD_CONTA_CONTABIL']),
+        'descricao': coluna_texto(df_chunk['DESCRICAO']),
+        'saldo_inicial': coluna_decimal(df_chunk['VL_SALDO_INICIAL']),
+        'saldo_final': coluna_decimal(df_chunk['VL_SALDO_FINAL']),
+    }, columns=COLUNAS_DEMONSTRACOES)
+
+def copiar_demonstracoes(conn, df_chunk, staging):
+    """Envia um chunk do CSV para a tabela de staging com COPY FROM STDIN (sem commit)"""
+    return copiar_dataframe(conn, preparar_demonstracoes(df_chunk), staging)
+
+def mesclar_demonstracoes(conn, staging, tabela='demonstracoes_contabeis'):
+    """
+    Move o conteúdo da staging para `tabela` com um único INSERT ... ON CONFLICT,
+    descarta a staging e faz o commit da carga. Retorna as linhas gravadas.
+    """
+    colunas = sql.SQL(', ').join(map(sql.Identifier, COLUNAS_DEMONSTRACOES))
+    try:
+        with conn.cursor() as cursor:
+            # DISTINCT ON: um mesmo INSERT não pode atualizar duas vezes a mesma linha
+            cursor.execute(sql.SQL("""
+                INSERT INTO {tabela} ({colunas})
+                SELECT DISTINCT ON (data_demonstracao, registro_ans, conta) {colunas}
+                FROM {staging}
+                ORDER BY data_demonstracao, registro_ans, conta, ordem DESC
                 ON CONFLICT (data_demonstracao, registro_ans, conta) DO UPDATE SET
                     descricao = EXCLUDED.descricao,
                     saldo_inicial = EXCLUDED.saldo_inicial,
                     saldo_final = EXCLUDED.saldo_final
-            """, values)
-            
+            """).format(tabela=sql.Identifier(tabela), staging=sql.Identifier(staging), colunas=colunas))
+            linhas = cursor.rowcount
+            cursor.execute(sql.SQL("DROP TABLE {}").format(sql.Identifier(staging)))
             conn.commit()
-            logging.info(f"Inseridos {len(values)} registros de demonstrações financeiras com sucesso.")
+            return linhas
     except Exception as e:
         conn.rollback()
-        logging.error(f"Erro ao inserir demonstrações financeiras: {str(e)}")
+        logging.error(f"Erro ao mesclar demonstrações financeiras: {str(e)}")
         raise
 
 def processar_arquivo_zip(conn, zip_path, test_mode=False):
     try:
-        # Extrair o arquivo ZIP para o diretório temporário
-        temp_dir = os.path.join(os.path.dirname(zip_path), 'temp')
-        os.makedirs(temp_dir, exist_ok=True)
-        
-        with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-            zip_ref.extractall(temp_dir)
-        
-        # Processar o arquivo CSV extraído
-        csv_file = os.path.join(temp_dir, os.path.basename(zip_path).replace('.zip', '.csv'))
-        if not os.path.exists(csv_file):
-            raise FileNotFoundError(f"Arquivo CSV não encontrado em {csv_file}")
-        
-        # Ler o arquivo CSV em chunks
+        # Carrega o trimestre em sua própria tabela e a anexa como partição no fim
+        ano, trimestre = trimestre_do_arquivo(zip_path)
+        assinatura = assinatura_arquivo(zip_path)
+        tabela = preparar_particao(conn, ano, trimestre, assinatura['arquivo'])
+        staging = preparar_staging(conn, tabela)
+
+        # Ler o CSV em chunks direto do ZIP (sem extrair), cada um enviado à staging por COPY
+        inicio = time.perf_counter()
+        lidas = 0
         chunk_size = LINHAS_TESTE if test_mode else 10000
-        for chunk in pd.read_csv(csv_file, sep=';', encoding='utf-8', chunksize=chunk_size):
-            inserir_demonstracoes(conn, chunk)
-            if test_mode:
-                logging.info("Modo de teste ativado - processando apenas o primeiro chunk")
-                break
+        try:
+            for chunk in ler_csv_do_zip_em_chunks(zip_path, chunk_size, sep=';', encoding='utf-8'):
+                lidas += copiar_demonstracoes(conn, chunk, staging)
+                if test_mode:
+                    logging.info("Modo de teste ativado - processando apenas o primeiro chunk")
+                    break
+        except Exception:
+            conn.rollback()
+            raise
+        gravadas = mesclar_demonstracoes(conn, staging, tabela)
+        duracao = time.perf_counter() - inicio
+        logging.info(
+            f"{zip_path}: {lidas} linhas lidas, {gravadas} gravadas em {duracao:.1f}s "
+            f"({lidas / duracao if duracao else 0:.0f} linhas/s)"
+        )
+
+        anexar_particao(conn, tabela, ano, trimestre)
+        atualizar_resumo_trimestre(conn, ano, trimestre)
+
+        # Carga parcial (modo de teste) não entra no manifesto: a próxima execução recarrega o arquivo
+        if not test_mode:
+            registrar_arquivo(conn, assinatura, gravadas)
         
         logging.info(f"Arquivo {zip_path} processado com sucesso")
         return True
     except Exception as e:
         logging.error(f"Erro ao processar arquivo {zip_path}: {str(e)}")
         return False
-    finally:
-        # Limpar arquivos temporários
-        if os.path.exists(temp_dir):
-            for file in os.listdir(temp_dir):
-                os.remove(os.path.join(temp_dir, file))
-            os.rmdir(temp_dir)
 
-def processar_todos_arquivos(conn):
+def carregar_arquivo(zip_path, test_mode=False):
+    """
+    Carga de um arquivo em um processo de trabalho: abre a própria conexão
+    (conexões não são compartilhadas entre processos) e devolve o resultado
+    e o tempo gasto para o coordenador.
+    """
+    inicio = time.perf_counter()
+    sucesso = False
+    try:
+        conn = conectar()
+        try:
+            sucesso = processar_arquivo_zip(conn, zip_path, test_mode)
+        finally:
+            conn.close()
+    except Exception as e:
+        logging.error(f"Erro ao processar arquivo {zip_path}: {str(e)}")
+    return {'arquivo': zip_path, 'sucesso': sucesso, 'duracao': time.perf_counter() - inicio}
+
+def processar_arquivos(arquivos, workers=ETL_WORKERS, test_mode=False):
+    """
+    Coordena a carga dos arquivos ZIP em até `workers` processos, um arquivo
+    (trimestre) por vez em cada um. Cada trimestre tem sua tabela e staging,
+    então as cargas só se encontram ao anexar a partição (ver anexar_particao).
+    Retorna os resultados de carregar_arquivo, na ordem de `arquivos`.
+    """
+    inicio = time.perf_counter()
+    resultados = {}
+    workers = max(1, min(workers, len(arquivos)))
+    logging.info(f"Carregando {len(arquivos)} arquivos com {workers} processo(s)")
+
+    if workers == 1:
+        for zip_path in arquivos:
+            resultados[zip_path] = carregar_arquivo(zip_path, test_mode)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futuros = {executor.submit(carregar_arquivo, zip_path, test_mode): zip_path for zip_path in arquivos}
+            for futuro in as_completed(futuros):
+                zip_path = futuros[futuro]
+                try:
+                    resultados[zip_path] = futuro.result()
+                except Exception as e:
+                    # Processo de trabalho encerrado de forma inesperada
+                    logging.error(f"Erro ao processar arquivo {zip_path}: {str(e)}")
+                    resultados[zip_path] = {'arquivo': zip_path, 'sucesso': False, 'duracao': 0.0}
+
+    resultados = [resultados[zip_path] for zip_path in arquivos]
+    for resultado in resultados:
+        situacao = 'ok' if resultado['sucesso'] else 'falha'
+        logging.info(f"{resultado['arquivo']}: {situacao} em {resultado['duracao']:.1f}s")
+    sucessos = sum(1 for resultado in resultados if resultado['sucesso'])
+    logging.info(
+        f"{sucessos} arquivos carregados, {len(resultados) - sucessos} falhas "
+        f"em {time.perf_counter() - inicio:.1f}s "
+        f"(soma dos arquivos: {sum(r['duracao'] for r in resultados):.1f}s)"
+    )
+    return resultados
+
+def processar_todos_arquivos(workers=ETL_WORKERS):
     """Processa todos os arquivos dos dois anos anteriores."""
     try:
-        total_sucesso = 0
+        arquivos = []
         total_falhas = 0
         
         for ano in [ANO_ANTERIOR_2, ANO_ANTERIOR]:
-            logging.info(f"\nProcessando arquivos do ano {ano}")
             for trimestre in range(1, 5):
-                logging.info(f"\nProcessando {trimestre}º trimestre de {ano}")
                 arquivo_zip = os.path.join(DIRETORIOS['dados'][f'demo_{ano}'], f"{trimestre}T{ano}.zip")
-                arquivo_operadoras = 'dados_operadoras_ativas/Relatorio_cadop.csv'
-                
                 if os.path.exists(arquivo_zip):
-                    logging.info(f"Processando arquivo: {arquivo_zip}")
-                    sucesso = processar_arquivo_zip(conn, arquivo_zip, TEST_MODE)
-                    if sucesso:
-                        total_sucesso += 1
-                    else:
-                        total_falhas += 1
+                    arquivos.append(arquivo_zip)
                 else:
                     logging.error(f"Arquivo não encontrado: {arquivo_zip}")
                     total_falhas += 1
+
+        resultados = processar_arquivos(arquivos, workers, TEST_MODE)
+        total_sucesso = sum(1 for resultado in resultados if resultado['sucesso'])
+        total_falhas += len(resultados) - total_sucesso
                     
         logging.info(f"\nProcessamento completo:")
         logging.info(f"Total de arquivos processados com sucesso: {total_sucesso}")
@@ -402,40 +1002,52 @@ def processar_todos_arquivos(conn):
         logging.error(f"Erro ao processar todos os arquivos: {str(e)}")
         return False
 
-def main():
-    """Função principal"""
+def main(workers=ETL_WORKERS, reprocessar=(), completo=False):
+    """
+    Função principal. A carga é incremental: só os arquivos novos ou alterados
+    desde a última execução (ou pedidos em `reprocessar`) são carregados.
+    Com `completo`, as tabelas são removidas e tudo é recarregado.
+    """
     try:
         # Criar conexão com o banco de dados
-        conn = psycopg2.connect(
-            dbname=DB_NAME,
-            user=DB_USER,
-            password=DB_PASSWORD,
-            host=DB_HOST,
-            port=DB_PORT
-        )
+        conn = conectar()
         
-        # Cria as tabelas se não existirem
-        criar_tabelas(conn)
+        # Banco criado por uma versão anterior: a tabela sem partições não aceita
+        # ATTACH PARTITION e só é convertida recriando tudo
+        if not completo and demonstracoes_particionada(conn) is False:
+            logging.warning(
+                "demonstracoes_contabeis não é particionada (criada por uma versão anterior do ETL); "
+                "executando a carga completa"
+            )
+            completo = True
 
-        # Limpa as tabelas existentes
-        logging.info("Limpando tabelas existentes...")
-        limpar_tabelas(conn)
-        logging.info("Criando novas tabelas e índices...")
+        if completo:
+            logging.info("Limpando tabelas existentes...")
+            limpar_tabelas(conn)
+
+        # Cria as tabelas e views se não existirem
+        logging.info("Criando tabelas e índices...")
         criar_tabelas(conn)
+        criar_rankings(conn)
+        alterado = completar_resumo(conn) > 0
         
         # Processar arquivo de operadoras
         arquivo_operadoras = 'dados_operadoras_ativas/Relatorio_cadop.csv'
         if not os.path.exists(arquivo_operadoras):
             raise FileNotFoundError(f"Arquivo de operadoras não encontrado: {arquivo_operadoras}")
         
-        logging.info("Processando arquivo de operadoras...")
-        df_operadoras = pd.read_csv(arquivo_operadoras, sep=';', encoding=ARQUIVOS['csv']['encoding'])
-        inserir_operadoras(conn, df_operadoras)
+        if selecionar_arquivos(conn, [arquivo_operadoras], reprocessar):
+            logging.info("Processando arquivo de operadoras...")
+            assinatura = assinatura_arquivo(arquivo_operadoras)
+            df_operadoras = pd.read_csv(arquivo_operadoras, sep=';', encoding=ARQUIVOS['csv']['encoding'])
+            linhas = inserir_operadoras(conn, df_operadoras)
+            registrar_arquivo(conn, assinatura, linhas)
+            alterado = True
         
         # Processar arquivos de demonstrações por ano e trimestre
         anos = ['2023', '2024']
         trimestres = ['1T', '2T', '3T', '4T']
-        arquivos_processados = 0
+        arquivos = []
         falhas = 0
         
         for ano in anos:
@@ -447,16 +1059,29 @@ def main():
             for trimestre in trimestres:
                 zip_path = os.path.join(dir_demo, f'{trimestre}{ano}.zip')
                 if os.path.exists(zip_path):
-                    logging.info(f"Processando arquivo: {zip_path}")
-                    if processar_arquivo_zip(conn, zip_path, TEST_MODE):
-                        arquivos_processados += 1
-                    else:
-                        falhas += 1
+                    arquivos.append(zip_path)
                 else:
                     logging.warning(f"Arquivo não encontrado: {zip_path}")
                     falhas += 1
         
-        logging.info(f"Processamento concluído. {arquivos_processados} arquivos processados com sucesso. {falhas} falhas.")
+        # Só os trimestres novos ou alterados são carregados, em paralelo
+        pendentes = selecionar_arquivos(conn, arquivos, reprocessar)
+        resultados = processar_arquivos(pendentes, workers, TEST_MODE) if pendentes else []
+        arquivos_processados = sum(1 for resultado in resultados if resultado['sucesso'])
+        falhas += len(resultados) - arquivos_processados
+        
+        logging.info(
+            f"Processamento concluído. {arquivos_processados} arquivos processados com sucesso, "
+            f"{len(arquivos) - len(pendentes)} sem alterações. {falhas} falhas."
+        )
+        # Uma recarga que falhou também mudou os dados (a partição antiga foi descartada)
+        if not alterado and not pendentes:
+            logging.info("Nenhum arquivo novo ou alterado; rankings e versão dos dados mantidos")
+            return
+
+        logging.info("Atualizando rankings de despesas...")
+        atualizar_rankings(conn)
+        registrar_carga(conn, 'import_operadoras')
         
     except Exception as e:
         logging.error(f"Erro durante a execução: {str(e)}")
@@ -466,4 +1091,18 @@ def main():
             conn.close()
 
 if __name__ == '__main__':
-    main() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Importa operadoras e demonstrações contábeis para o PostgreSQL")
+    parser.add_argument(
+        "--reprocessar", action="append", default=[], metavar="ARQUIVO",
+        help="recarrega o arquivo mesmo sem alterações (ex.: 1T2024, Relatorio_cadop); pode ser repetido"
+    )
+    parser.add_argument(
+        "--completo", action="store_true",
+        help="remove e recria todas as tabelas antes de carregar todos os arquivos"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=ETL_WORKERS,
+        help="processos usados na carga dos trimestres (padrão: ETL_WORKERS)"
+    )
+    args = parser.parse_args()
+    main(args.workers, args.reprocessar, args.completo)
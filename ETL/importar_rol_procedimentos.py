@@ -2,6 +2,7 @@ import pandas as pd
 import psycopg2
 from sqlalchemy import create_engine
 import os
+from versao_dados import registrar_carga
 
 # Configurações do banco de dados
 DB_CONFIG = {
@@ -38,6 +39,13 @@ def importar_dados():
                  method='multi',
                  chunksize=1000)
         
+        # Nova versão dos dados: a API descarta ETags e cache de /procedimentos
+        conn = engine.raw_connection()
+        try:
+            registrar_carga(conn, 'importar_rol_procedimentos')
+        finally:
+            conn.close()
+        
         print("Importação concluída com sucesso!")
         
     except Exception as e:
@@ -0,0 +1,61 @@
+"""
+Leitura dos CSVs da ANS direto de dentro dos arquivos ZIP.
+
+O membro do ZIP é descompactado em streaming e entregue ao pd.read_csv, sem
+extrair o CSV para um diretório temporário: nada é escrito em disco e a memória
+usada fica limitada ao chunk em processamento.
+"""
+import os
+import zipfile
+from contextlib import contextmanager
+
+import pandas as pd
+
+from config import ARQUIVOS
+
+
+def membro_csv(zip_ref, nome=None):
+    """
+    Escolhe o CSV dentro do ZIP: `nome`, se informado; senão o CSV com o mesmo
+    nome do ZIP ({trimestre}T{ano}.csv) ou, na falta dele, o primeiro CSV.
+    """
+    if nome is not None:
+        return nome
+    arquivos_csv = [f for f in zip_ref.namelist() if f.lower().endswith('.csv')]
+    if not arquivos_csv:
+        raise FileNotFoundError(f"Nenhum arquivo CSV encontrado em {zip_ref.filename}")
+    esperado = os.path.splitext(os.path.basename(zip_ref.filename or ''))[0].lower() + '.csv'
+    for arquivo in arquivos_csv:
+        if os.path.basename(arquivo).lower() == esperado:
+            return arquivo
+    return arquivos_csv[0]
+
+
+@contextmanager
+def abrir_csv_do_zip(zip_path, nome=None):
+    """Arquivo binário do CSV dentro do ZIP, descompactado conforme é lido"""
+    with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+        with zip_ref.open(membro_csv(zip_ref, nome)) as arquivo:
+            yield arquivo
+
+
+def _opcoes_leitura(opcoes):
+    """Separador e encoding padrão dos CSVs da ANS, sobrepostos pelas opções recebidas"""
+    return {
+        'sep': ARQUIVOS['csv']['separador'],
+        'encoding': ARQUIVOS['csv']['encoding'],
+        **opcoes
+    }
+
+
+def ler_csv_do_zip(zip_path, nome=None, **opcoes):
+    """CSV do ZIP inteiro em um DataFrame (opções repassadas ao pd.read_csv)"""
+    with abrir_csv_do_zip(zip_path, nome) as arquivo:
+        return pd.read_csv(arquivo, **_opcoes_leitura(opcoes))
+
+
+def ler_csv_do_zip_em_chunks(zip_path, chunksize, nome=None, **opcoes):
+    """Gera DataFrames de até `chunksize` linhas lidos do CSV dentro do ZIP"""
+    with abrir_csv_do_zip(zip_path, nome) as arquivo:
+        with pd.read_csv(arquivo, chunksize=chunksize, **_opcoes_leitura(opcoes)) as leitor:
+            yield from leitor
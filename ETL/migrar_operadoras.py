@@ -1,5 +1,6 @@
 import psycopg2
 from config import DB_NAME, DB_USER, DB_PASSWORD, DB_HOST, DB_PORT
+from versao_dados import registrar_carga
 import logging
 
 # Configuração de logging
@@ -58,6 +59,9 @@ def migrar_operadoras():
             cursor.execute("SELECT COUNT(*) FROM operadoras_ativas")
             total = cursor.fetchone()[0]
             logger.info(f"Migração concluída. {total} registros inseridos.")
+
+        # Nova versão dos dados: a API recarrega o catálogo e descarta ETags e cache
+        registrar_carga(conn, 'migrar_operadoras')
             
     except Exception as e:
         logger.error(f"Erro durante a migração: {str(e)}")
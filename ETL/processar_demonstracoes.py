@@ -1,32 +1,9 @@
 import os
 import pandas as pd
-import zipfile
 from config import ARQUIVOS
+from leitura_zip import ler_csv_do_zip
 from logger import logger
 
-def extrair_csv_do_zip(zip_path, diretorio_saida):
-    """Extrai o arquivo CSV de dentro do ZIP"""
-    try:
-        with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-            # Lista todos os arquivos no ZIP
-            arquivos = zip_ref.namelist()
-            
-            # Procura por arquivos CSV
-            csv_files = [f for f in arquivos if f.lower().endswith('.csv')]
-            
-            if not csv_files:
-                logger.error(f"Nenhum arquivo CSV encontrado em {zip_path}")
-                return None
-                
-            # Extrai o primeiro CSV encontrado
-            csv_file = csv_files[0]
-            zip_ref.extract(csv_file, diretorio_saida)
-            
-            return os.path.join(diretorio_saida, csv_file)
-    except Exception as e:
-        logger.error(f"Erro ao extrair {zip_path}: {str(e)}")
-        return None
-
 def processar_demonstracoes(ano):
     """Processa os arquivos de demonstrações contábeis de um ano específico"""
     diretorio = f'demo_contabeis_{ano}'
@@ -42,38 +19,21 @@ def processar_demonstracoes(ano):
         logger.error(f"Nenhum arquivo ZIP encontrado em {diretorio}")
         return None
         
-    # Diretório temporário para extrair os CSVs
-    temp_dir = os.path.join(diretorio, 'temp')
-    os.makedirs(temp_dir, exist_ok=True)
-    
     # Lista para armazenar os DataFrames
     dfs = []
     
-    # Processa cada arquivo ZIP
+    # Processa cada arquivo ZIP, lendo o CSV direto de dentro dele
     for zip_file in sorted(arquivos_zip):
         zip_path = os.path.join(diretorio, zip_file)
         logger.info(f"Processando {zip_file}...")
         
-        # Extrai o CSV do ZIP
-        csv_path = extrair_csv_do_zip(zip_path, temp_dir)
-        if csv_path:
-            try:
-                # Lê o CSV
-                df = pd.read_csv(csv_path, 
-                               encoding=ARQUIVOS['csv']['encoding'],
-                               sep=ARQUIVOS['csv']['separador'])
-                dfs.append(df)
-                
-                # Remove o arquivo extraído
-                os.remove(csv_path)
-            except Exception as e:
-                logger.error(f"Erro ao ler {csv_path}: {str(e)}")
-    
-    # Remove o diretório temporário
-    try:
-        os.rmdir(temp_dir)
-    except:
-        pass
+        try:
+            df = ler_csv_do_zip(zip_path,
+                                encoding=ARQUIVOS['csv']['encoding'],
+                                sep=ARQUIVOS['csv']['separador'])
+            dfs.append(df)
+        except Exception as e:
+            logger.error(f"Erro ao ler o CSV de {zip_path}: {str(e)}")
     
     if not dfs:
         logger.error("Nenhum dado foi processado")
@@ -11,6 +11,7 @@ import zipfile
 from datetime import datetime
 import psycopg2
 from unidecode import unidecode
+from versao_dados import registrar_carga
 
 # Configuração de logging
 logging.basicConfig(
@@ -148,6 +149,15 @@ def compactar_csv(arquivo_csv):
         logger.error(f"Erro ao criar arquivo ZIP: {e}")
         raise
 
+# Documento da busca textual de rol_procedimentos: dicionário português, sem
+# acentos (mesma tradução de normalize_text, escrita por extenso para não
+# depender da função) e com peso maior para o texto do procedimento.
+SEM_ACENTO = "translate(lower(coalesce({coluna}, '')), 'áàâãäéèêëíìîïóòôõöúùûüýÿçñ', 'aaaaaeeeeiiiiooooouuuuyycn')"
+EXPRESSAO_BUSCA = "\n            || ".join(
+    f"setweight(to_tsvector('portuguese', {SEM_ACENTO.format(coluna=coluna)}), '{peso}')"
+    for coluna, peso in (('procedimento', 'A'), ('subgrupo', 'B'), ('grupo', 'C'), ('capitulo', 'D'))
+)
+
 def importar_para_banco(df):
     """
     Importa os dados para o PostgreSQL com tratamento de caracteres especiais
@@ -185,6 +195,16 @@ def importar_para_banco(df):
             data_importacao TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         );
         """)
+
+        # Busca textual: coluna tsvector gerada pelo banco e índice GIN
+        # (ADD COLUMN IF NOT EXISTS cobre tabelas criadas antes da coluna)
+        cur.execute(f"""
+        ALTER TABLE rol_procedimentos
+            ADD COLUMN IF NOT EXISTS busca tsvector GENERATED ALWAYS AS ({EXPRESSAO_BUSCA}) STORED;
+
+        CREATE INDEX IF NOT EXISTS idx_rol_procedimentos_busca
+            ON rol_procedimentos USING gin (busca);
+        """)
         
         # Limpa dados anteriores
         cur.execute("TRUNCATE TABLE rol_procedimentos;")
@@ -222,6 +242,13 @@ def importar_para_banco(df):
                 logger.error(f"Dados da linha: {row.to_dict()}")
                 continue
         
+        # Atualiza as estatísticas usadas pelo planejador nas buscas
+        cur.execute("ANALYZE rol_procedimentos;")
+        conn.commit()
+
+        # Nova versão dos dados: a API descarta ETags e cache de /procedimentos
+        registrar_carga(conn, 'transform_data')
+
         logger.info("Dados importados com sucesso para o PostgreSQL")
         
     except Exception as e:
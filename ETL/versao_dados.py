@@ -0,0 +1,41 @@
+"""
+Versão dos dados lida pela API.
+
+Cada carga concluída é registrada em etl_versao_dados; a API acompanha a maior
+versão para invalidar ETags, o cache de respostas e o catálogo de operadoras em
+memória. Todo script que altera tabelas lidas pela API (operadoras,
+operadoras_ativas, demonstrações, rol_procedimentos) registra uma nova versão
+ao fim da carga.
+"""
+import logging
+
+CRIAR_TABELA_VERSAO = """
+    CREATE TABLE IF NOT EXISTS etl_versao_dados (
+        versao SERIAL PRIMARY KEY,
+        origem VARCHAR(50) NOT NULL,
+        concluida_em TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+    );
+"""
+
+
+def registrar_carga(conn, origem):
+    """
+    Registra uma nova versão dos dados ao fim de uma carga bem-sucedida
+    (conexão DB-API, ex.: psycopg2). Cria a tabela se o script rodar antes
+    do import_operadoras.py.
+    """
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(CRIAR_TABELA_VERSAO)
+            cursor.execute(
+                "INSERT INTO etl_versao_dados (origem) VALUES (%s) RETURNING versao",
+                (origem,)
+            )
+            versao = cursor.fetchone()[0]
+            conn.commit()
+            logging.info(f"Carga registrada como versão {versao} dos dados")
+            return versao
+    except Exception as e:
+        conn.rollback()
+        logging.error(f"Erro ao registrar carga: {str(e)}")
+        raise
@@ -0,0 +1,93 @@
+"""
+Micro-benchmark das consultas de repositorio.py com e sem prepared statement.
+
+Para cada consulta mostra o tempo de planejamento no Postgres (Planning Time do
+EXPLAIN ANALYZE) e a média por execução vista pelo cliente em três modos:
+- texto: SQL enviado a cada execução (parse + planejamento no servidor)
+- preparada: prepare=True, só o nome e os parâmetros a cada execução
+- genérico: idem, com plan_cache_mode=force_generic_plan (nunca replaneja)
+
+A coluna ganho compara a consulta preparada com o texto.
+
+Precisa do banco carregado pelo ETL e das migrações aplicadas.
+
+Uso:
+    python benchmark_consultas.py [--repeticoes 500]
+"""
+import argparse
+import time
+
+import psycopg
+from psycopg.rows import dict_row
+
+from config import DB_CONFIG
+import repositorio
+
+
+def amostra(conn):
+    """Valores reais do cadastro para parametrizar as consultas"""
+    linha = conn.execute("""
+        SELECT o.cnpj, o.registro_ans, o.uf, o.cidade, o.nome_fantasia, o.razao_social
+        FROM operadoras o
+        JOIN operadoras_ativas oa ON o.registro_ans = oa.registro_ans
+        WHERE o.cidade IS NOT NULL AND o.nome_fantasia IS NOT NULL
+        LIMIT 1
+    """).fetchone()
+    if linha is None:
+        raise SystemExit("Tabela operadoras vazia: rode o ETL antes do benchmark")
+    return linha
+
+
+def consultas(linha):
+    def texto(campo):
+        return {'padrao': f"%{linha[campo][:5]}%", 'termo': linha[campo][:5], 'limite': 101}
+
+    return [
+        ('cnpj', repositorio.QUERY_POR_CNPJ, (linha['cnpj'],)),
+        ('lote (cnpj)', repositorio.QUERIES_POR_VALORES['cnpj'], ([linha['cnpj']],)),
+        ('cidade', repositorio.QUERIES_TEXTO[('cidade', False)], texto('cidade')),
+        ('nome_fantasia', repositorio.QUERIES_TEXTO[('nome_fantasia', False)], texto('nome_fantasia')),
+        ('razao_social', repositorio.QUERIES_TEXTO[('razao_social', False)], texto('razao_social')),
+        ('uf', repositorio.QUERIES_POR_UF[False], {'uf': linha['uf'], 'limite': 101}),
+        ('ativas por cidade', repositorio.QUERIES_ATIVAS_POR_CIDADE[False], texto('cidade')),
+    ]
+
+
+def tempo_planejamento(conn, query, params):
+    plano = conn.execute(f"EXPLAIN (ANALYZE, SUMMARY, FORMAT JSON) {query}", params).fetchone()
+    return plano['QUERY PLAN'][0]['Planning Time']
+
+
+def media_ms(conn, query, params, repeticoes, prepare):
+    with conn.cursor() as cur:
+        # Aquecimento: cache de páginas e, com prepare=True, a preparação em si
+        cur.execute(query, params, prepare=prepare)
+        cur.fetchall()
+        inicio = time.perf_counter()
+        for _ in range(repeticoes):
+            cur.execute(query, params, prepare=prepare)
+            cur.fetchall()
+        return (time.perf_counter() - inicio) * 1000 / repeticoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeticoes', type=int, default=500)
+    args = parser.parse_args()
+
+    conectar = dict(DB_CONFIG, autocommit=True, row_factory=dict_row)
+    with psycopg.connect(**conectar) as conn, \
+            psycopg.connect(**conectar, options='-c plan_cache_mode=force_generic_plan') as conn_generico:
+        linha = amostra(conn)
+        print(f"{'consulta':<20}{'planejamento ms':>16}{'texto ms':>10}{'preparada ms':>14}{'genérico ms':>13}{'ganho':>8}")
+        for nome, query, params in consultas(linha):
+            planejamento = tempo_planejamento(conn, query, params)
+            texto = media_ms(conn, query, params, args.repeticoes, prepare=False)
+            preparada = media_ms(conn, query, params, args.repeticoes, prepare=True)
+            generico = media_ms(conn_generico, query, params, args.repeticoes, prepare=True)
+            ganho = (texto - preparada) / texto * 100 if texto else 0.0
+            print(f"{nome:<20}{planejamento:>16.3f}{texto:>10.3f}{preparada:>14.3f}{generico:>13.3f}{ganho:>7.1f}%")
+
+
+if __name__ == '__main__':
+    main()
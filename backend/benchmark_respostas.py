@@ -0,0 +1,95 @@
+"""
+Benchmark da serialização e compressão das respostas de busca.
+
+Compara, para páginas de operadoras com as 17 colunas do cadastro:
+- caminho padrão do FastAPI (jsonable_encoder + json.dumps) x orjson (respostas.py)
+- tamanho e CPU de identity, gzip e brotli com os níveis de config.py
+
+Não usa o banco: as linhas são geradas com o mesmo formato do catálogo.
+
+Uso:
+    python benchmark_respostas.py [--linhas 100 1000] [--repeticoes 200]
+"""
+import argparse
+import json
+import random
+import time
+import zlib
+from datetime import date
+
+import brotli
+from fastapi.encoders import jsonable_encoder
+
+from config import COMPRESSAO_NIVEL_GZIP, COMPRESSAO_QUALIDADE_BROTLI
+from respostas import serializar_json
+
+MODALIDADES = ['Medicina de Grupo', 'Cooperativa Médica', 'Odontologia de Grupo', 'Autogestão']
+CIDADES = [('SAO PAULO', 'SP'), ('RIO DE JANEIRO', 'RJ'), ('BELO HORIZONTE', 'MG'), ('CURITIBA', 'PR')]
+
+
+def gerar_linha(i):
+    cidade, uf = random.choice(CIDADES)
+    return {
+        'registro_ans': f"{300000 + i}",
+        'nome_fantasia': f"OPERADORA SAUDE {i}",
+        'razao_social': f"OPERADORA DE PLANOS DE SAUDE NUMERO {i} LTDA",
+        'cnpj': f"{random.randrange(10**13, 10**14)}",
+        'modalidade': random.choice(MODALIDADES),
+        'logradouro': 'AVENIDA PAULISTA',
+        'numero': str(random.randrange(1, 3000)),
+        'complemento': random.choice([None, 'SALA 101', 'ANDAR 5']),
+        'bairro': 'BELA VISTA',
+        'cidade': cidade,
+        'uf': uf,
+        'cep': f"{random.randrange(10**7, 10**8)}",
+        'telefone': f"11{random.randrange(10**7, 10**8)}",
+        'email': f"contato{i}@operadora.com.br",
+        'representante': f"REPRESENTANTE {i}",
+        'data_registro_ans': date(2000 + i % 24, 1 + i % 12, 1 + i % 28),
+        'is_ativa': i % 3 != 0,
+    }
+
+
+def cronometrar(funcao, repeticoes):
+    """CPU por chamada (ms), medida com process_time"""
+    inicio = time.process_time()
+    for _ in range(repeticoes):
+        resultado = funcao()
+    return (time.process_time() - inicio) * 1000 / repeticoes, resultado
+
+
+def executar(total_linhas, repeticoes):
+    pagina = {'items': [gerar_linha(i) for i in range(total_linhas)], 'next_cursor': 'WyJ4IiwiMSJd'}
+
+    padrao_ms, corpo_padrao = cronometrar(
+        lambda: json.dumps(jsonable_encoder(pagina), ensure_ascii=False).encode('utf-8'), repeticoes
+    )
+    orjson_ms, corpo = cronometrar(lambda: serializar_json(pagina), repeticoes)
+
+    gzip_ms, corpo_gzip = cronometrar(
+        lambda: zlib.compress(corpo, COMPRESSAO_NIVEL_GZIP, 31), repeticoes
+    )
+    brotli_ms, corpo_brotli = cronometrar(
+        lambda: brotli.compress(corpo, quality=COMPRESSAO_QUALIDADE_BROTLI), repeticoes
+    )
+
+    print(f"\n{total_linhas} linhas por resposta ({repeticoes} repetições)")
+    print(f"{'etapa':<36}{'bytes':>12}{'CPU ms':>10}")
+    print(f"{'jsonable_encoder + json.dumps':<36}{len(corpo_padrao):>12}{padrao_ms:>10.3f}")
+    print(f"{'orjson':<36}{len(corpo):>12}{orjson_ms:>10.3f}")
+    print(f"{f'orjson + gzip (nível {COMPRESSAO_NIVEL_GZIP})':<36}{len(corpo_gzip):>12}{orjson_ms + gzip_ms:>10.3f}")
+    print(f"{f'orjson + br (qualidade {COMPRESSAO_QUALIDADE_BROTLI})':<36}{len(corpo_brotli):>12}{orjson_ms + brotli_ms:>10.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--linhas', type=int, nargs='+', default=[100, 1000])
+    parser.add_argument('--repeticoes', type=int, default=200)
+    args = parser.parse_args()
+    random.seed(0)
+    for total_linhas in args.linhas:
+        executar(total_linhas, args.repeticoes)
+
+
+if __name__ == '__main__':
+    main()
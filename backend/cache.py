@@ -0,0 +1,100 @@
+"""
+Cache em memória das respostas das rotas analíticas.
+
+Os resultados só mudam quando o ETL conclui uma nova carga, então cada
+resposta é guardada sob (rota, parâmetros normalizados, versão dos dados).
+O cache tem tamanho máximo (LRU), validade (TTL) e é esvaziado sempre que
+a versão dos dados muda; ver versao_dados.py.
+"""
+import functools
+import logging
+import time
+from collections import OrderedDict
+
+from config import CACHE_MAX_ITENS, CACHE_TTL
+from versao_dados import versao_atual
+
+logger = logging.getLogger(__name__)
+
+
+class CacheRespostas:
+    """Cache LRU com TTL e contadores de acerto/erro"""
+
+    def __init__(self, max_itens=CACHE_MAX_ITENS, ttl=CACHE_TTL):
+        self.max_itens = max_itens
+        self.ttl = ttl
+        self._itens = OrderedDict()
+        self.acertos = 0
+        self.falhas = 0
+        self.remocoes = 0
+
+    def obter(self, chave):
+        """Retorna (True, valor) se a chave estiver no cache e válida; senão (False, None)"""
+        item = self._itens.get(chave)
+        if item is not None:
+            expira_em, valor = item
+            if expira_em > time.monotonic():
+                self._itens.move_to_end(chave)
+                self.acertos += 1
+                return True, valor
+            del self._itens[chave]
+        self.falhas += 1
+        return False, None
+
+    def guardar(self, chave, valor):
+        self._itens[chave] = (time.monotonic() + self.ttl, valor)
+        self._itens.move_to_end(chave)
+        while len(self._itens) > self.max_itens:
+            self._itens.popitem(last=False)
+            self.remocoes += 1
+
+    def limpar(self):
+        self._itens.clear()
+
+    def estatisticas(self):
+        consultas = self.acertos + self.falhas
+        return {
+            'itens': len(self._itens),
+            'max_itens': self.max_itens,
+            'acertos': self.acertos,
+            'falhas': self.falhas,
+            'remocoes': self.remocoes,
+            'taxa_acerto': self.acertos / consultas if consultas else 0.0,
+        }
+
+
+cache_respostas = CacheRespostas()
+
+
+def _normalizar(valor):
+    if isinstance(valor, str):
+        return valor.strip()
+    return valor
+
+
+def em_cache(rota):
+    """
+    Decorador para rotas cujo resultado depende só dos parâmetros e dos dados
+    carregados. Deve ficar abaixo do @app.get para que o FastAPI continue lendo
+    a assinatura original da função.
+    """
+    @functools.wraps(rota)
+    async def wrapper(*args, **kwargs):
+        chave = (
+            rota.__name__,
+            tuple(sorted((nome, _normalizar(valor)) for nome, valor in kwargs.items())),
+            versao_atual()['versao'],
+        )
+        encontrado, valor = cache_respostas.obter(chave)
+        if encontrado:
+            return valor
+        valor = await rota(*args, **kwargs)
+        cache_respostas.guardar(chave, valor)
+        return valor
+    return wrapper
+
+
+async def invalidar_cache(versao):
+    """Ouvinte de versao_dados: descarta as respostas da versão anterior"""
+    cache_respostas.limpar()
+    logger.info("Cache de respostas invalidado (versão %s)", versao['versao'])
@@ -0,0 +1,102 @@
+"""
+Requisições condicionais (ETag / Last-Modified) amarradas à versão dos dados.
+
+As rotas de consulta só mudam quando o ETL registra uma nova carga, então o
+ETag de uma resposta é derivado da versão dos dados e da URL. A rota roda
+normalmente (as respostas repetidas saem do cache de cache.py, sem consultar o
+banco) e só uma resposta 2xx com If-None-Match (ou If-Modified-Since) ainda
+válido vira 304: erros de validação, 404 e paths inexistentes chegam ao
+cliente como estão.
+"""
+import hashlib
+from datetime import timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from starlette.responses import Response
+
+from config import CACHE_CONTROL
+from versao_dados import versao_atual
+
+
+def politica_cache(caminho):
+    """Retorna o Cache-Control configurado para o prefixo da rota (ou None)"""
+    for prefixo, politica in CACHE_CONTROL.items():
+        if caminho == prefixo or caminho.startswith(prefixo + '/'):
+            return politica
+    return None
+
+
+def gerar_etag(versao, caminho, query):
+    """
+    ETag sempre fraco: o corpo pode sair comprimido ou não (compressao.py), então
+    as representações só são equivalentes, não idênticas byte a byte. O 200 e o
+    304 da mesma URL carregam exatamente o mesmo validador.
+    """
+    resumo = hashlib.sha1(f"{caminho}?{query}".encode('utf-8')).hexdigest()[:16]
+    return f'W/"v{versao}-{resumo}"'
+
+
+def _sem_prefixo_fraco(etag):
+    return etag[2:] if etag.startswith('W/') else etag
+
+
+def _etag_confere(if_none_match, etag):
+    """Comparação fraca do If-None-Match (RFC 9110): ignora o prefixo W/ dos dois lados"""
+    if if_none_match.strip() == '*':
+        return True
+    etag = _sem_prefixo_fraco(etag)
+    return any(
+        _sem_prefixo_fraco(candidato.strip()) == etag
+        for candidato in if_none_match.split(',')
+    )
+
+
+def _nao_modificado_desde(if_modified_since, ultima_modificacao):
+    try:
+        data = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if data.tzinfo is None:
+        data = data.replace(tzinfo=timezone.utc)
+    return ultima_modificacao.replace(microsecond=0) <= data
+
+
+async def requisicao_condicional(request, call_next):
+    """Middleware HTTP: valida If-None-Match/If-Modified-Since e adiciona os cabeçalhos de cache"""
+    politica = politica_cache(request.url.path)
+    versao = versao_atual()
+    # Sem carga registrada pelo ETL não há como saber quando os dados mudam
+    if request.method != 'GET' or politica is None or not versao['versao']:
+        return await call_next(request)
+
+    cabecalhos = {
+        'ETag': gerar_etag(versao['versao'], request.url.path, request.url.query),
+        'Cache-Control': politica,
+        # O corpo pode ser comprimido conforme o Accept-Encoding (ver compressao.py)
+        'Vary': 'Accept-Encoding',
+    }
+    ultima_modificacao = versao['concluida_em']
+    if ultima_modificacao is not None:
+        ultima_modificacao = ultima_modificacao.astimezone(timezone.utc)
+        cabecalhos['Last-Modified'] = format_datetime(ultima_modificacao, usegmt=True)
+
+    if_none_match = request.headers.get('if-none-match')
+    if_modified_since = request.headers.get('if-modified-since')
+    if if_none_match is not None:
+        nao_modificado = _etag_confere(if_none_match, cabecalhos['ETag'])
+    else:
+        nao_modificado = (
+            if_modified_since is not None
+            and ultima_modificacao is not None
+            and _nao_modificado_desde(if_modified_since, ultima_modificacao)
+        )
+
+    response = await call_next(request)
+    if not 200 <= response.status_code < 300:
+        return response
+    if nao_modificado:
+        # O corpo gerado pela rota é descartado; uma exportação em andamento é
+        # interrompida ao receber o http.disconnect do BaseHTTPMiddleware
+        return Response(status_code=304, headers=cabecalhos)
+    response.headers.update(cabecalhos)
+    return response
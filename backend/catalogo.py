@@ -0,0 +1,231 @@
+"""
+Réplica em memória do cadastro de operadoras (operadoras + operadoras_ativas).
+
+O cadastro tem poucos milhares de linhas e só muda quando o ETL roda, então as
+rotas de busca de operadoras respondem direto desta cópia, sem ir ao banco.
+O catálogo é carregado na subida da API e substituído por inteiro (troca de
+referência) sempre que a versão dos dados muda; ver versao_dados.py.
+"""
+import asyncio
+import logging
+import unicodedata
+from collections import Counter
+
+from database import buscar_todos
+from repositorio import SELECT_OPERADORAS, FACETAS, ordenar_facetas
+
+logger = logging.getLogger(__name__)
+
+LIMITE_RESULTADOS = 100
+
+QUERY_CATALOGO = f"""{SELECT_OPERADORAS}
+    ORDER BY o.nome_fantasia, o.registro_ans
+"""
+
+
+def normalize_text(text):
+    """Remove acentos e converte para minúsculo"""
+    if not text:
+        return text
+    # Normaliza para forma NFD e remove diacríticos
+    text = unicodedata.normalize('NFD', text).encode('ascii', 'ignore').decode('utf-8')
+    return text.lower()
+
+
+def _trigramas(texto):
+    """Trigramas contíguos do texto, usados no índice invertido"""
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+
+def _trigramas_palavras(texto):
+    """Trigramas por palavra, no mesmo formato do pg_trgm (usados na similaridade)"""
+    trigramas = set()
+    for palavra in ''.join(c if c.isalnum() else ' ' for c in texto).split():
+        palavra = f"  {palavra} "
+        trigramas.update(palavra[i:i + 3] for i in range(len(palavra) - 2))
+    return trigramas
+
+
+def similaridade(a, b):
+    """Equivalente a similarity() do pg_trgm para textos já normalizados"""
+    ta, tb = _trigramas_palavras(a), _trigramas_palavras(b)
+    if not ta or not tb:
+        return 0.0
+    return len(ta & tb) / len(ta | tb)
+
+
+class IndiceTexto:
+    """
+    Índice invertido de trigramas sobre uma coluna normalizada.
+    Responde "termo contido no texto" como o LIKE '%termo%' da API.
+    """
+
+    def __init__(self, textos):
+        self.textos = textos
+        self.postings = {}
+        for posicao, texto in enumerate(textos):
+            for trigrama in _trigramas(texto):
+                self.postings.setdefault(trigrama, set()).add(posicao)
+
+    def buscar(self, termo):
+        """Retorna as posições cujo texto contém o termo (já normalizado)"""
+        trigramas = _trigramas(termo)
+        if not trigramas:
+            # Termos com menos de 3 caracteres: varredura simples
+            return [i for i, texto in enumerate(self.textos) if termo in texto]
+
+        candidatos = None
+        for trigrama in sorted(trigramas, key=lambda t: len(self.postings.get(t, ()))):
+            posicoes = self.postings.get(trigrama)
+            if not posicoes:
+                return []
+            candidatos = set(posicoes) if candidatos is None else candidatos & posicoes
+            if not candidatos:
+                return []
+        return [i for i in candidatos if termo in self.textos[i]]
+
+
+def valor_faceta(coluna, valor):
+    """Valor agrupado da faceta: sem espaços nas pontas e, para UF, em maiúsculas"""
+    valor = (valor or '').strip()
+    return valor.upper() if coluna == 'uf' else valor
+
+
+def chave_nome(linha, ordem='nome_fantasia'):
+    """Chave de ordenação das listagens: (coluna de ordem, registro ANS)"""
+    return [linha[ordem] or '', linha['registro_ans']]
+
+
+class CatalogoOperadoras:
+    """Snapshot imutável do cadastro com índices por CNPJ, registro ANS, UF e texto"""
+
+    def __init__(self, linhas, versao=0):
+        self.versao = versao
+        self.linhas = tuple(linhas)
+        self.por_cnpj = {}
+        self.por_registro_ans = {}
+        self.por_uf = {}
+
+        for linha in self.linhas:
+            # Mantém a primeira ocorrência, como o fetchone() da busca no banco
+            self.por_cnpj.setdefault(linha['cnpj'], linha)
+            self.por_registro_ans.setdefault(linha['registro_ans'], linha)
+            uf = (linha['uf'] or '').strip().upper()
+            self.por_uf.setdefault(uf, []).append(linha)
+
+        for linhas_uf in self.por_uf.values():
+            linhas_uf.sort(key=chave_nome)
+
+        self.indices = {
+            coluna: IndiceTexto([normalize_text(linha[coluna]) or '' for linha in self.linhas])
+            for coluna in ('razao_social', 'nome_fantasia', 'cidade')
+        }
+
+        # Facetas: valor agrupado por posição e contagens sem filtro, calculadas uma vez
+        self.valores_faceta = {
+            coluna: tuple(valor_faceta(coluna, linha[coluna]) for linha in self.linhas)
+            for coluna in FACETAS
+        }
+        self.contagens_faceta = {
+            coluna: Counter(valor for valor in valores if valor)
+            for coluna, valores in self.valores_faceta.items()
+        }
+        self.ativas = frozenset(i for i, linha in enumerate(self.linhas) if linha['is_ativa'])
+
+    def __len__(self):
+        return len(self.linhas)
+
+    def buscar_cnpj(self, cnpj):
+        return self.por_cnpj.get(cnpj)
+
+    def buscar_registro_ans(self, registro_ans):
+        return self.por_registro_ans.get(registro_ans)
+
+    def buscar_uf(self, uf, apos=None, limite=LIMITE_RESULTADOS):
+        """Operadoras da UF ordenadas por chave_nome, a partir da chave `apos`"""
+        linhas = self.por_uf.get(uf.strip().upper(), [])
+        if apos is not None:
+            apos = tuple(apos)
+            linhas = [linha for linha in linhas if tuple(chave_nome(linha)) > apos]
+        return linhas[:limite]
+
+    @staticmethod
+    def chave_texto(coluna, termo, ordem='nome_fantasia'):
+        """
+        Função de chave das buscas textuais: (relevância, coluna de ordem,
+        registro ANS), no mesmo formato usado pela busca no banco
+        """
+        termo = normalize_text(termo) or ''
+
+        def chave(linha):
+            texto = normalize_text(linha[coluna]) or ''
+            return [similaridade(texto, termo)] + chave_nome(linha, ordem)
+        return chave
+
+    def buscar_texto(self, coluna, termo, ordem='nome_fantasia', apos=None, limite=LIMITE_RESULTADOS):
+        """
+        Busca parcial sem acento na coluna, ordenada pela similaridade com o
+        termo (decrescente) e depois por chave_nome, a partir da chave `apos`
+        """
+        termo = normalize_text(termo) or ''
+        indice = self.indices[coluna]
+        chaves = []
+        for i in indice.buscar(termo):
+            linha = self.linhas[i]
+            chaves.append(((-similaridade(indice.textos[i], termo), *chave_nome(linha, ordem)), linha))
+        if apos is not None:
+            inicio = (-apos[0], *apos[1:])
+            chaves = [item for item in chaves if item[0] > inicio]
+        chaves.sort(key=lambda item: item[0])
+        return [linha for _, linha in chaves[:limite]]
+
+    def facetas(self, uf=None, modalidade=None, cidade=None, ativa=None, limite=LIMITE_RESULTADOS):
+        """
+        Contagem de operadoras por UF, modalidade e cidade. Cada faceta aplica
+        os demais filtros e ignora o próprio, para que o cliente continue vendo
+        as outras opções do filtro já escolhido. `total` aplica todos os filtros.
+        """
+        filtros = {}
+        for coluna, valor in (('uf', uf), ('modalidade', modalidade)):
+            if valor:
+                alvo = valor_faceta(coluna, valor)
+                filtros[coluna] = {i for i, v in enumerate(self.valores_faceta[coluna]) if v == alvo}
+        if cidade:
+            filtros['cidade'] = set(self.indices['cidade'].buscar(normalize_text(cidade)))
+        if ativa is not None:
+            filtros['ativa'] = self.ativas if ativa else set(range(len(self.linhas))) - self.ativas
+
+        def posicoes(ignorar=None):
+            conjuntos = sorted((c for nome, c in filtros.items() if nome != ignorar), key=len)
+            return set(conjuntos[0]).intersection(*conjuntos[1:]) if conjuntos else None
+
+        resultado = {}
+        for coluna in FACETAS:
+            selecionadas = posicoes(ignorar=coluna)
+            if selecionadas is None:
+                contagens = self.contagens_faceta[coluna]
+            else:
+                valores = self.valores_faceta[coluna]
+                contagens = Counter(valores[i] for i in selecionadas if valores[i])
+            resultado[coluna] = ordenar_facetas(contagens, limite)
+
+        todas = posicoes()
+        return {'total': len(self.linhas) if todas is None else len(todas), 'facetas': resultado}
+
+
+_catalogo = None
+
+
+def catalogo_atual():
+    """Retorna o catálogo carregado ou None (rotas devem então consultar o banco)"""
+    return _catalogo
+
+
+async def recarregar_catalogo(versao):
+    """Ouvinte de versao_dados: recarrega o catálogo e troca a referência atual"""
+    global _catalogo
+    linhas = await buscar_todos(QUERY_CATALOGO)
+    # A construção dos índices é CPU; roda fora do event loop
+    novo = await asyncio.to_thread(CatalogoOperadoras, linhas, versao['versao'])
+    _catalogo = novo
+    logger.info("Catálogo de operadoras carregado: %s registros (versão %s)", len(novo), novo.versao)
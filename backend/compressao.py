@@ -0,0 +1,134 @@
+"""
+Compressão das respostas (brotli ou gzip) negociada pelo Accept-Encoding.
+
+Middleware ASGI: respostas de texto/JSON acima de COMPRESSAO_MIN_BYTES são
+comprimidas com o melhor formato aceito pelo cliente (br > gzip). Respostas
+em streaming (exportação) são comprimidas lote a lote, sem juntar o corpo.
+
+O ETag não é alterado aqui: cache_http.py já o gera fraco (W/"..."), igual
+no 200 comprimido ou não e no 304.
+"""
+import zlib
+
+import brotli
+from starlette.datastructures import Headers, MutableHeaders
+
+from config import COMPRESSAO_MIN_BYTES, COMPRESSAO_NIVEL_GZIP, COMPRESSAO_QUALIDADE_BROTLI
+
+TIPOS_COMPRIMIVEIS = ('application/json', 'application/x-ndjson', 'text/')
+
+
+def escolher_codificacao(accept_encoding):
+    """Retorna 'br', 'gzip' ou None conforme o Accept-Encoding (respeitando q=0)"""
+    aceitas = {}
+    for parte in accept_encoding.split(','):
+        nome, _, parametros = parte.strip().partition(';')
+        q = 1.0
+        parametros = parametros.strip()
+        if parametros.startswith('q='):
+            try:
+                q = float(parametros[2:])
+            except ValueError:
+                q = 0.0
+        aceitas[nome.strip().lower()] = q
+    for codificacao in ('br', 'gzip'):
+        if aceitas.get(codificacao, aceitas.get('*', 0.0)) > 0:
+            return codificacao
+    return None
+
+
+class _Compressor:
+    def __init__(self, codificacao):
+        if codificacao == 'br':
+            self._br = brotli.Compressor(quality=COMPRESSAO_QUALIDADE_BROTLI)
+            self._gzip = None
+        else:
+            self._br = None
+            # wbits=31: cabeçalho e rodapé gzip
+            self._gzip = zlib.compressobj(COMPRESSAO_NIVEL_GZIP, zlib.DEFLATED, 31)
+
+    def comprimir(self, dados):
+        if self._br is not None:
+            return self._br.process(dados)
+        return self._gzip.compress(dados)
+
+    def finalizar(self):
+        if self._br is not None:
+            return self._br.finish()
+        return self._gzip.flush()
+
+
+class Compressao:
+    def __init__(self, app, minimo=COMPRESSAO_MIN_BYTES):
+        self.app = app
+        self.minimo = minimo
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        codificacao = escolher_codificacao(Headers(scope=scope).get('accept-encoding', ''))
+        if codificacao is None:
+            await self.app(scope, receive, send)
+            return
+
+        inicio = None
+        compressor = None
+
+        async def enviar(mensagem):
+            nonlocal inicio, compressor
+            if mensagem['type'] == 'http.response.start':
+                # Só decide ao ver o primeiro pedaço do corpo
+                inicio = mensagem
+                return
+            if mensagem['type'] != 'http.response.body':
+                await send(mensagem)
+                return
+
+            corpo = mensagem.get('body', b'')
+            continua = mensagem.get('more_body', False)
+
+            if inicio is not None:
+                mensagem_inicio, inicio = inicio, None
+                cabecalhos = MutableHeaders(raw=mensagem_inicio['headers'])
+                tipo = cabecalhos.get('content-type', '')
+                if (
+                    'content-encoding' in cabecalhos
+                    or not tipo.startswith(TIPOS_COMPRIMIVEIS)
+                    or (not continua and len(corpo) < self.minimo)
+                ):
+                    await send(mensagem_inicio)
+                    await send(mensagem)
+                    return
+
+                compressor = _Compressor(codificacao)
+                cabecalhos['Content-Encoding'] = codificacao
+                if 'accept-encoding' not in cabecalhos.get('vary', '').lower():
+                    cabecalhos.add_vary_header('Accept-Encoding')
+                if continua:
+                    del cabecalhos['content-length']
+                    await send(mensagem_inicio)
+                    await send({
+                        'type': 'http.response.body',
+                        'body': compressor.comprimir(corpo),
+                        'more_body': True,
+                    })
+                else:
+                    comprimido = compressor.comprimir(corpo) + compressor.finalizar()
+                    cabecalhos['Content-Length'] = str(len(comprimido))
+                    await send(mensagem_inicio)
+                    await send({'type': 'http.response.body', 'body': comprimido})
+                return
+
+            if compressor is None:
+                await send(mensagem)
+                return
+            dados = compressor.comprimir(corpo)
+            if not continua:
+                dados += compressor.finalizar()
+            elif not dados:
+                # O compressor ainda está acumulando o lote
+                return
+            await send({'type': 'http.response.body', 'body': dados, 'more_body': continua})
+
+        await self.app(scope, receive, enviar)
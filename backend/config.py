@@ -11,4 +11,75 @@ DB_CONFIG = {
     'password': os.getenv('DB_PASSWORD', 'postgres'),
     'host': os.getenv('DB_HOST', 'localhost'),
     'port': os.getenv('DB_PORT', '5432')
-} 
\ No newline at end of file
+}
+
+# Configurações do pool de conexões (por processo; ver dimensionar_pool em start.py)
+POOL_CONFIG = {
+    'min_size': int(os.getenv('DB_POOL_MIN', '2')),
+    'max_size': int(os.getenv('DB_POOL_MAX', '10')),
+    'timeout': float(os.getenv('DB_POOL_TIMEOUT', '10')),        # espera máxima para obter uma conexão (s)
+    'max_idle': float(os.getenv('DB_POOL_MAX_IDLE', '300')),     # fecha conexões ociosas acima do mínimo (s)
+    'max_lifetime': float(os.getenv('DB_POOL_MAX_LIFETIME', '3600'))
+}
+
+# Migrações de schema (ver migracoes.py)
+MIGRACOES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sql')
+DB_AUTO_MIGRATE = os.getenv('DB_AUTO_MIGRATE', 'True').lower() == 'true'
+
+# Versão dos dados (ver versao_dados.py) e catálogo de operadoras em memória
+VERSAO_DADOS_INTERVALO = float(os.getenv('VERSAO_DADOS_INTERVALO', '60'))
+CATALOGO_EM_MEMORIA = os.getenv('CATALOGO_EM_MEMORIA', 'True').lower() == 'true'
+
+# Paginação das rotas de listagem (ver paginacao.py)
+PAGINA_PADRAO = int(os.getenv('PAGINA_PADRAO', '100'))
+PAGINA_MAXIMA = int(os.getenv('PAGINA_MAXIMA', '1000'))
+
+# Cache de respostas das rotas analíticas (ver cache.py)
+CACHE_MAX_ITENS = int(os.getenv('CACHE_MAX_ITENS', '512'))
+CACHE_TTL = float(os.getenv('CACHE_TTL', '3600'))
+
+# Cache-Control por prefixo de rota (ver cache_http.py)
+CACHE_CONTROL = {
+    '/operadoras': os.getenv('CACHE_CONTROL_OPERADORAS', 'public, max-age=300'),
+    '/operadoras-ativas': os.getenv('CACHE_CONTROL_OPERADORAS', 'public, max-age=300'),
+    '/demonstracoes': os.getenv('CACHE_CONTROL_DEMONSTRACOES', 'public, max-age=3600'),
+    '/procedimentos': os.getenv('CACHE_CONTROL_PROCEDIMENTOS', 'public, max-age=3600'),
+}
+
+# Exportação em streaming (ver exportacao.py)
+EXPORTACAO_LOTE = int(os.getenv('EXPORTACAO_LOTE', '5000'))
+EXPORTACAO_MAX_SIMULTANEAS = int(os.getenv('EXPORTACAO_MAX_SIMULTANEAS', '2'))
+
+# Registro de consultas lentas (ver consultas_lentas.py)
+CONSULTA_LENTA_MS = float(os.getenv('CONSULTA_LENTA_MS', '500'))
+CONSULTA_LENTA_EXPLAIN_INTERVALO = float(os.getenv('CONSULTA_LENTA_EXPLAIN_INTERVALO', '300'))
+CONSULTA_LENTA_ARQUIVO = os.getenv(
+    'CONSULTA_LENTA_ARQUIVO',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'logs', 'consultas_lentas.jsonl')
+)
+CONSULTA_LENTA_ARQUIVO_MAX_MB = float(os.getenv('CONSULTA_LENTA_ARQUIVO_MAX_MB', '10'))
+CONSULTA_LENTA_ARQUIVO_BACKUPS = int(os.getenv('CONSULTA_LENTA_ARQUIVO_BACKUPS', '5'))
+CONSULTA_LENTA_MEMORIA = int(os.getenv('CONSULTA_LENTA_MEMORIA', '200'))
+
+# Token exigido (cabeçalho X-Admin-Token) pelos endpoints /admin; vazio desabilita
+ADMIN_TOKEN = os.getenv('ADMIN_TOKEN', '')
+
+# Logging (ver configuracao_logs.py)
+LOG_NIVEL = os.getenv('LOG_NIVEL', 'INFO').upper()
+LOG_NIVEIS = {
+    nome.strip(): nivel.strip().upper()
+    for nome, _, nivel in (
+        item.partition('=') for item in os.getenv('LOG_NIVEIS', '').split(',') if '=' in item
+    )
+}
+LOG_FORMATO = os.getenv('LOG_FORMATO', 'texto').lower()
+LOG_AMOSTRAGEM = float(os.getenv('LOG_AMOSTRAGEM', '1'))
+LOG_FILA_MAX = int(os.getenv('LOG_FILA_MAX', '10000'))
+
+# Compressão das respostas (ver compressao.py)
+COMPRESSAO_MIN_BYTES = int(os.getenv('COMPRESSAO_MIN_BYTES', '1024'))
+COMPRESSAO_NIVEL_GZIP = int(os.getenv('COMPRESSAO_NIVEL_GZIP', '6'))
+COMPRESSAO_QUALIDADE_BROTLI = int(os.getenv('COMPRESSAO_QUALIDADE_BROTLI', '4'))
+
+# Número de workers da API (definido por start.py --producao)
+API_WORKERS = int(os.getenv('API_WORKERS', '1'))
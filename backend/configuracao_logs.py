@@ -0,0 +1,195 @@
+"""
+Configuração de logging da API.
+
+Os registros são apenas enfileirados na thread da requisição; a formatação
+(inclusive das mensagens no estilo logger.info("... %s", valor)) e a escrita
+acontecem em uma thread de fundo (QueueListener). A fila tem tamanho máximo:
+quando enche, os registros são descartados em vez de bloquear a requisição.
+
+Níveis:
+- LOG_NIVEL define o nível padrão e LOG_NIVEIS ajusta loggers específicos,
+  por exemplo "database=DEBUG,uvicorn.access=WARNING"
+- Com LOG_AMOSTRAGEM < 1, só essa fração das requisições grava registros
+  abaixo de WARNING; avisos e erros são sempre gravados
+
+Loggers com destino próprio (registrar_destino, ex.: o arquivo JSON de
+consultas lentas) usam a mesma fila: o handler dedicado roda na thread de
+fundo e esses registros não passam pela amostragem.
+
+Threads não sobrevivem ao fork: nos workers do modo produção (start.py
+--producao) a fila e a thread de escrita são recriadas no processo filho.
+"""
+import atexit
+import contextvars
+import json
+import logging
+import os
+import queue
+import random
+import uuid
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+from config import LOG_NIVEL, LOG_NIVEIS, LOG_FORMATO, LOG_AMOSTRAGEM, LOG_FILA_MAX
+
+FORMATO_TEXTO = '%(asctime)s - %(name)s - %(levelname)s - %(requisicao)s - %(message)s'
+
+_requisicao = contextvars.ContextVar('requisicao', default='-')
+_amostrada = contextvars.ContextVar('amostrada', default=True)
+
+_listener = None
+_fila = None
+_saida = None
+_destinos = {}
+
+
+class FormatadorJson(logging.Formatter):
+    """Uma linha JSON por registro"""
+
+    def format(self, record):
+        dados = {
+            'momento': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'nivel': record.levelname,
+            'logger': record.name,
+            'requisicao': getattr(record, 'requisicao', '-'),
+            'mensagem': record.getMessage(),
+        }
+        if record.exc_info:
+            dados['excecao'] = self.formatException(record.exc_info)
+        return json.dumps(dados, ensure_ascii=False, default=str)
+
+
+class FiltroRequisicao(logging.Filter):
+    """
+    Roda na thread de quem loga: anexa o id da requisição ao registro e descarta
+    os registros abaixo de WARNING das requisições fora da amostra
+    """
+
+    def filter(self, record):
+        if record.levelno < logging.WARNING and not _amostrada.get() and record.name not in _destinos:
+            return False
+        record.requisicao = _requisicao.get()
+        return True
+
+
+class FilaSemBloqueio(QueueHandler):
+    """QueueHandler que adia a formatação para o listener e nunca bloqueia"""
+
+    def __init__(self, fila):
+        super().__init__(fila)
+        self.descartados = 0
+
+    def prepare(self, record):
+        # Mantém msg e args intactos: getMessage() só é chamado na thread de fundo
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.descartados += 1
+
+
+class Destinos(logging.Handler):
+    """
+    Handler da thread de fundo: entrega cada registro ao handler dedicado do
+    seu logger (registrar_destino) ou, para os demais, à saída padrão
+    """
+
+    def __init__(self, padrao):
+        super().__init__()
+        self.padrao = padrao
+
+    def handle(self, record):
+        destino = _destinos.get(record.name, self.padrao)
+        if record.levelno >= destino.level:
+            destino.handle(record)
+        return True
+
+    def emit(self, record):
+        self.handle(record)
+
+
+def registrar_destino(nome, handler):
+    """
+    Envia os registros do logger `nome` apenas para `handler` (arquivo dedicado,
+    por exemplo), escrito pela thread de fundo. Sem a fila configurada (scripts,
+    testes), o handler é ligado direto ao logger.
+    """
+    logger = logging.getLogger(nome)
+    if _listener is None:
+        logger.addHandler(handler)
+        logger.propagate = False
+    else:
+        _destinos[nome] = handler
+        logger.propagate = True
+    return logger
+
+
+def configurar_logs():
+    """Instala a fila no logger raiz e inicia a thread de escrita (uma única vez)"""
+    global _listener, _fila, _saida
+    if _listener is not None:
+        return
+
+    saida = logging.StreamHandler()
+    if LOG_FORMATO == 'json':
+        saida.setFormatter(FormatadorJson())
+    else:
+        saida.setFormatter(logging.Formatter(FORMATO_TEXTO, defaults={'requisicao': '-'}))
+
+    fila = FilaSemBloqueio(queue.Queue(LOG_FILA_MAX))
+    fila.addFilter(FiltroRequisicao())
+
+    raiz = logging.getLogger()
+    for handler in raiz.handlers[:]:
+        raiz.removeHandler(handler)
+    raiz.addHandler(fila)
+    raiz.setLevel(LOG_NIVEL)
+
+    # Os logs do uvicorn passam pela mesma fila
+    for nome in ('uvicorn', 'uvicorn.error', 'uvicorn.access'):
+        logger_uvicorn = logging.getLogger(nome)
+        logger_uvicorn.handlers.clear()
+        logger_uvicorn.propagate = True
+
+    for nome, nivel in LOG_NIVEIS.items():
+        logging.getLogger(nome).setLevel(nivel)
+
+    _fila, _saida = fila, Destinos(saida)
+    _listener = QueueListener(fila.queue, _saida, respect_handler_level=True)
+    _listener.start()
+    atexit.register(parar_logs)
+
+
+def _reiniciar_no_filho():
+    """Após o fork, usa uma fila nova (a herdada pode ter travas presas) e uma nova thread"""
+    global _listener
+    if _listener is None:
+        return
+    _fila.queue = queue.Queue(LOG_FILA_MAX)
+    _listener = QueueListener(_fila.queue, _saida, respect_handler_level=True)
+    _listener.start()
+
+
+os.register_at_fork(after_in_child=_reiniciar_no_filho)
+
+
+def parar_logs():
+    """Esvazia a fila e encerra a thread de escrita"""
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    _listener = None
+
+
+async def amostrar_requisicao(request, call_next):
+    """Middleware HTTP: gera o id da requisição e decide se ela entra na amostra de logs"""
+    token_requisicao = _requisicao.set(uuid.uuid4().hex[:12])
+    token_amostrada = _amostrada.set(LOG_AMOSTRAGEM >= 1 or random.random() < LOG_AMOSTRAGEM)
+    try:
+        return await call_next(request)
+    finally:
+        _amostrada.reset(token_amostrada)
+        _requisicao.reset(token_requisicao)
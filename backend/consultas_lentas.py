@@ -0,0 +1,192 @@
+"""
+Registro de consultas lentas.
+
+Toda consulta executada pelo CursorMedido (database.py) que passar de
+CONSULTA_LENTA_MS é gravada como uma linha JSON em um arquivo rotativo, com o
+SQL, o formato dos parâmetros (tipos, nunca valores), a duração e, no máximo
+uma vez a cada CONSULTA_LENTA_EXPLAIN_INTERVALO segundos por consulta, o plano
+de EXPLAIN (ANALYZE, BUFFERS). As últimas ocorrências ficam também em memória
+para o endpoint administrativo /admin/consultas-lentas.
+
+Com vários workers (API_WORKERS > 1) a memória de um processo não enxerga os
+demais: cada worker grava em seu próprio arquivo (consultas_lentas.<pid>.jsonl,
+o que também evita dois processos rotacionando o mesmo arquivo) e o endpoint
+lê o fim dos arquivos de todos eles.
+"""
+import asyncio
+import glob
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from collections import deque
+from datetime import datetime, timezone
+from logging.handlers import RotatingFileHandler
+
+from configuracao_logs import registrar_destino
+from config import (
+    CONSULTA_LENTA_MS, CONSULTA_LENTA_EXPLAIN_INTERVALO, CONSULTA_LENTA_ARQUIVO,
+    CONSULTA_LENTA_ARQUIVO_MAX_MB, CONSULTA_LENTA_ARQUIVO_BACKUPS, CONSULTA_LENTA_MEMORIA,
+    API_WORKERS
+)
+
+logger = logging.getLogger(__name__)
+
+_recentes = deque(maxlen=CONSULTA_LENTA_MEMORIA)
+_ultimo_explain = {}
+_tarefas = set()
+_arquivo = None
+
+
+def _caminho_arquivo(pid=None):
+    """Arquivo do processo: o configurado ou, com vários workers, um por pid ('*' para todos)"""
+    if API_WORKERS <= 1:
+        return CONSULTA_LENTA_ARQUIVO
+    raiz, extensao = os.path.splitext(CONSULTA_LENTA_ARQUIVO)
+    return f"{raiz}.{pid or os.getpid()}{extensao}"
+
+
+class FormatadorRegistro(logging.Formatter):
+    """Uma linha JSON com o registro (dict passado como mensagem), montada na thread de escrita"""
+
+    def format(self, record):
+        return json.dumps(record.msg, ensure_ascii=False, default=str)
+
+
+def _logger_arquivo():
+    """
+    Logger exclusivo do arquivo JSON, criado no primeiro registro (já no worker).
+    O arquivo é aberto, escrito e rotacionado pela thread de fundo dos logs
+    (configuracao_logs.registrar_destino), fora do event loop.
+    """
+    global _arquivo
+    if _arquivo is None:
+        os.makedirs(os.path.dirname(CONSULTA_LENTA_ARQUIVO) or '.', exist_ok=True)
+        handler = RotatingFileHandler(
+            _caminho_arquivo(),
+            maxBytes=int(CONSULTA_LENTA_ARQUIVO_MAX_MB * 1024 * 1024),
+            backupCount=CONSULTA_LENTA_ARQUIVO_BACKUPS,
+            encoding='utf-8',
+            delay=True,
+        )
+        handler.setFormatter(FormatadorRegistro())
+        _arquivo = registrar_destino('consultas_lentas.arquivo', handler)
+        _arquivo.setLevel(logging.INFO)
+    return _arquivo
+
+
+def formato_parametros(params):
+    """Descreve os parâmetros sem expor valores: tipos e, para listas, o tamanho"""
+    def tipo(valor):
+        if isinstance(valor, (list, tuple)):
+            return f"{type(valor).__name__}[{len(valor)}]"
+        return type(valor).__name__
+
+    if params is None:
+        return None
+    if isinstance(params, dict):
+        return {nome: tipo(valor) for nome, valor in params.items()}
+    return [tipo(valor) for valor in params]
+
+
+def _texto_sql(query):
+    if isinstance(query, bytes):
+        query = query.decode('utf-8', 'replace')
+    return re.sub(r'\s+', ' ', str(query)).strip()
+
+
+def _somente_leitura(sql):
+    # EXPLAIN ANALYZE executa a consulta: só é seguro para leituras
+    return sql.split(' ', 1)[0].upper() in ('SELECT', 'WITH')
+
+
+def _gravar(registro):
+    _recentes.append(registro)
+    # Só enfileira: o JSON (com o plano do EXPLAIN) é serializado na thread de escrita
+    _logger_arquivo().info(registro)
+    logger.warning("Consulta lenta (%.0f ms): %.200s", registro['duracao_ms'], registro['sql'])
+
+
+async def _explicar_e_gravar(explicar, query, params, registro):
+    try:
+        registro['plano'] = await explicar(query, params)
+    except Exception as e:
+        registro['erro_plano'] = str(e)
+    _gravar(registro)
+
+
+def registrar(query, params, duracao, linhas, explicar):
+    """
+    Chamado após cada consulta. Se ela passou do limite, grava o registro;
+    quando cabe no limite de EXPLAINs, agenda explicar(query, params) em segundo
+    plano (em outra conexão) e grava o registro com o plano.
+    """
+    duracao_ms = duracao * 1000
+    if CONSULTA_LENTA_MS <= 0 or duracao_ms < CONSULTA_LENTA_MS:
+        return
+
+    sql = _texto_sql(query)
+    impressao = hashlib.sha1(sql.encode('utf-8')).hexdigest()[:16]
+    registro = {
+        'momento': datetime.now(timezone.utc).isoformat(),
+        'impressao': impressao,
+        'sql': sql,
+        'parametros': formato_parametros(params),
+        'duracao_ms': round(duracao_ms, 2),
+        'linhas': linhas,
+    }
+
+    agora = time.monotonic()
+    ultimo = _ultimo_explain.get(impressao)
+    # Um EXPLAIN por vez: ele repete a consulta e ocupa mais uma conexão do pool
+    if (
+        not _tarefas
+        and _somente_leitura(sql)
+        and (ultimo is None or agora - ultimo >= CONSULTA_LENTA_EXPLAIN_INTERVALO)
+    ):
+        _ultimo_explain[impressao] = agora
+        tarefa = asyncio.get_running_loop().create_task(
+            _explicar_e_gravar(explicar, query, params, registro)
+        )
+        _tarefas.add(tarefa)
+        tarefa.add_done_callback(_tarefas.discard)
+    else:
+        _gravar(registro)
+
+
+def _registros_dos_arquivos():
+    """Últimos CONSULTA_LENTA_MEMORIA registros do arquivo de cada worker"""
+    registros = []
+    for caminho in glob.glob(_caminho_arquivo('*')):
+        try:
+            with open(caminho, encoding='utf-8') as arquivo:
+                linhas = deque(arquivo, maxlen=CONSULTA_LENTA_MEMORIA)
+        except OSError:
+            continue
+        for linha in linhas:
+            try:
+                registros.append(json.loads(linha))
+            except ValueError:
+                # Linha ainda sendo escrita por outro worker
+                continue
+    registros.sort(key=lambda registro: registro['momento'])
+    return registros
+
+
+def consultas_recentes(limite=50, min_ms=0.0):
+    """
+    Últimos registros, do mais recente para o mais antigo: da memória com um
+    único processo, dos arquivos de todos os workers no modo produção
+    (leitura de disco: chamar fora do event loop)
+    """
+    # tuple(): cópia atômica, o event loop pode acrescentar registros enquanto esta thread lê
+    registros = _registros_dos_arquivos() if API_WORKERS > 1 else tuple(_recentes)
+    resultado = []
+    for registro in reversed(registros):
+        if registro['duracao_ms'] >= min_ms:
+            resultado.append(registro)
+            if len(resultado) >= limite:
+                break
+    return resultado
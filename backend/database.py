@@ -0,0 +1,169 @@
+"""
+Camada de acesso ao banco de dados da API.
+
+Mantém um único pool de conexões assíncronas (psycopg 3) compartilhado por todas
+as rotas. O pool é aberto e fechado pelo lifespan da aplicação em main.py.
+"""
+import logging
+import time
+import uuid
+from contextlib import asynccontextmanager
+
+from psycopg import AsyncCursor
+from psycopg.conninfo import make_conninfo
+from psycopg.rows import dict_row
+from psycopg_pool import AsyncConnectionPool
+
+from config import DB_CONFIG, POOL_CONFIG
+from metricas import AQUISICAO_CONEXAO, EXECUCAO_CONSULTA, LINHAS_RETORNADAS
+import consultas_lentas
+
+logger = logging.getLogger(__name__)
+
+_pool = None
+
+
+class CursorMedido(AsyncCursor):
+    """Cursor que registra o tempo de execução e as linhas retornadas de cada consulta"""
+
+    async def execute(self, query, params=None, **kwargs):
+        inicio = time.perf_counter()
+        resultado = await super().execute(query, params, **kwargs)
+        duracao = time.perf_counter() - inicio
+        EXECUCAO_CONSULTA.observe(duracao)
+        linhas = self.rowcount if self.description is not None else None
+        if linhas is not None and linhas >= 0:
+            LINHAS_RETORNADAS.observe(linhas)
+        consultas_lentas.registrar(query, params, duracao, linhas, explicar)
+        return resultado
+
+
+async def explicar(query, params=None):
+    """
+    Executa EXPLAIN (ANALYZE, BUFFERS) da consulta em outra conexão do pool, dentro
+    de uma transação somente leitura desfeita ao final, e retorna o plano em JSON
+    """
+    async with obter_conexao() as conn:
+        async with conn.transaction(force_rollback=True):
+            # Cursor sem medição, para o EXPLAIN não ser registrado como consulta lenta
+            async with AsyncCursor(conn) as cur:
+                await cur.execute("SET TRANSACTION READ ONLY")
+                await cur.execute(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {query}", params)
+                linha = await cur.fetchone()
+    return linha['QUERY PLAN']
+
+
+async def abrir_pool():
+    """
+    Cria o pool de conexões e aguarda até que as conexões mínimas estejam prontas
+    """
+    global _pool
+    if _pool is not None:
+        return _pool
+
+    _pool = AsyncConnectionPool(
+        conninfo=make_conninfo(**DB_CONFIG, options="-c client_encoding=UTF8"),
+        kwargs={"row_factory": dict_row, "cursor_factory": CursorMedido},
+        min_size=POOL_CONFIG['min_size'],
+        max_size=POOL_CONFIG['max_size'],
+        timeout=POOL_CONFIG['timeout'],
+        max_idle=POOL_CONFIG['max_idle'],
+        max_lifetime=POOL_CONFIG['max_lifetime'],
+        # Valida a conexão antes de entregá-la a uma requisição
+        check=AsyncConnectionPool.check_connection,
+        name="api",
+        open=False,
+    )
+    await _pool.open(wait=True, timeout=POOL_CONFIG['timeout'])
+    logger.info(
+        "Pool de conexões aberto (min=%s, max=%s)",
+        POOL_CONFIG['min_size'], POOL_CONFIG['max_size']
+    )
+    return _pool
+
+
+async def fechar_pool():
+    """Fecha o pool de conexões, aguardando a devolução das conexões em uso"""
+    global _pool
+    if _pool is None:
+        return
+    await _pool.close()
+    _pool = None
+    logger.info("Pool de conexões fechado")
+
+
+def get_pool():
+    """Retorna o pool ativo; falha se o lifespan ainda não o abriu"""
+    if _pool is None:
+        raise RuntimeError("Pool de conexões não inicializado")
+    return _pool
+
+
+@asynccontextmanager
+async def obter_conexao():
+    """
+    Empresta uma conexão do pool. Lança PoolTimeout se nenhuma conexão ficar
+    disponível dentro de POOL_CONFIG['timeout'] segundos.
+    """
+    inicio = time.perf_counter()
+    async with get_pool().connection() as conn:
+        AQUISICAO_CONEXAO.observe(time.perf_counter() - inicio)
+        yield conn
+
+
+@asynccontextmanager
+async def obter_cursor():
+    """Empresta uma conexão do pool e abre um cursor que retorna dicionários"""
+    async with obter_conexao() as conn:
+        async with conn.cursor() as cur:
+            yield cur
+
+
+async def buscar_todos(query, params=None, preparar=False):
+    """
+    Executa a consulta e retorna todas as linhas como lista de dicionários.
+    Com preparar=True a consulta é executada como prepared statement na conexão
+    (ver repositorio.py); use apenas com textos SQL fixos.
+    """
+    async with obter_cursor() as cur:
+        await cur.execute(query, params, prepare=True if preparar else None)
+        return await cur.fetchall()
+
+
+async def buscar_um(query, params=None, preparar=False):
+    """Executa a consulta e retorna a primeira linha (ou None)"""
+    async with obter_cursor() as cur:
+        await cur.execute(query, params, prepare=True if preparar else None)
+        return await cur.fetchone()
+
+
+async def iterar_lotes(query, params=None, tamanho_lote=5000, row_factory=dict_row):
+    """
+    Executa a consulta em um cursor nomeado (server-side) e entrega as linhas em
+    lotes de `tamanho_lote`, sem materializar o resultado inteiro na memória.
+    A conexão fica emprestada do pool até o gerador terminar ou ser fechado.
+    """
+    async with obter_conexao() as conn:
+        nome = f"cursor_{uuid.uuid4().hex}"
+        async with conn.cursor(name=nome, row_factory=row_factory) as cur:
+            cur.itersize = tamanho_lote
+            inicio = time.perf_counter()
+            await cur.execute(query, params)
+            EXECUCAO_CONSULTA.observe(time.perf_counter() - inicio)
+            total = 0
+            try:
+                while True:
+                    linhas = await cur.fetchmany(tamanho_lote)
+                    if not linhas:
+                        break
+                    total += len(linhas)
+                    yield linhas
+            finally:
+                LINHAS_RETORNADAS.observe(total)
+
+
+def estatisticas_pool():
+    """Retorna as estatísticas do pool (conexões em uso, fila de espera, etc.)"""
+    if _pool is None:
+        return {}
+    return _pool.get_stats()
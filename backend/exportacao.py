@@ -0,0 +1,121 @@
+"""
+Exportação em streaming de demonstrações contábeis (NDJSON ou CSV).
+
+As linhas são lidas por um cursor server-side em lotes e escritas na resposta
+à medida que chegam: a memória usada não depende do tamanho do período, e um
+cliente lento segura o próximo FETCH, já que o envio de cada lote só termina
+quando o servidor consegue escrevê-lo no socket.
+"""
+import csv
+import io
+import json
+from datetime import date
+from decimal import Decimal
+
+from psycopg.rows import dict_row, tuple_row
+
+from config import EXPORTACAO_LOTE, EXPORTACAO_MAX_SIMULTANEAS
+from database import iterar_lotes
+
+FORMATOS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv; charset=utf-8',
+}
+
+COLUNAS_DEMONSTRACOES = [
+    'data_demonstracao', 'registro_ans', 'conta', 'descricao', 'saldo_inicial', 'saldo_final'
+]
+
+QUERY_DEMONSTRACOES = """
+    SELECT data_demonstracao, registro_ans, conta, descricao,
+           saldo_inicial, saldo_final
+    FROM demonstracoes_contabeis
+    WHERE data_demonstracao BETWEEN %(inicio)s AND %(fim)s
+    ORDER BY data_demonstracao, id
+"""
+
+class LimiteExportacoes:
+    """
+    Vagas de exportação simultânea: cada exportação mantém uma conexão do pool
+    ocupada enquanto transmite. reservar() verifica e ocupa a vaga no mesmo
+    passo, sem await entre os dois, e nunca espera: sem vaga, retorna None.
+    """
+
+    def __init__(self, maximo):
+        self.maximo = maximo
+        self.em_uso = 0
+
+    def reservar(self):
+        if self.em_uso >= self.maximo:
+            return None
+        self.em_uso += 1
+        return Vaga(self)
+
+
+class Vaga:
+    """Vaga reservada; liberar() pode ser chamada mais de uma vez"""
+
+    def __init__(self, limite):
+        self._limite = limite
+
+    def liberar(self):
+        if self._limite is not None:
+            self._limite.em_uso -= 1
+            self._limite = None
+
+
+exportacoes_simultaneas = LimiteExportacoes(EXPORTACAO_MAX_SIMULTANEAS)
+
+
+def _json_padrao(valor):
+    if isinstance(valor, Decimal):
+        return float(valor)
+    if isinstance(valor, date):
+        return valor.isoformat()
+    raise TypeError(f"Tipo não serializável: {type(valor).__name__}")
+
+
+async def _ndjson(lotes):
+    async for linhas in lotes:
+        yield ''.join(
+            json.dumps(linha, default=_json_padrao, ensure_ascii=False) + '\n'
+            for linha in linhas
+        ).encode('utf-8')
+
+
+async def _csv(lotes, colunas):
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer, delimiter=';', lineterminator='\n')
+    escritor.writerow(colunas)
+    async for linhas in lotes:
+        escritor.writerows(linhas)
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+
+async def exportar_demonstracoes(data_inicio, data_fim, formato, vaga):
+    """
+    Gerador de bytes com as demonstrações do período no formato pedido. A
+    `vaga` (reservada pela rota) é liberada quando o gerador termina.
+    """
+    try:
+        params = {'inicio': data_inicio, 'fim': data_fim}
+        if formato == 'csv':
+            lotes = iterar_lotes(QUERY_DEMONSTRACOES, params, EXPORTACAO_LOTE, row_factory=tuple_row)
+            partes = _csv(lotes, COLUNAS_DEMONSTRACOES)
+        else:
+            lotes = iterar_lotes(QUERY_DEMONSTRACOES, params, EXPORTACAO_LOTE, row_factory=dict_row)
+            partes = _ndjson(lotes)
+        # Fecha explicitamente os geradores para devolver a conexão ao pool
+        # mesmo quando o cliente desconecta no meio da transmissão
+        try:
+            async for parte in partes:
+                yield parte
+        finally:
+            await partes.aclose()
+            await lotes.aclose()
+    finally:
+        vaga.liberar()
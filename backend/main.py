@@ -1,29 +1,70 @@
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, Header, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
-import psycopg2
-from psycopg2.extras import RealDictCursor
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+import asyncio
 import os
+import re
+import secrets
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 import logging
-import traceback
-from config import DB_CONFIG
-import unicodedata
-
-# Configuração de logging mais detalhada
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+from datetime import date
+from typing import List, Literal, Optional
+from config import (
+    DB_AUTO_MIGRATE, CATALOGO_EM_MEMORIA, PAGINA_PADRAO, PAGINA_MAXIMA,
+    ADMIN_TOKEN, CONSULTA_LENTA_MEMORIA, API_WORKERS, POOL_CONFIG
 )
+from database import abrir_pool, fechar_pool, obter_conexao, buscar_todos, estatisticas_pool
+from migracoes import aplicar_migracoes
+from versao_dados import registrar_ouvinte, iniciar_monitoramento, parar_monitoramento
+from catalogo import catalogo_atual, recarregar_catalogo, chave_nome
+from paginacao import decodificar_cursor, montar_pagina
+from cache import em_cache, invalidar_cache, cache_respostas
+from cache_http import requisicao_condicional
+from exportacao import FORMATOS, exportacoes_simultaneas, exportar_demonstracoes
+from schemas import BuscaLoteOperadoras, DespesaTrimestre, DespesaAno, TendenciaMensal
+from repositorio import (
+    operadora_por_cnpj, operadoras_por_valores, operadoras_por_texto,
+    operadoras_por_uf, operadoras_ativas_por_cidade, facetas_operadoras
+)
+from metricas import medir_requisicoes, registrar_coletor, resposta_metricas
+from consultas_lentas import consultas_recentes
+from configuracao_logs import configurar_logs, amostrar_requisicao
+from respostas import resposta_json, validar_resposta
+from compressao import Compressao
+
+# Logging assíncrono (fila + thread de escrita); ver configuracao_logs.py
+configurar_logs()
 logger = logging.getLogger(__name__)
 
 # Carrega variáveis de ambiente
 load_dotenv()
 
 # Log das variáveis de ambiente (sem senha)
-logger.debug(f"DB_NAME: {os.getenv('DB_NAME')}")
-logger.debug(f"DB_USER: {os.getenv('DB_USER')}")
-logger.debug(f"DB_HOST: {os.getenv('DB_HOST')}")
-logger.debug(f"DB_PORT: {os.getenv('DB_PORT')}")
+logger.debug("DB_NAME: %s", os.getenv('DB_NAME'))
+logger.debug("DB_USER: %s", os.getenv('DB_USER'))
+logger.debug("DB_HOST: %s", os.getenv('DB_HOST'))
+logger.debug("DB_PORT: %s", os.getenv('DB_PORT'))
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Abre o pool de conexões na subida da API e o fecha no desligamento"""
+    await abrir_pool()
+    try:
+        if DB_AUTO_MIGRATE:
+            async with obter_conexao() as conn:
+                await aplicar_migracoes(conn)
+        await iniciar_monitoramento()
+        yield
+    finally:
+        await parar_monitoramento()
+        await fechar_pool()
+
+if CATALOGO_EM_MEMORIA:
+    registrar_ouvinte(recarregar_catalogo)
+registrar_ouvinte(invalidar_cache)
+registrar_coletor(estatisticas_pool, cache_respostas.estatisticas)
 
 app = FastAPI(
     title="API de Busca de Operadoras de Saúde",
@@ -89,6 +130,7 @@ app = FastAPI(
        ```
        - Busca todas as operadoras de uma cidade
        - Case insensitive e ignora acentos
+       - Resultados mais parecidos com o termo aparecem primeiro
        - Exemplo: /operadoras/cidade/sao%20paulo
 
     3. **Busca por Nome Fantasia**
@@ -97,6 +139,7 @@ app = FastAPI(
        ```
        - Busca por nome fantasia (busca parcial)
        - Case insensitive e ignora acentos
+       - Resultados mais parecidos com o termo aparecem primeiro
        - Exemplo: /operadoras/nome-fantasia/unimed
 
     4. **Busca por Razão Social**
@@ -105,6 +148,7 @@ app = FastAPI(
        ```
        - Busca por razão social (busca parcial)
        - Case insensitive e ignora acentos
+       - Resultados mais parecidos com o termo aparecem primeiro
        - Exemplo: /operadoras/razao-social/saude
 
     5. **Busca por UF**
@@ -115,6 +159,21 @@ app = FastAPI(
        - Case insensitive
        - Exemplo: /operadoras/uf/SP
 
+    6. **Busca em Lote**
+       ```
+       POST /operadoras/lote
+       {"tipo": "cnpj", "valores": ["12345678901234", "..."]}
+       ```
+       - Resolve até 5000 CNPJs (ou registros ANS, com `"tipo": "registro_ans"`) em uma única chamada
+       - Retorna `resultados` indexado pelo valor informado (`null` quando não encontrado) e `nao_encontrados`
+
+    7. **Facetas**
+       ```
+       GET /operadoras/facetas?uf=SP&modalidade=...&cidade=...&ativa=true
+       ```
+       - Quantidade de operadoras por UF, modalidade e cidade, com filtros opcionais
+       - Cada faceta aplica os demais filtros e ignora o próprio
+
     ### Análises Financeiras
 
     1. **Maiores Despesas em Eventos/Sinistros**
@@ -122,7 +181,9 @@ app = FastAPI(
        GET /demonstracoes/maiores-despesas-eventos
        ```
        - Retorna as 10 operadoras com maiores despesas em eventos/sinistros médico-hospitalares no último trimestre (4º trimestre do ano anterior)
+       - Parâmetros opcionais `ano` e `trimestre` consultam outros períodos
        - Ordenado por valor de despesa (decrescente)
+       - Ranking pré-calculado pelo ETL (views materializadas `ranking_despesas_trimestre` e `ranking_despesas_ano`)
        - Retorna:
          * Nome da operadora
          * Registro ANS
@@ -130,6 +191,16 @@ app = FastAPI(
          * Trimestre de referência
          * Ranking
 
+    2. **Séries de Despesas**
+       ```
+       GET /demonstracoes/series/trimestral?registro_ans=...|modalidade=...
+       GET /demonstracoes/series/anual
+       GET /demonstracoes/series/tendencia
+       ```
+       - Despesas por trimestre ou por ano de uma operadora, de uma modalidade ou do mercado inteiro
+       - Lidas do resumo trimestral montado pelo ETL (`resumo_demonstracoes_trimestre`)
+       - `conta` troca a conta contábil (padrão: eventos/sinistros médico-hospitalares)
+
     ## Formato de Retorno
 
     Todas as buscas retornam os seguintes campos quando disponíveis:
@@ -166,8 +237,47 @@ app = FastAPI(
     }
     ```
 
+    ### Exportação
+
+    ```
+    GET /demonstracoes/exportar/{data_inicio}/{data_fim}?formato=ndjson|csv
+    ```
+    - Transmite todas as demonstrações do período, sem limite de linhas
+    - Datas no formato `AAAA-MM-DD`; datas inválidas retornam `422` e período invertido, `400`
+    - `ndjson` (padrão): um objeto JSON por linha; `csv`: separado por `;` com cabeçalho
+
+    ## Paginação
+
+    As listagens (`/operadoras/cidade`, `/nome-fantasia`, `/razao-social`, `/uf`,
+    `/operadoras-ativas/cidade`, `/demonstracoes/periodo`, `/demonstracoes/saldo-negativo`
+    `/procedimentos/grupo` e `/procedimentos/busca`) usam paginação por cursor:
+    ```json
+    {
+        "items": [ ... ],
+        "next_cursor": "WyJ1bmltZWQiLCIxMjM0NTYiXQ"
+    }
+    ```
+    - `limite`: tamanho da página (padrão 100)
+    - `cursor`: valor de `next_cursor` da página anterior; `null` indica a última página
+
+    ## Cache HTTP
+
+    As rotas de consulta enviam `ETag`, `Last-Modified` (data da última carga do ETL) e
+    `Cache-Control`. Requisições com `If-None-Match` ou `If-Modified-Since` ainda válidos
+    recebem `304 Not Modified` sem corpo quando a rota responderia com sucesso.
+
+    ## Compressão
+
+    Respostas JSON, NDJSON e CSV acima de 1 KB são comprimidas com `br` ou `gzip`, conforme o
+    cabeçalho `Accept-Encoding`.
+
+    ## Métricas
+
+    `GET /metrics` expõe, no formato do Prometheus, a latência por rota, o tempo de espera por
+    conexão, o tempo das consultas, as linhas retornadas, a ocupação do pool e o uso do cache.
+
     ## Notas Importantes
-    - Todas as buscas são paginadas com limite de 100 registros
+    - As listagens são paginadas por cursor (100 registros por página por padrão)
     - Buscas textuais ignoram acentuação e são case-insensitive
     - O campo `is_ativa` indica se a operadora está na tabela `operadoras_ativas`
     - Campos podem retornar nulos quando não disponíveis
@@ -178,9 +288,22 @@ app = FastAPI(
     contact={
         "name": "Suporte API Operadoras",
         "email": "suporte@operadoras.com"
-    }
+    },
+    lifespan=lifespan
 )
 
+# ETag / Last-Modified / Cache-Control a partir da versão dos dados do ETL
+app.middleware("http")(requisicao_condicional)
+
+# Compressão br/gzip negociada; fica por fora do middleware acima
+app.add_middleware(Compressao)
+
+# Latência por rota (inclui as respostas 304 do middleware acima)
+app.middleware("http")(medir_requisicoes)
+
+# Id da requisição e amostragem dos logs
+app.middleware("http")(amostrar_requisicao)
+
 # Configuração CORS
 app.add_middleware(
     CORSMiddleware,
@@ -190,521 +313,625 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-def normalize_text(text):
-    """Remove acentos e converte para minúsculo"""
-    if not text:
-        return text
-    # Normaliza para forma NFD e remove diacríticos
-    text = unicodedata.normalize('NFD', text).encode('ascii', 'ignore').decode('utf-8')
-    return text.lower()
-
-def get_db_connection():
-    """
-    Cria uma conexão com o banco de dados com as configurações corretas de encoding
-    """
-    try:
-        logger.debug("Tentando conectar ao banco de dados...")
-        conn = psycopg2.connect(
-            **DB_CONFIG,
-            options="-c client_encoding=UTF8"
-        )
-        logger.debug("Conexão com banco de dados estabelecida com sucesso!")
-        return conn
-    except Exception as e:
-        logger.error(f"Erro ao conectar ao banco de dados: {str(e)}")
-        logger.error(f"Traceback completo: {traceback.format_exc()}")
-        raise
-
 @app.get("/")
 async def root():
     """Rota de teste para verificar se a API está funcionando"""
-    return {"status": "online", "message": "API está funcionando"}
+    return {
+        "status": "online",
+        "message": "API está funcionando",
+        "workers": API_WORKERS,
+        "pid": os.getpid(),
+        "pool_max": POOL_CONFIG['max_size']
+    }
+
+@app.get("/metrics", include_in_schema=False)
+async def metricas():
+    """Métricas no formato texto do Prometheus"""
+    return resposta_metricas()
+
+def _verificar_admin(token):
+    if not ADMIN_TOKEN or not secrets.compare_digest(token or '', ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Acesso negado")
+
+@app.get("/admin/consultas-lentas", include_in_schema=False)
+@resposta_json
+async def listar_consultas_lentas(
+    limite: int = Query(50, ge=1, le=CONSULTA_LENTA_MEMORIA),
+    min_ms: float = Query(0, ge=0),
+    x_admin_token: Optional[str] = Header(None)
+):
+    """Últimas consultas lentas registradas (de todos os workers; mais recentes primeiro)"""
+    _verificar_admin(x_admin_token)
+    return await asyncio.to_thread(consultas_recentes, limite, min_ms)
 
 @app.get("/operadoras/cnpj/{cnpj}")
+@resposta_json
 async def buscar_operadora_cnpj(cnpj: str):
     """Busca uma operadora pelo CNPJ"""
     try:
-        conn = get_db_connection()
-        cur = conn.cursor(cursor_factory=RealDictCursor)
-        cur.execute("""
-            SELECT 
-                o.registro_ans, 
-                o.cnpj, 
-                o.razao_social, 
-                o.nome_fantasia, 
-                o.modalidade,
-                o.logradouro,
-                o.numero,
-                o.complemento,
-                o.bairro,
-                o.cidade,
-                o.uf,
-                o.cep,
-                oa.telefone,
-                oa.email,
-                oa.representante,
-                oa.data_registro_ans,
-                CASE 
-                    WHEN oa.registro_ans IS NOT NULL THEN true
-                    ELSE false
-                END as is_ativa
-            FROM operadoras o
-            LEFT JOIN operadoras_ativas oa ON o.registro_ans = oa.registro_ans
-            WHERE o.cnpj = %s
-        """, (cnpj,))
-        resultado = cur.fetchone()
-        cur.close()
-        conn.close()
+        catalogo = catalogo_atual()
+        if catalogo is not None:
+            resultado = catalogo.buscar_cnpj(cnpj)
+        else:
+            resultado = await operadora_por_cnpj(cnpj)
         
         if not resultado:
             raise HTTPException(status_code=404, detail="Operadora não encontrada")
         return resultado
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Erro ao buscar operadora: {e}")
+        logger.error("Erro ao buscar operadora: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/operadoras/lote")
+@resposta_json
+async def buscar_operadoras_lote(busca: BuscaLoteOperadoras):
+    """
+    Busca várias operadoras de uma vez por CNPJ ou registro ANS.
+    Retorna o resultado indexado pelo valor informado, com null (e a lista
+    nao_encontrados) para os valores sem operadora correspondente.
+    """
+    try:
+        valores = list(dict.fromkeys(valor.strip() for valor in busca.valores))
+
+        catalogo = catalogo_atual()
+        if catalogo is not None:
+            indice = catalogo.por_cnpj if busca.tipo == 'cnpj' else catalogo.por_registro_ans
+            encontrados = {valor: indice[valor] for valor in valores if valor in indice}
+        else:
+            linhas = await operadoras_por_valores(busca.tipo, valores)
+            encontrados = {linha[busca.tipo]: linha for linha in linhas}
+
+        nao_encontrados = [valor for valor in valores if valor not in encontrados]
+        return {
+            "resultados": {valor: encontrados.get(valor) for valor in valores},
+            "total_encontrados": len(encontrados),
+            "nao_encontrados": nao_encontrados
+        }
+    except Exception as e:
+        logger.error("Erro ao buscar operadoras em lote: %s", e)
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/operadoras/facetas")
+@resposta_json
+@em_cache
+async def contar_operadoras_facetas(
+    uf: Optional[str] = None,
+    modalidade: Optional[str] = None,
+    cidade: Optional[str] = Query(None, description="Parte do nome da cidade, sem diferenciar acentos"),
+    ativa: Optional[bool] = None,
+    limite: int = Query(PAGINA_PADRAO, ge=1, le=PAGINA_MAXIMA, description="Máximo de valores por faceta")
+):
+    """
+    Quantidade de operadoras por UF, modalidade e cidade. Cada faceta aplica
+    os demais filtros e ignora o próprio; `total` aplica todos.
+    """
+    try:
+        catalogo = catalogo_atual()
+        if catalogo is not None:
+            return catalogo.facetas(uf, modalidade, cidade, ativa, limite)
+        return await facetas_operadoras(uf, modalidade, cidade, ativa, limite)
+    except Exception as e:
+        logger.error("Erro ao contar facetas de operadoras: %s", e)
+        raise HTTPException(status_code=500, detail=str(e))
+
+# Tipos do cursor das buscas textuais: (relevância, coluna de ordem, registro_ans)
+CURSOR_TEXTO = (float, str, str)
+
+def _chave_texto_banco(ordem):
+    return lambda linha: [linha['_relevancia'], linha[ordem] or '', linha['registro_ans']]
+
 @app.get("/operadoras/cidade/{cidade}")
-async def buscar_por_cidade(cidade: str):
+@resposta_json
+async def buscar_por_cidade(
+    cidade: str,
+    limite: int = Query(PAGINA_PADRAO, ge=1, le=PAGINA_MAXIMA),
+    cursor: Optional[str] = None
+):
     """
     Busca operadoras por cidade
     """
     try:
-        logger.info(f"Recebida busca por cidade: {cidade}")
-        conn = get_db_connection()
-        cur = conn.cursor(cursor_factory=RealDictCursor)
-        
-        # Criar função de normalização no PostgreSQL se não existir
-        cur.execute("""
-            CREATE OR REPLACE FUNCTION normalize_text(text)
-            RETURNS text AS
-            $$
-            BEGIN
-                RETURN translate(
-                    lower($1),
-                    'áàâãäéèêëíìîïóòôõöúùûüýÿçñ',
-                    'aaaaaeeeeiiiioooouuuuyycn'
-                );
-            END;
-            $$ LANGUAGE plpgsql IMMUTABLE;
-        """)
-        
-        query = """
-            SELECT 
-                o.registro_ans,
-                o.nome_fantasia,
-                o.razao_social,
-                o.cnpj,
-                o.modalidade,
-                o.logradouro,
-                o.numero,
-                o.complemento,
-                o.bairro,
-                o.cidade,
-                o.uf,
-                o.cep,
-                oa.telefone,
-                oa.email,
-                oa.representante,
-                oa.data_registro_ans,
-                CASE 
-                    WHEN oa.registro_ans IS NOT NULL THEN true
-                    ELSE false
-                END as is_ativa
-            FROM operadoras o
-            LEFT JOIN operadoras_ativas oa ON o.registro_ans = oa.registro_ans
-            WHERE normalize_text(o.cidade) LIKE normalize_text(%s)
-            ORDER BY o.nome_fantasia
-            LIMIT 100
-        """
-        
-        search_term = f'%{cidade}%'
-        logger.info(f"Executando busca com termo: {search_term}")
-        
-        cur.execute(query, (search_term,))
-        resultados = cur.fetchall()
-        
-        cur.close()
-        conn.close()
-        
-        return resultados
+        logger.debug("Recebida busca por cidade: %s", cidade)
+        apos = decodificar_cursor(cursor, CURSOR_TEXTO)
+
+        catalogo = catalogo_atual()
+        if catalogo is not None:
+            resultados = catalogo.buscar_texto('cidade', cidade, apos=apos, limite=limite + 1)
+            return montar_pagina(resultados, limite, catalogo.chave_texto('cidade', cidade))
+
+        resultados = await operadoras_por_texto('cidade', cidade, apos, limite + 1)
+
+        return montar_pagina(resultados, limite, _chave_texto_banco('nome_fantasia'), ocultar=('_relevancia',))
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Erro ao buscar por cidade: {str(e)}")
+        logger.error("Erro ao buscar por cidade: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/operadoras-ativas/cidade/{cidade}")
-async def buscar_operadoras_ativas_cidade(cidade: str):
+@resposta_json
+async def buscar_operadoras_ativas_cidade(
+    cidade: str,
+    limite: int = Query(PAGINA_PADRAO, ge=1, le=PAGINA_MAXIMA),
+    cursor: Optional[str] = None
+):
     """Busca operadoras ativas por cidade"""
     try:
-        conn = get_db_connection()
-        cur = conn.cursor(cursor_factory=RealDictCursor)
-        cur.execute("""
-            SELECT registro_ans, cnpj, razao_social, nome_fantasia, modalidade, 
-                   logradouro, numero, complemento, bairro, cidade, uf, cep,
-                   telefone, email, representante
-            FROM operadoras_ativas 
-            WHERE unaccent(LOWER(cidade)) LIKE unaccent(LOWER(%s))
-            LIMIT 100
-        """, (f"%{cidade}%",))
-        resultados = cur.fetchall()
-        cur.close()
-        conn.close()
-        return resultados
+        apos = decodificar_cursor(cursor, CURSOR_TEXTO)
+        resultados = await operadoras_ativas_por_cidade(cidade, apos, limite + 1)
+        return montar_pagina(resultados, limite, _chave_texto_banco('nome_fantasia'), ocultar=('_relevancia',))
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Erro ao buscar operadoras ativas: {e}")
+        logger.error("Erro ao buscar operadoras ativas: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/demonstracoes/periodo/{data_inicio}/{data_fim}")
-async def buscar_demonstracoes_periodo(data_inicio: str, data_fim: str):
+@resposta_json
+@em_cache
+async def buscar_demonstracoes_periodo(
+    data_inicio: str,
+    data_fim: str,
+    limite: int = Query(PAGINA_PADRAO, ge=1, le=PAGINA_MAXIMA),
+    cursor: Optional[str] = None
+):
     """Busca demonstrações por período"""
     try:
-        conn = get_db_connection()
-        cur = conn.cursor(cursor_factory=RealDictCursor)
-        cur.execute("""
-            SELECT data_demonstracao, registro_ans, conta, descricao, 
-                   saldo_inicial, saldo_final
-            FROM demonstracoes_contabeis 
-            WHERE data_demonstracao BETWEEN %s AND %s
-            ORDER BY data_demonstracao
-            LIMIT 100
-        """, (data_inicio, data_fim))
-        resultados = cur.fetchall()
-        cur.close()
-        conn.close()
-        return resultados
+        apos = decodificar_cursor(cursor, (date, int))
+        resultados = await buscar_todos("""
+            SELECT data_demonstracao, registro_ans, conta, descricao,
+                   saldo_inicial, saldo_final, id as _id
+            FROM demonstracoes_contabeis
+            WHERE data_demonstracao BETWEEN %(inicio)s AND %(fim)s{apos}
+            ORDER BY data_demonstracao, id
+            LIMIT %(limite)s
+        """.format(apos="""
+              AND (data_demonstracao, id) > (%(data)s::date, %(id)s)""" if apos else ''), {
+            'inicio': data_inicio,
+            'fim': data_fim,
+            'limite': limite + 1,
+            **({'data': apos[0], 'id': apos[1]} if apos else {})
+        })
+        return montar_pagina(
+            resultados, limite,
+            lambda linha: [linha['data_demonstracao'], linha['_id']],
+            ocultar=('_id',)
+        )
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Erro ao buscar demonstrações: {e}")
+        logger.error("Erro ao buscar demonstrações: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/demonstracoes/exportar/{data_inicio}/{data_fim}")
+async def exportar_demonstracoes_periodo(
+    data_inicio: date,
+    data_fim: date,
+    formato: Literal['ndjson', 'csv'] = 'ndjson'
+):
+    """
+    Exporta todas as demonstrações do período em streaming (NDJSON ou CSV),
+    sem limite de linhas. Datas e formato são validados antes do início da
+    transmissão: depois do 200 não há como devolver um erro, só cortar o corpo.
+    """
+    if data_inicio > data_fim:
+        raise HTTPException(status_code=400, detail="data_inicio deve ser anterior ou igual a data_fim")
+    vaga = exportacoes_simultaneas.reservar()
+    if vaga is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Limite de exportações simultâneas atingido, tente novamente em instantes"
+        )
+    nome_arquivo = f"demonstracoes_{data_inicio}_{data_fim}.{formato}"
+    # O gerador libera a vaga ao terminar; a tarefa de fundo cobre a resposta
+    # encerrada antes de o gerador começar (um gerador nunca iniciado não roda o finally)
+    return StreamingResponse(
+        exportar_demonstracoes(data_inicio, data_fim, formato, vaga),
+        media_type=FORMATOS[formato],
+        headers={'Content-Disposition': f'attachment; filename="{nome_arquivo}"'},
+        background=BackgroundTask(vaga.liberar)
+    )
+
 @app.get("/demonstracoes/saldo-negativo")
-async def buscar_demonstracoes_saldo_negativo():
+@resposta_json
+@em_cache
+async def buscar_demonstracoes_saldo_negativo(
+    limite: int = Query(PAGINA_PADRAO, ge=1, le=PAGINA_MAXIMA),
+    cursor: Optional[str] = None
+):
     """Busca demonstrações com saldo negativo"""
     try:
-        conn = get_db_connection()
-        cur = conn.cursor(cursor_factory=RealDictCursor)
-        cur.execute("""
-            SELECT data_demonstracao, registro_ans, conta, descricao, 
-                   saldo_inicial, saldo_final
-            FROM demonstracoes_contabeis 
-            WHERE saldo_final < 0
-            ORDER BY data_demonstracao DESC
-            LIMIT 100
-        """)
-        resultados = cur.fetchall()
-        cur.close()
-        conn.close()
-        return resultados
+        apos = decodificar_cursor(cursor, (date, int))
+        resultados = await buscar_todos("""
+            SELECT data_demonstracao, registro_ans, conta, descricao,
+                   saldo_inicial, saldo_final, id as _id
+            FROM demonstracoes_contabeis
+            WHERE saldo_final < 0{apos}
+            ORDER BY data_demonstracao DESC, id DESC
+            LIMIT %(limite)s
+        """.format(apos="""
+              AND (data_demonstracao, id) < (%(data)s::date, %(id)s)""" if apos else ''), {
+            'limite': limite + 1,
+            **({'data': apos[0], 'id': apos[1]} if apos else {})
+        })
+        return montar_pagina(
+            resultados, limite,
+            lambda linha: [linha['data_demonstracao'], linha['_id']],
+            ocultar=('_id',)
+        )
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Erro ao buscar demonstrações: {e}")
+        logger.error("Erro ao buscar demonstrações: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/procedimentos/grupo/{grupo}")
-async def buscar_procedimentos_grupo(grupo: str):
+@resposta_json
+async def buscar_procedimentos_grupo(
+    grupo: str,
+    limite: int = Query(PAGINA_PADRAO, ge=1, le=PAGINA_MAXIMA),
+    cursor: Optional[str] = None
+):
     """Busca procedimentos por grupo"""
     try:
-        conn = get_db_connection()
-        cur = conn.cursor(cursor_factory=RealDictCursor)
-        cur.execute("""
-            SELECT procedimento, od, amb, vigencia, subgrupo, grupo, capitulo
-            FROM rol_procedimentos 
-            WHERE grupo ILIKE %s
-            LIMIT 100
-        """, (f"%{grupo}%",))
-        resultados = cur.fetchall()
-        cur.close()
-        conn.close()
-        return resultados
+        apos = decodificar_cursor(cursor, (int,))
+        resultados = await buscar_todos("""
+            SELECT procedimento, od, amb, vigencia, subgrupo, grupo, capitulo, id as _id
+            FROM rol_procedimentos
+            WHERE grupo ILIKE %(grupo)s{apos}
+            ORDER BY id
+            LIMIT %(limite)s
+        """.format(apos=" AND id > %(id)s" if apos else ''), {
+            'grupo': f"%{grupo}%",
+            'limite': limite + 1,
+            **({'id': apos[0]} if apos else {})
+        })
+        return montar_pagina(resultados, limite, lambda linha: [linha['_id']], ocultar=('_id',))
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Erro ao buscar procedimentos: {e}")
+        logger.error("Erro ao buscar procedimentos: %s", e)
+        raise HTTPException(status_code=500, detail=str(e))
+
+def _consulta_prefixo(termo):
+    """
+    tsquery em que todas as palavras do termo precisam aparecer, cada uma como
+    prefixo ("consul odonto" -> "consul:* & odonto:*"). Só letras e dígitos
+    chegam ao to_tsquery, então a sintaxe do termo nunca é interpretada.
+    """
+    palavras = re.findall(r'\w+', termo)
+    if not palavras:
+        raise HTTPException(status_code=400, detail="Informe ao menos uma palavra para a busca")
+    return ' & '.join(f"{palavra}:*" for palavra in palavras)
+
+QUERY_BUSCA_PROCEDIMENTOS = """
+    SELECT procedimento, od, amb, vigencia, subgrupo, grupo, capitulo, id as _id,
+           ts_rank_cd(busca, consulta) as relevancia
+    FROM rol_procedimentos,
+         to_tsquery('portuguese', normalize_text(%(consulta)s)) consulta
+    WHERE busca @@ consulta{apos}
+    ORDER BY relevancia DESC, id
+    LIMIT %(limite)s
+"""
+
+@app.get("/procedimentos/busca")
+@resposta_json
+async def buscar_procedimentos(
+    termo: str = Query(..., min_length=1, max_length=200),
+    limite: int = Query(PAGINA_PADRAO, ge=1, le=PAGINA_MAXIMA),
+    cursor: Optional[str] = None
+):
+    """
+    Busca textual nos procedimentos (procedimento, subgrupo, grupo e capítulo),
+    ordenada por relevância
+    """
+    try:
+        apos = decodificar_cursor(cursor, (float, int))
+        resultados = await buscar_todos(QUERY_BUSCA_PROCEDIMENTOS.format(apos="""
+              AND (
+                  ts_rank_cd(busca, consulta) < %(relevancia)s::real
+                  OR (ts_rank_cd(busca, consulta) = %(relevancia)s::real AND id > %(id)s)
+              )""" if apos else ''), {
+            'consulta': _consulta_prefixo(termo),
+            'limite': limite + 1,
+            **({'relevancia': apos[0], 'id': apos[1]} if apos else {})
+        }, preparar=True)
+        return montar_pagina(resultados, limite, lambda linha: [linha['relevancia'], linha['_id']], ocultar=('_id',))
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Erro na busca textual de procedimentos: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/operadoras/nome-fantasia/{nome}")
-async def buscar_por_nome_fantasia(nome: str):
+@resposta_json
+async def buscar_por_nome_fantasia(
+    nome: str,
+    limite: int = Query(PAGINA_PADRAO, ge=1, le=PAGINA_MAXIMA),
+    cursor: Optional[str] = None
+):
     """
     Busca operadoras por nome fantasia
     """
     try:
-        conn = get_db_connection()
-        cur = conn.cursor(cursor_factory=RealDictCursor)
-        
-        # Criar função de normalização no PostgreSQL se não existir
-        cur.execute("""
-            CREATE OR REPLACE FUNCTION normalize_text(text)
-            RETURNS text AS
-            $$
-            BEGIN
-                RETURN translate(
-                    lower($1),
-                    'áàâãäéèêëíìîïóòôõöúùûüýÿçñ',
-                    'aaaaaeeeeiiiioooouuuuyycn'
-                );
-            END;
-            $$ LANGUAGE plpgsql IMMUTABLE;
-        """)
-        
-        query = """
-            SELECT 
-                o.registro_ans,
-                o.nome_fantasia,
-                o.razao_social,
-                o.cnpj,
-                o.modalidade,
-                o.logradouro,
-                o.numero,
-                o.complemento,
-                o.bairro,
-                o.cidade,
-                o.uf,
-                o.cep,
-                oa.telefone,
-                oa.email,
-                oa.representante,
-                oa.data_registro_ans,
-                CASE 
-                    WHEN oa.registro_ans IS NOT NULL THEN true
-                    ELSE false
-                END as is_ativa
-            FROM operadoras o
-            LEFT JOIN operadoras_ativas oa ON o.registro_ans = oa.registro_ans
-            WHERE normalize_text(o.nome_fantasia) LIKE normalize_text(%s)
-            ORDER BY o.nome_fantasia
-            LIMIT 100
-        """
-        
-        search_term = f'%{nome}%'
-        cur.execute(query, (search_term,))
-        resultados = cur.fetchall()
-        
-        cur.close()
-        conn.close()
-        
-        return resultados
+        apos = decodificar_cursor(cursor, CURSOR_TEXTO)
+
+        catalogo = catalogo_atual()
+        if catalogo is not None:
+            resultados = catalogo.buscar_texto('nome_fantasia', nome, apos=apos, limite=limite + 1)
+            return montar_pagina(resultados, limite, catalogo.chave_texto('nome_fantasia', nome))
+
+        resultados = await operadoras_por_texto('nome_fantasia', nome, apos, limite + 1)
+
+        return montar_pagina(resultados, limite, _chave_texto_banco('nome_fantasia'), ocultar=('_relevancia',))
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Erro ao buscar por nome fantasia: {str(e)}")
+        logger.error("Erro ao buscar por nome fantasia: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/operadoras/razao-social/{nome}")
-async def buscar_por_razao_social(nome: str):
+@resposta_json
+async def buscar_por_razao_social(
+    nome: str,
+    limite: int = Query(PAGINA_PADRAO, ge=1, le=PAGINA_MAXIMA),
+    cursor: Optional[str] = None
+):
     """
     Busca operadoras por razão social
     """
     try:
-        conn = get_db_connection()
-        cur = conn.cursor(cursor_factory=RealDictCursor)
-        
-        # Criar função de normalização no PostgreSQL se não existir
-        cur.execute("""
-            CREATE OR REPLACE FUNCTION normalize_text(text)
-            RETURNS text AS
-            $$
-            BEGIN
-                RETURN translate(
-                    lower($1),
-                    'áàâãäéèêëíìîïóòôõöúùûüýÿçñ',
-                    'aaaaaeeeeiiiioooouuuuyycn'
-                );
-            END;
-            $$ LANGUAGE plpgsql IMMUTABLE;
-        """)
-        
-        query = """
-            SELECT 
-                o.registro_ans,
-                o.nome_fantasia,
-                o.razao_social,
-                o.cnpj,
-                o.modalidade,
-                o.logradouro,
-                o.numero,
-                o.complemento,
-                o.bairro,
-                o.cidade,
-                o.uf,
-                o.cep,
-                oa.telefone,
-                oa.email,
-                oa.representante,
-                oa.data_registro_ans,
-                CASE 
-                    WHEN oa.registro_ans IS NOT NULL THEN true
-                    ELSE false
-                END as is_ativa
-            FROM operadoras o
-            LEFT JOIN operadoras_ativas oa ON o.registro_ans = oa.registro_ans
-            WHERE normalize_text(o.razao_social) LIKE normalize_text(%s)
-            ORDER BY o.razao_social
-            LIMIT 100
-        """
-        
-        search_term = f'%{nome}%'
-        cur.execute(query, (search_term,))
-        resultados = cur.fetchall()
-        
-        cur.close()
-        conn.close()
-        
-        return resultados
+        apos = decodificar_cursor(cursor, CURSOR_TEXTO)
+
+        catalogo = catalogo_atual()
+        if catalogo is not None:
+            resultados = catalogo.buscar_texto('razao_social', nome, ordem='razao_social', apos=apos, limite=limite + 1)
+            return montar_pagina(resultados, limite, catalogo.chave_texto('razao_social', nome, ordem='razao_social'))
+
+        resultados = await operadoras_por_texto('razao_social', nome, apos, limite + 1)
+
+        return montar_pagina(resultados, limite, _chave_texto_banco('razao_social'), ocultar=('_relevancia',))
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Erro ao buscar por razão social: {str(e)}")
+        logger.error("Erro ao buscar por razão social: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/operadoras/uf/{uf}")
-async def buscar_operadoras_por_uf(uf: str):
+@resposta_json
+async def buscar_operadoras_por_uf(
+    uf: str,
+    limite: int = Query(PAGINA_PADRAO, ge=1, le=PAGINA_MAXIMA),
+    cursor: Optional[str] = None
+):
     """
     Busca operadoras por UF
     """
     try:
-        conn = get_db_connection()
-        cur = conn.cursor(cursor_factory=RealDictCursor)
-        
-        query = """
-            SELECT 
-                o.registro_ans,
-                o.nome_fantasia,
-                o.razao_social,
-                o.cnpj,
-                o.modalidade,
-                o.logradouro,
-                o.numero,
-                o.complemento,
-                o.bairro,
-                o.cidade,
-                o.uf,
-                o.cep,
-                oa.telefone,
-                oa.email,
-                oa.representante,
-                oa.data_registro_ans,
-                CASE 
-                    WHEN oa.registro_ans IS NOT NULL THEN true
-                    ELSE false
-                END as is_ativa
-            FROM operadoras o
-            LEFT JOIN operadoras_ativas oa ON o.registro_ans = oa.registro_ans
-            WHERE o.uf ILIKE %s
-            ORDER BY o.nome_fantasia
-            LIMIT 100
-        """
-        
-        cur.execute(query, (uf,))
-        resultados = cur.fetchall()
-        
-        cur.close()
-        conn.close()
-        
-        return resultados
+        apos = decodificar_cursor(cursor, (str, str))
+
+        catalogo = catalogo_atual()
+        if catalogo is not None:
+            resultados = catalogo.buscar_uf(uf, apos=apos, limite=limite + 1)
+            return montar_pagina(resultados, limite, chave_nome)
+
+        resultados = await operadoras_por_uf(uf, apos, limite + 1)
+
+        return montar_pagina(resultados, limite, chave_nome)
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Erro ao buscar operadoras por UF: {str(e)}")
+        logger.error("Erro ao buscar operadoras por UF: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/demonstracoes/maiores-despesas-eventos", tags=["Análises Financeiras"])
-async def get_maiores_despesas_eventos():
+@resposta_json
+@em_cache
+async def get_maiores_despesas_eventos(
+    ano: Optional[int] = Query(None, description="Ano de referência (padrão: último ano com dados)"),
+    trimestre: int = Query(4, ge=1, le=4, description="Trimestre de referência")
+):
     """
     Retorna as 10 operadoras com maiores despesas em eventos/sinistros médico-hospitalares no último trimestre (4º trimestre do ano anterior).
+    Lê o ranking pré-calculado pelo ETL na view ranking_despesas_trimestre.
     """
     try:
-        conn = get_db_connection()
-        cur = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-        
         query = """
-        WITH ultimo_ano AS (
-            SELECT 
-                EXTRACT(YEAR FROM MAX(data_demonstracao)) as ano_max
-            FROM demonstracoes_contabeis
-            WHERE data_demonstracao <= CURRENT_DATE
-        ),
-        despesas_eventos AS (
-            SELECT 
-                o.nome_fantasia,
-                o.razao_social,
-                o.registro_ans,
-                SUM(ABS(d.saldo_final)) as valor_despesa,
-                ul.ano_max as ano,
-                4 as trimestre
-            FROM demonstracoes_contabeis d
-            JOIN ultimo_ano ul ON EXTRACT(YEAR FROM d.data_demonstracao) = ul.ano_max
-            JOIN operadoras o ON d.registro_ans = o.registro_ans
-            WHERE d.descricao ILIKE '%EVENTOS%SINISTROS%CONHECIDOS%AVISADOS%MEDICO%HOSPITALAR%'
-            AND EXTRACT(QUARTER FROM d.data_demonstracao) = 4
-            GROUP BY o.nome_fantasia, o.razao_social, o.registro_ans, ul.ano_max
-        )
         SELECT 
-            CASE 
-                WHEN nome_fantasia = 'nan' OR nome_fantasia IS NULL OR nome_fantasia = '' 
-                THEN COALESCE(NULLIF(razao_social, ''), 'Operadora ' || registro_ans)
-                ELSE nome_fantasia
-            END as nome_operadora,
+            nome_operadora,
             registro_ans,
             valor_despesa,
             ano || '-T' || trimestre as trimestre,
-            ROW_NUMBER() OVER (ORDER BY valor_despesa DESC) as ranking
-        FROM despesas_eventos
-        ORDER BY valor_despesa DESC
-        LIMIT 10;
+            ranking
+        FROM ranking_despesas_trimestre
+        WHERE ano = COALESCE(
+                %(ano)s::int,
+                (SELECT MAX(ano) FROM ranking_despesas_ano WHERE ano <= EXTRACT(YEAR FROM CURRENT_DATE))
+            )
+        AND trimestre = %(trimestre)s
+        AND ranking <= 10
+        ORDER BY ranking;
         """
         
-        cur.execute(query)
-        results = cur.fetchall()
-        conn.close()
+        results = await buscar_todos(query, {'ano': ano, 'trimestre': trimestre})
         
         return results
     except Exception as e:
-        logger.error(f"Erro ao buscar maiores despesas: {str(e)}")
+        logger.error("Erro ao buscar maiores despesas: %s", e)
         raise HTTPException(status_code=500, detail="Erro ao buscar dados de despesas")
 
 @app.get("/demonstracoes/maiores-despesas-eventos-ano", tags=["Análises Financeiras"])
-async def get_maiores_despesas_eventos_ano():
+@resposta_json
+@em_cache
+async def get_maiores_despesas_eventos_ano(
+    ano: Optional[int] = Query(None, description="Ano de referência (padrão: último ano com dados)")
+):
     """
     Retorna as 10 operadoras com maiores despesas em eventos/sinistros médico-hospitalares no ano anterior.
+    Lê o ranking pré-calculado pelo ETL na view ranking_despesas_ano.
     """
     try:
-        conn = get_db_connection()
-        cur = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-        
         query = """
-        WITH ultimo_ano AS (
-            SELECT 
-                EXTRACT(YEAR FROM MAX(data_demonstracao)) as ano_max
-            FROM demonstracoes_contabeis
-            WHERE data_demonstracao <= CURRENT_DATE
-        ),
-        despesas_eventos AS (
-            SELECT 
-                o.nome_fantasia,
-                o.razao_social,
-                o.registro_ans,
-                SUM(ABS(d.saldo_final)) as valor_despesa,
-                COUNT(*) as quantidade_eventos,
-                ul.ano_max as ano
-            FROM demonstracoes_contabeis d
-            JOIN ultimo_ano ul ON EXTRACT(YEAR FROM d.data_demonstracao) = ul.ano_max
-            JOIN operadoras o ON d.registro_ans = o.registro_ans
-            WHERE d.descricao ILIKE '%EVENTOS%SINISTROS%CONHECIDOS%AVISADOS%MEDICO%HOSPITALAR%'
-            GROUP BY o.nome_fantasia, o.razao_social, o.registro_ans, ul.ano_max
-        )
         SELECT 
-            CASE 
-                WHEN nome_fantasia = 'nan' OR nome_fantasia IS NULL OR nome_fantasia = '' 
-                THEN COALESCE(NULLIF(razao_social, ''), 'Operadora ' || registro_ans)
-                ELSE nome_fantasia
-            END as nome_operadora,
+            nome_operadora,
             registro_ans,
             valor_despesa,
             quantidade_eventos,
-            ROUND(valor_despesa / NULLIF(quantidade_eventos, 0), 2) as media_por_evento,
+            media_por_evento,
             ano as ano_referencia,
-            ROW_NUMBER() OVER (ORDER BY valor_despesa DESC) as ranking
-        FROM despesas_eventos
-        ORDER BY valor_despesa DESC
-        LIMIT 10;
+            ranking
+        FROM ranking_despesas_ano
+        WHERE ano = COALESCE(
+                %(ano)s::int,
+                (SELECT MAX(ano) FROM ranking_despesas_ano WHERE ano <= EXTRACT(YEAR FROM CURRENT_DATE))
+            )
+        AND ranking <= 10
+        ORDER BY ranking;
         """
         
-        cur.execute(query)
-        results = cur.fetchall()
-        conn.close()
+        results = await buscar_todos(query, {'ano': ano})
         
         return results
     except Exception as e:
-        logger.error(f"Erro ao buscar maiores despesas do ano: {str(e)}")
+        logger.error("Erro ao buscar maiores despesas do ano: %s", e)
+        raise HTTPException(status_code=500, detail="Erro ao buscar dados de despesas")
+
+# Séries temporais de despesas, lidas do resumo por operadora x conta x
+# trimestre montado pelo ETL. Sem `conta`, somam as contas de eventos/sinistros
+# médico-hospitalares, com o mesmo critério e o mesmo valor_despesa
+# (SUM(ABS(saldo_final))) dos rankings. percentual_total compara a série com
+# todas as operadoras no mesmo período.
+QUERY_SERIE_DESPESAS = """
+    WITH filtro AS (
+        SELECT r.ano, r.trimestre, r.registro_ans, r.valor_despesa as valor, r.lancamentos
+        FROM resumo_demonstracoes_trimestre r
+        WHERE (%(conta)s::text IS NULL AND r.evento_medico_hospitalar)
+           OR r.conta = %(conta)s::text
+    ),
+    mercado AS (
+        SELECT {periodo}, SUM(valor) as total FROM filtro GROUP BY {periodo}
+    ),
+    serie AS (
+        SELECT {periodo_f}, SUM(f.valor) as total_despesas, SUM(f.lancamentos) as quantidade_eventos
+        FROM filtro f
+        LEFT JOIN operadoras o ON o.registro_ans = f.registro_ans
+        WHERE (%(registro_ans)s::text IS NULL OR f.registro_ans = %(registro_ans)s::text)
+          AND (%(modalidade)s::text IS NULL OR o.modalidade = %(modalidade)s::text)
+        GROUP BY {periodo_f}
+    )
+    SELECT
+        {periodo_s},
+        COALESCE(
+            (SELECT COALESCE(NULLIF(NULLIF(o.nome_fantasia, 'nan'), ''), NULLIF(o.razao_social, ''))
+             FROM operadoras o WHERE o.registro_ans = %(registro_ans)s::text),
+            'Operadora ' || %(registro_ans)s::text,
+            %(modalidade)s::text,
+            'Todas as operadoras'
+        ) as operadora,
+        s.total_despesas,
+        s.quantidade_eventos,
+        ROUND(s.total_despesas / NULLIF(s.quantidade_eventos, 0), 2) as media_por_evento,
+        ROUND(100 * s.total_despesas / NULLIF(m.total, 0), 2) as percentual_total
+    FROM serie s
+    JOIN mercado m USING ({periodo})
+    ORDER BY {periodo_s}
+"""
+
+QUERIES_SERIE_DESPESAS = {
+    nome: QUERY_SERIE_DESPESAS.format(
+        periodo=', '.join(colunas),
+        periodo_f=', '.join(f"f.{coluna}" for coluna in colunas),
+        periodo_s=', '.join(f"s.{coluna}" for coluna in colunas),
+    )
+    for nome, colunas in (('trimestre', ('ano', 'trimestre')), ('ano', ('ano',)))
+}
+
+async def _serie_despesas(periodo, registro_ans, modalidade, conta):
+    if registro_ans and modalidade:
+        raise HTTPException(status_code=400, detail="Informe registro_ans ou modalidade, não ambos")
+    return await buscar_todos(QUERIES_SERIE_DESPESAS[periodo], {
+        'registro_ans': registro_ans or None,
+        'modalidade': modalidade or None,
+        'conta': conta or None,
+    }, preparar=True)
+
+@app.get(
+    "/demonstracoes/series/trimestral",
+    response_model=List[DespesaTrimestre],
+    tags=["Análises Financeiras"]
+)
+@resposta_json
+@em_cache
+async def serie_despesas_trimestral(
+    registro_ans: Optional[str] = Query(None, description="Série de uma operadora"),
+    modalidade: Optional[str] = Query(None, description="Série das operadoras de uma modalidade"),
+    conta: Optional[str] = Query(None, description="Conta contábil (padrão: eventos/sinistros médico-hospitalares)")
+):
+    """Despesas por trimestre de uma operadora, de uma modalidade ou de todas as operadoras"""
+    try:
+        linhas = await _serie_despesas('trimestre', registro_ans, modalidade, conta)
+        return validar_resposta(List[DespesaTrimestre], linhas)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Erro ao montar série trimestral de despesas: %s", e)
+        raise HTTPException(status_code=500, detail="Erro ao buscar dados de despesas")
+
+@app.get(
+    "/demonstracoes/series/anual",
+    response_model=List[DespesaAno],
+    tags=["Análises Financeiras"]
+)
+@resposta_json
+@em_cache
+async def serie_despesas_anual(
+    registro_ans: Optional[str] = Query(None, description="Série de uma operadora"),
+    modalidade: Optional[str] = Query(None, description="Série das operadoras de uma modalidade"),
+    conta: Optional[str] = Query(None, description="Conta contábil (padrão: eventos/sinistros médico-hospitalares)")
+):
+    """Despesas por ano de uma operadora, de uma modalidade ou de todas as operadoras"""
+    try:
+        linhas = await _serie_despesas('ano', registro_ans, modalidade, conta)
+        return validar_resposta(List[DespesaAno], linhas)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Erro ao montar série anual de despesas: %s", e)
+        raise HTTPException(status_code=500, detail="Erro ao buscar dados de despesas")
+
+@app.get(
+    "/demonstracoes/series/tendencia",
+    response_model=List[TendenciaMensal],
+    tags=["Análises Financeiras"]
+)
+@resposta_json
+@em_cache
+async def serie_despesas_tendencia(
+    registro_ans: Optional[str] = Query(None, description="Série de uma operadora"),
+    modalidade: Optional[str] = Query(None, description="Série das operadoras de uma modalidade"),
+    conta: Optional[str] = Query(None, description="Conta contábil (padrão: eventos/sinistros médico-hospitalares)")
+):
+    """
+    Tendência das despesas no formato TendenciaMensal. As demonstrações são
+    trimestrais, então há um ponto por trimestre, datado no primeiro mês dele.
+    """
+    try:
+        linhas = await _serie_despesas('trimestre', registro_ans, modalidade, conta)
+        return validar_resposta(List[TendenciaMensal], [
+            {
+                'mes': date(linha['ano'], 3 * (linha['trimestre'] - 1) + 1, 1),
+                'total_eventos': linha['quantidade_eventos'],
+                'total_despesas': linha['total_despesas'],
+                'media_por_evento': linha['media_por_evento'],
+            }
+            for linha in linhas
+        ])
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Erro ao montar tendência de despesas: %s", e)
         raise HTTPException(status_code=500, detail="Erro ao buscar dados de despesas")
 
 if __name__ == "__main__":
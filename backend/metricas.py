@@ -0,0 +1,144 @@
+"""
+Métricas da API no formato texto do Prometheus (GET /metrics).
+
+- Histograma de latência por rota (template do path, método e status),
+  coletado pelo middleware medir_requisicoes
+- Histogramas do tempo de espera por uma conexão do pool e do tempo de
+  execução das consultas, além das linhas retornadas (ver database.py)
+- Ocupação do pool e contadores do cache de respostas, lidos no momento
+  da coleta
+
+Com vários workers (start.py --producao), PROMETHEUS_MULTIPROC_DIR é definido
+antes da importação do prometheus_client: cada worker grava seus histogramas
+em arquivos nesse diretório e /metrics soma os de todos os workers. Pool e
+cache continuam sendo do worker que respondeu e levam o rótulo `pid`.
+"""
+import os
+import time
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Histogram, generate_latest, multiprocess
+)
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from starlette.responses import Response
+from starlette.routing import Match
+
+MULTIPROCESSO = bool(os.getenv('PROMETHEUS_MULTIPROC_DIR'))
+
+REQUISICOES = Histogram(
+    'api_requisicao_segundos',
+    'Duração das requisições HTTP até o envio dos cabeçalhos da resposta',
+    ['metodo', 'rota', 'status'],
+)
+
+AQUISICAO_CONEXAO = Histogram(
+    'db_aquisicao_conexao_segundos',
+    'Tempo de espera por uma conexão livre do pool',
+    buckets=(.0005, .001, .0025, .005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10),
+)
+
+EXECUCAO_CONSULTA = Histogram(
+    'db_consulta_segundos',
+    'Tempo de execução das consultas no banco',
+)
+
+LINHAS_RETORNADAS = Histogram(
+    'db_linhas_retornadas',
+    'Linhas retornadas por consulta',
+    buckets=(0, 1, 10, 100, 1000, 10000, 100000),
+)
+
+
+def rota_da_requisicao(request):
+    """
+    Template da rota atendida (/operadoras/uf/{uf}) para não criar um rótulo por URL.
+    Respostas dadas por um middleware antes do roteamento não têm scope['route']:
+    o template vem então do casamento do path com as rotas do app.
+    """
+    rota = request.scope.get('route')
+    if rota is None:
+        for candidata in getattr(request.app, 'routes', ()):
+            casamento, _ = candidata.matches(request.scope)
+            if casamento == Match.FULL:
+                rota = candidata
+                break
+    return getattr(rota, 'path', None) or 'nao_mapeada'
+
+
+async def medir_requisicoes(request, call_next):
+    """Middleware HTTP: observa a duração de cada requisição por rota e status"""
+    inicio = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        REQUISICOES.labels(
+            request.method, rota_da_requisicao(request), str(status)
+        ).observe(time.perf_counter() - inicio)
+
+
+class ColetorEstatisticas:
+    """
+    Coletor do Prometheus para valores que já são mantidos por outros módulos
+    (estatísticas do pool e do cache), lidos apenas quando /metrics é consultado
+    """
+
+    def __init__(self, estatisticas_pool, estatisticas_cache):
+        self.estatisticas_pool = estatisticas_pool
+        self.estatisticas_cache = estatisticas_cache
+
+    @staticmethod
+    def _metrica(tipo, nome, descricao, valor):
+        # Com vários workers, o valor é só deste processo: o pid identifica a origem
+        if not MULTIPROCESSO:
+            return tipo(nome, descricao, value=valor)
+        metrica = tipo(nome, descricao, labels=['pid'])
+        metrica.add_metric([str(os.getpid())], valor)
+        return metrica
+
+    def collect(self):
+        metrica = self._metrica
+        pool = self.estatisticas_pool()
+        if pool:
+            em_uso = pool.get('pool_size', 0) - pool.get('pool_available', 0)
+            maximo = pool.get('pool_max', 0)
+            yield metrica(GaugeMetricFamily, 'db_pool_conexoes', 'Conexões abertas no pool', pool.get('pool_size', 0))
+            yield metrica(GaugeMetricFamily, 'db_pool_conexoes_em_uso', 'Conexões emprestadas a requisições', em_uso)
+            yield metrica(GaugeMetricFamily, 'db_pool_conexoes_max', 'Tamanho máximo do pool', maximo)
+            yield metrica(
+                GaugeMetricFamily, 'db_pool_aguardando', 'Requisições esperando uma conexão livre',
+                pool.get('requests_waiting', 0)
+            )
+            yield metrica(
+                GaugeMetricFamily, 'db_pool_saturacao', 'Fração do pool em uso (em_uso / max)',
+                em_uso / maximo if maximo else 0.0
+            )
+
+        cache = self.estatisticas_cache()
+        yield metrica(GaugeMetricFamily, 'api_cache_itens', 'Respostas guardadas no cache', cache['itens'])
+        yield metrica(CounterMetricFamily, 'api_cache_acertos', 'Consultas atendidas pelo cache', cache['acertos'])
+        yield metrica(CounterMetricFamily, 'api_cache_falhas', 'Consultas que não estavam no cache', cache['falhas'])
+        yield metrica(CounterMetricFamily, 'api_cache_remocoes', 'Respostas removidas por falta de espaço', cache['remocoes'])
+        yield metrica(GaugeMetricFamily, 'api_cache_taxa_acerto', 'Acertos / consultas ao cache', cache['taxa_acerto'])
+
+
+_coletor = None
+
+
+def registrar_coletor(estatisticas_pool, estatisticas_cache):
+    global _coletor
+    _coletor = ColetorEstatisticas(estatisticas_pool, estatisticas_cache)
+    REGISTRY.register(_coletor)
+
+
+def resposta_metricas():
+    if not MULTIPROCESSO:
+        return Response(generate_latest(REGISTRY), media_type=CONTENT_TYPE_LATEST)
+    # Histogramas de todos os workers (arquivos do diretório) + pool e cache deste worker
+    registro = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registro)
+    if _coletor is not None:
+        registro.register(_coletor)
+    return Response(generate_latest(registro), media_type=CONTENT_TYPE_LATEST)
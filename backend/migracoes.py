@@ -0,0 +1,121 @@
+"""
+Bootstrap versionado do schema usado pela API.
+
+Cada arquivo em sql/ (NNN_descricao.sql) é aplicado uma única vez, em ordem, e a
+versão aplicada fica registrada em schema_migrations. Roda na subida da API
+(ver lifespan em main.py) ou manualmente:
+
+    python migracoes.py
+
+Várias tabelas são criadas pelo ETL, não pelas migrações. Uma migração que
+altera essas tabelas as declara no cabeçalho:
+
+    -- requer: operadoras, operadoras_ativas
+
+Enquanto alguma delas não existir, a migração não é aplicada nem registrada e
+volta a ser tentada na próxima execução (as seguintes seguem normalmente).
+"""
+import asyncio
+import logging
+import os
+import re
+
+from config import MIGRACOES_DIR
+
+logger = logging.getLogger(__name__)
+
+# Chave arbitrária do advisory lock que serializa workers subindo ao mesmo tempo
+LOCK_MIGRACOES = 7245001
+
+PADRAO_ARQUIVO = re.compile(r'^(\d+)_(\w+)\.sql$')
+PADRAO_REQUER = re.compile(r'^--\s*requer:\s*(.+)$', re.MULTILINE)
+
+
+def listar_migracoes(diretorio=MIGRACOES_DIR):
+    """Retorna [(versao, nome, caminho)] ordenado pela versão"""
+    migracoes = []
+    for arquivo in os.listdir(diretorio):
+        match = PADRAO_ARQUIVO.match(arquivo)
+        if match:
+            migracoes.append((int(match.group(1)), match.group(2), os.path.join(diretorio, arquivo)))
+    migracoes.sort()
+    return migracoes
+
+
+def tabelas_requeridas(sql):
+    """Tabelas declaradas em linhas `-- requer: a, b` do arquivo de migração"""
+    return [
+        tabela.strip()
+        for linha in PADRAO_REQUER.findall(sql)
+        for tabela in linha.split(',')
+        if tabela.strip()
+    ]
+
+
+async def _tabelas_ausentes(conn, tabelas):
+    ausentes = []
+    for tabela in tabelas:
+        cur = await conn.execute("SELECT to_regclass(%s) IS NULL AS ausente", (f'public.{tabela}',))
+        if (await cur.fetchone())['ausente']:
+            ausentes.append(tabela)
+    return ausentes
+
+
+async def aplicar_migracoes(conn):
+    """
+    Aplica as migrações pendentes na conexão informada, exceto as que
+    dependem de tabelas ainda não criadas pelo ETL.
+    Retorna a maior versão aplicada.
+    """
+    async with conn.transaction():
+        await conn.execute("SELECT pg_advisory_xact_lock(%s)", (LOCK_MIGRACOES,))
+        await conn.execute("""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                versao INTEGER PRIMARY KEY,
+                nome VARCHAR(100) NOT NULL,
+                aplicada_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        cur = await conn.execute("SELECT versao FROM schema_migrations")
+        aplicadas = {linha['versao'] for linha in await cur.fetchall()}
+
+        for versao, nome, caminho in listar_migracoes():
+            if versao in aplicadas:
+                continue
+            with open(caminho, encoding='utf-8') as f:
+                sql = f.read()
+            ausentes = await _tabelas_ausentes(conn, tabelas_requeridas(sql))
+            if ausentes:
+                logger.warning(
+                    "Migração %03d_%s adiada: tabelas ainda não criadas pelo ETL (%s)",
+                    versao, nome, ', '.join(ausentes)
+                )
+                continue
+            logger.info("Aplicando migração %03d_%s", versao, nome)
+            await conn.execute(sql)
+            await conn.execute(
+                "INSERT INTO schema_migrations (versao, nome) VALUES (%s, %s)",
+                (versao, nome)
+            )
+            aplicadas.add(versao)
+
+        versao_atual = max(aplicadas, default=0)
+
+    logger.info("Schema na versão %s", versao_atual)
+    return versao_atual
+
+
+async def _main():
+    from database import abrir_pool, fechar_pool, obter_conexao
+
+    await abrir_pool()
+    try:
+        async with obter_conexao() as conn:
+            await aplicar_migracoes(conn)
+    finally:
+        await fechar_pool()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_main())
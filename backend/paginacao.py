@@ -0,0 +1,80 @@
+"""
+Paginação por chave (keyset) das rotas de listagem.
+
+O cursor é opaco para o cliente: base64 (url-safe) de uma lista JSON com os
+valores da chave de ordenação da última linha da página. A próxima página
+continua a partir dessa chave (WHERE chave > cursor), sem OFFSET, então
+páginas profundas custam o mesmo que a primeira.
+"""
+import base64
+import json
+from datetime import date
+
+from fastapi import HTTPException
+
+
+def _serializar(valor):
+    if isinstance(valor, date):
+        return valor.isoformat()
+    raise TypeError(f"Valor não serializável no cursor: {valor!r}")
+
+
+def codificar_cursor(chave):
+    """Codifica a chave de ordenação (lista de valores) em um cursor opaco"""
+    dados = json.dumps(chave, default=_serializar, separators=(',', ':'))
+    return base64.urlsafe_b64encode(dados.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def _converter(valor, tipo):
+    """Valor do cursor no tipo esperado (float, int, str ou date); ValueError se não couber"""
+    if isinstance(valor, bool):
+        raise ValueError(valor)
+    if tipo is float and isinstance(valor, (int, float)):
+        return float(valor)
+    if tipo is int and isinstance(valor, int):
+        return valor
+    if tipo is str and isinstance(valor, str):
+        return valor
+    if tipo is date and isinstance(valor, str):
+        return date.fromisoformat(valor)
+    raise ValueError(valor)
+
+
+def decodificar_cursor(cursor, tipos):
+    """
+    Decodifica o cursor recebido do cliente. Retorna None se não houver cursor
+    e responde 400 se ele não for uma chave com um valor de cada tipo de
+    `tipos`, em ordem (ex.: (float, str, str)).
+    """
+    if not cursor:
+        return None
+    try:
+        preenchimento = '=' * (-len(cursor) % 4)
+        chave = json.loads(base64.urlsafe_b64decode(cursor + preenchimento))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+    if not isinstance(chave, list) or len(chave) != len(tipos):
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+    try:
+        return [_converter(valor, tipo) for valor, tipo in zip(chave, tipos)]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+
+
+def montar_pagina(linhas, limite, chave, ocultar=()):
+    """
+    Monta a resposta paginada a partir de até `limite + 1` linhas: a linha
+    excedente só indica que existe uma próxima página.
+
+    chave: função linha -> lista de valores da ordenação, usada no next_cursor
+    ocultar: colunas auxiliares da ordenação que não vão para a resposta
+    """
+    itens = linhas[:limite]
+    proximo = None
+    if len(linhas) > limite and itens:
+        proximo = codificar_cursor(chave(itens[-1]))
+    if ocultar:
+        for linha in itens:
+            for coluna in ocultar:
+                linha.pop(coluna, None)
+    return {"items": itens, "next_cursor": proximo}
@@ -0,0 +1,225 @@
+"""
+Consultas de operadoras usadas pelas rotas quando o catálogo em memória não
+está carregado.
+
+O SELECT de 17 colunas (operadoras + operadoras_ativas) é montado uma única vez
+e cada variação de consulta (filtro, ordenação, com ou sem cursor) vira um texto
+SQL fixo, criado na importação do módulo. Os valores vão sempre como parâmetros,
+então o texto se repete entre requisições e pode ser executado como prepared
+statement: o psycopg prepara a consulta na primeira execução em cada conexão do
+pool (prepare=True) e nas seguintes envia só o nome e os parâmetros, sem o
+Postgres refazer o parse e o planejamento.
+"""
+from database import buscar_todos, buscar_um
+
+COLUNAS_OPERADORA = """
+        o.registro_ans,
+        o.nome_fantasia,
+        o.razao_social,
+        o.cnpj,
+        o.modalidade,
+        o.logradouro,
+        o.numero,
+        o.complemento,
+        o.bairro,
+        o.cidade,
+        o.uf,
+        o.cep,
+        oa.telefone,
+        oa.email,
+        oa.representante,
+        oa.data_registro_ans,
+        oa.registro_ans IS NOT NULL as is_ativa"""
+
+FROM_OPERADORAS = """
+    FROM operadoras o
+    LEFT JOIN operadoras_ativas oa ON o.registro_ans = oa.registro_ans"""
+
+SELECT_OPERADORAS = f"SELECT{COLUNAS_OPERADORA}{FROM_OPERADORAS}"
+
+# Coluna usada no desempate da ordenação de cada busca textual
+ORDEM_TEXTO = {
+    'cidade': 'nome_fantasia',
+    'nome_fantasia': 'nome_fantasia',
+    'razao_social': 'razao_social',
+}
+
+QUERY_POR_CNPJ = f"""{SELECT_OPERADORAS}
+    WHERE o.cnpj = %s
+    ORDER BY o.nome_fantasia, o.registro_ans
+    LIMIT 1
+"""
+
+QUERIES_POR_VALORES = {
+    tipo: f"""
+    SELECT DISTINCT ON (o.{tipo}){COLUNAS_OPERADORA}{FROM_OPERADORAS}
+    WHERE o.{tipo} = ANY(%s)
+    ORDER BY o.{tipo}, o.nome_fantasia, o.registro_ans
+"""
+    for tipo in ('cnpj', 'registro_ans')
+}
+
+
+def _query_texto(coluna, ordem, com_cursor):
+    """
+    Busca por substring em <coluna>_norm, ordenada por (relevância DESC, ordem, registro_ans).
+    similarity() é real (float4) e o cursor traz o valor já convertido em double:
+    o ::real devolve o parâmetro à precisão da coluna, senão o empate (=) nunca casa.
+    """
+    condicao_apos = f"""
+      AND (
+          similarity(o.{coluna}_norm, normalize_text(%(termo)s)) < %(relevancia)s::real
+          OR (
+              similarity(o.{coluna}_norm, normalize_text(%(termo)s)) = %(relevancia)s::real
+              AND (COALESCE(o.{ordem}, ''), o.registro_ans) > (%(ordem)s, %(registro_ans)s)
+          )
+      )"""
+    return f"""
+    SELECT{COLUNAS_OPERADORA},
+        similarity(o.{coluna}_norm, normalize_text(%(termo)s)) as _relevancia{FROM_OPERADORAS}
+    WHERE o.{coluna}_norm LIKE normalize_text(%(padrao)s){condicao_apos if com_cursor else ''}
+    ORDER BY _relevancia DESC, COALESCE(o.{ordem}, ''), o.registro_ans
+    LIMIT %(limite)s
+"""
+
+
+QUERIES_TEXTO = {
+    (coluna, com_cursor): _query_texto(coluna, ordem, com_cursor)
+    for coluna, ordem in ORDEM_TEXTO.items()
+    for com_cursor in (False, True)
+}
+
+QUERIES_POR_UF = {
+    com_cursor: f"""{SELECT_OPERADORAS}
+    WHERE o.uf ILIKE %(uf)s{'''
+      AND (COALESCE(o.nome_fantasia, ''), o.registro_ans) > (%(ordem)s, %(registro_ans)s)''' if com_cursor else ''}
+    ORDER BY COALESCE(o.nome_fantasia, ''), o.registro_ans
+    LIMIT %(limite)s
+"""
+    for com_cursor in (False, True)
+}
+
+# Mesmo cursor de _query_texto (relevância convertida para real no desempate)
+QUERIES_ATIVAS_POR_CIDADE = {
+    com_cursor: f"""
+    SELECT registro_ans, cnpj, razao_social, nome_fantasia, modalidade,
+           logradouro, numero, complemento, bairro, cidade, uf, cep,
+           telefone, email, representante,
+           similarity(cidade_norm, normalize_text(%(termo)s)) as _relevancia
+    FROM operadoras_ativas
+    WHERE cidade_norm LIKE normalize_text(%(padrao)s){'''
+      AND (
+          similarity(cidade_norm, normalize_text(%(termo)s)) < %(relevancia)s::real
+          OR (
+              similarity(cidade_norm, normalize_text(%(termo)s)) = %(relevancia)s::real
+              AND (COALESCE(nome_fantasia, ''), registro_ans) > (%(ordem)s, %(registro_ans)s)
+          )
+      )''' if com_cursor else ''}
+    ORDER BY _relevancia DESC, COALESCE(nome_fantasia, ''), registro_ans
+    LIMIT %(limite)s
+"""
+    for com_cursor in (False, True)
+}
+
+
+def _parametros_texto(termo, apos, limite):
+    params = {'padrao': f"%{termo}%", 'termo': termo, 'limite': limite}
+    if apos is not None:
+        params.update({'relevancia': apos[0], 'ordem': apos[1], 'registro_ans': apos[2]})
+    return params
+
+
+async def operadora_por_cnpj(cnpj):
+    return await buscar_um(QUERY_POR_CNPJ, (cnpj,), preparar=True)
+
+
+async def operadoras_por_valores(tipo, valores):
+    """Operadoras cujo cnpj (ou registro_ans) está em `valores`, uma por valor"""
+    return await buscar_todos(QUERIES_POR_VALORES[tipo], (valores,), preparar=True)
+
+
+async def operadoras_por_texto(coluna, termo, apos, limite):
+    """
+    Busca textual em cidade, nome_fantasia ou razao_social. As linhas trazem a
+    coluna auxiliar _relevancia, usada no cursor da próxima página.
+    """
+    return await buscar_todos(
+        QUERIES_TEXTO[(coluna, apos is not None)], _parametros_texto(termo, apos, limite), preparar=True
+    )
+
+
+async def operadoras_por_uf(uf, apos, limite):
+    params = {'uf': uf, 'limite': limite}
+    if apos is not None:
+        params.update({'ordem': apos[0], 'registro_ans': apos[1]})
+    return await buscar_todos(QUERIES_POR_UF[apos is not None], params, preparar=True)
+
+
+async def operadoras_ativas_por_cidade(cidade, apos, limite):
+    return await buscar_todos(
+        QUERIES_ATIVAS_POR_CIDADE[apos is not None], _parametros_texto(cidade, apos, limite), preparar=True
+    )
+
+
+# Colunas com contagem agrupada na rota /operadoras/facetas
+FACETAS = ('uf', 'modalidade', 'cidade')
+
+# Facetas: cada contagem aplica os filtros das outras colunas (ver
+# CatalogoOperadoras.facetas). Filtros não informados chegam como NULL, então o
+# texto da consulta é sempre o mesmo e pode ser preparado.
+QUERY_FACETAS = """
+    WITH base AS (
+        SELECT
+            upper(trim(o.uf)) as uf,
+            trim(o.modalidade) as modalidade,
+            trim(o.cidade) as cidade,
+            (%(uf)s::text IS NULL OR upper(trim(o.uf)) = upper(trim(%(uf)s::text))) as filtro_uf,
+            (%(modalidade)s::text IS NULL OR trim(o.modalidade) = trim(%(modalidade)s::text)) as filtro_modalidade,
+            (%(cidade)s::text IS NULL OR o.cidade_norm LIKE normalize_text(%(padrao)s::text)) as filtro_cidade,
+            (%(ativa)s::boolean IS NULL OR (oa.registro_ans IS NOT NULL) = %(ativa)s::boolean) as filtro_ativa
+        FROM operadoras o
+        LEFT JOIN operadoras_ativas oa ON o.registro_ans = oa.registro_ans
+    )
+    SELECT 'uf' as faceta, uf as valor, count(*) as total FROM base
+    WHERE filtro_modalidade AND filtro_cidade AND filtro_ativa AND uf <> ''
+    GROUP BY uf
+    UNION ALL
+    SELECT 'modalidade', modalidade, count(*) FROM base
+    WHERE filtro_uf AND filtro_cidade AND filtro_ativa AND modalidade <> ''
+    GROUP BY modalidade
+    UNION ALL
+    SELECT 'cidade', cidade, count(*) FROM base
+    WHERE filtro_uf AND filtro_modalidade AND filtro_ativa AND cidade <> ''
+    GROUP BY cidade
+    UNION ALL
+    SELECT 'total', NULL, count(*) FROM base
+    WHERE filtro_uf AND filtro_modalidade AND filtro_cidade AND filtro_ativa
+"""
+
+
+def ordenar_facetas(contagens, limite):
+    """{valor: total} -> [{'valor', 'total'}] do maior total para o menor, até `limite` valores"""
+    itens = sorted(contagens.items(), key=lambda item: (-item[1], item[0]))
+    return [{'valor': valor, 'total': total} for valor, total in itens[:limite]]
+
+
+async def facetas_operadoras(uf, modalidade, cidade, ativa, limite):
+    """Mesmo formato de CatalogoOperadoras.facetas, calculado no banco"""
+    linhas = await buscar_todos(QUERY_FACETAS, {
+        'uf': uf or None,
+        'modalidade': modalidade or None,
+        'cidade': cidade or None,
+        'padrao': f"%{cidade}%" if cidade else None,
+        'ativa': ativa,
+    }, preparar=True)
+    contagens = {coluna: {} for coluna in FACETAS}
+    total = 0
+    for linha in linhas:
+        if linha['faceta'] == 'total':
+            total = linha['total']
+        else:
+            contagens[linha['faceta']][linha['valor']] = linha['total']
+    return {
+        'total': total,
+        'facetas': {coluna: ordenar_facetas(valores, limite) for coluna, valores in contagens.items()},
+    }
@@ -0,0 +1,62 @@
+"""
+Serialização JSON das respostas com orjson.
+
+Quando uma rota retorna um dict ou uma lista, o FastAPI passa o resultado por
+jsonable_encoder, que percorre cada valor em Python antes do json.dumps. As
+rotas decoradas com @resposta_json devolvem diretamente uma RespostaJson,
+serializada em C pelo orjson a partir das linhas (dicts do catálogo ou do
+psycopg), sem a cópia intermediária.
+"""
+import functools
+from decimal import Decimal
+
+import orjson
+from pydantic import TypeAdapter
+from starlette.responses import JSONResponse, Response
+
+
+def _json_padrao(valor):
+    # Colunas NUMERIC chegam como Decimal; a API sempre as retornou como número
+    if isinstance(valor, Decimal):
+        return float(valor)
+    raise TypeError(f"Tipo não serializável: {type(valor).__name__}")
+
+
+def serializar_json(conteudo):
+    return orjson.dumps(conteudo, default=_json_padrao)
+
+
+class RespostaJson(JSONResponse):
+    """JSONResponse serializada com orjson (datas em ISO 8601, Decimal como número)"""
+
+    def render(self, content):
+        return serializar_json(content)
+
+
+@functools.lru_cache(maxsize=None)
+def _adaptador(modelo):
+    return TypeAdapter(modelo)
+
+
+def validar_resposta(modelo, conteudo):
+    """
+    Valida o conteúdo pelo modelo de resposta da rota e devolve só os campos do
+    modelo, prontos para o orjson. O response_model declarado no @app.get fica
+    para a documentação: o FastAPI não o aplica a uma RespostaJson já montada.
+    """
+    adaptador = _adaptador(modelo)
+    return adaptador.dump_python(adaptador.validate_python(conteudo))
+
+
+def resposta_json(rota):
+    """
+    Decorador para rotas que retornam dicts/listas. Deve ficar logo abaixo do
+    @app.get (acima do @em_cache, para que o cache guarde os dados e não a resposta).
+    """
+    @functools.wraps(rota)
+    async def wrapper(*args, **kwargs):
+        resultado = await rota(*args, **kwargs)
+        if isinstance(resultado, Response):
+            return resultado
+        return RespostaJson(resultado)
+    return wrapper
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Literal, Optional
 from datetime import date
 
 class OperadoraBase(BaseModel):
@@ -28,25 +28,28 @@ class ResultadoBusca(BaseModel):
 
 class DespesaTrimestre(BaseModel):
     """Modelo para despesas trimestrais"""
+    ano: int = Field(..., description="Ano de referência")
+    trimestre: int = Field(..., description="Trimestre de referência (1 a 4)")
     operadora: str = Field(..., description="Nome da operadora")
-    total_despesas: float = Field(..., description="Valor total das despesas no trimestre")
+    total_despesas: Optional[float] = Field(None, description="Valor total das despesas no trimestre")
     quantidade_eventos: int = Field(..., description="Quantidade de eventos no trimestre")
-    percentual_total: float = Field(..., description="Percentual em relação ao total do trimestre")
+    percentual_total: Optional[float] = Field(None, description="Percentual em relação ao total do trimestre (nulo se o total for zero)")
 
 class DespesaAno(BaseModel):
     """Modelo para despesas anuais"""
+    ano: int = Field(..., description="Ano de referência")
     operadora: str = Field(..., description="Nome da operadora")
-    total_despesas: float = Field(..., description="Valor total das despesas no ano")
+    total_despesas: Optional[float] = Field(None, description="Valor total das despesas no ano")
     quantidade_eventos: int = Field(..., description="Quantidade de eventos no ano")
-    media_por_evento: float = Field(..., description="Valor médio por evento")
-    percentual_total: float = Field(..., description="Percentual em relação ao total do ano")
+    media_por_evento: Optional[float] = Field(None, description="Valor médio por evento (nulo sem eventos)")
+    percentual_total: Optional[float] = Field(None, description="Percentual em relação ao total do ano (nulo se o total for zero)")
 
 class TendenciaMensal(BaseModel):
     """Modelo para tendência mensal de despesas"""
     mes: date = Field(..., description="Mês de referência")
     total_eventos: int = Field(..., description="Total de eventos no mês")
-    total_despesas: float = Field(..., description="Valor total das despesas no mês")
-    media_por_evento: float = Field(..., description="Valor médio por evento no mês")
+    total_despesas: Optional[float] = Field(None, description="Valor total das despesas no mês")
+    media_por_evento: Optional[float] = Field(None, description="Valor médio por evento no mês (nulo sem eventos)")
 
 class BuscaDescricao(BaseModel):
     registro_ans: str
@@ -54,4 +57,10 @@ class BuscaDescricao(BaseModel):
     valor: float
     data_referencia: date
     nome_fantasia: str
-    razao_social: str 
\ No newline at end of file
+    razao_social: str
+
+
+class BuscaLoteOperadoras(BaseModel):
+    """Modelo para busca de operadoras em lote por CNPJ ou registro ANS"""
+    tipo: Literal['cnpj', 'registro_ans'] = Field('cnpj', description="Campo usado na busca")
+    valores: List[str] = Field(..., min_length=1, max_length=5000, description="CNPJs ou registros ANS a buscar")
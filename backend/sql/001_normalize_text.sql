@@ -0,0 +1,15 @@
+-- Extensão e função usadas nas buscas textuais (sem acento e sem diferenciar maiúsculas)
+CREATE EXTENSION IF NOT EXISTS unaccent;
+
+-- Função SQL (e não plpgsql) para que o planejador consiga incorporá-la à consulta.
+-- Cada letra acentuada da primeira lista vira a letra na mesma posição da segunda
+-- (mesmo resultado de catalogo.normalize_text; ver tests/test_normalize_text.py).
+CREATE OR REPLACE FUNCTION normalize_text(text)
+RETURNS text AS
+$$
+    SELECT translate(
+        lower($1),
+        'áàâãäéèêëíìîïóòôõöúùûüýÿçñ',
+        'aaaaaeeeeiiiiooooouuuuyycn'
+    );
+$$ LANGUAGE sql IMMUTABLE PARALLEL SAFE;
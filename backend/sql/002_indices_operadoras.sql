@@ -0,0 +1,10 @@
+-- Índice usado pela busca por UF. A tabela é criada pelo ETL (que também cria
+-- o índice), por isso aqui ele só é criado se a tabela já existir.
+-- requer: operadoras
+DO $$
+BEGIN
+    IF to_regclass('public.operadoras') IS NOT NULL THEN
+        CREATE INDEX IF NOT EXISTS idx_operadoras_uf ON operadoras (uf);
+    END IF;
+END;
+$$;
@@ -0,0 +1,41 @@
+-- Busca textual indexada: colunas normalizadas (sem acento, minúsculas) geradas
+-- pelo próprio banco e índices GIN de trigramas, para que LIKE '%termo%' e
+-- similarity() usem índice em vez de varrer a tabela.
+-- requer: operadoras, operadoras_ativas
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- As colunas usam a mesma expressão de normalize_text escrita por extenso, de
+-- modo que o ETL pode recriar as tabelas sem depender da função.
+DO $$
+BEGIN
+    IF to_regclass('public.operadoras') IS NOT NULL THEN
+        ALTER TABLE operadoras
+            ADD COLUMN IF NOT EXISTS razao_social_norm TEXT GENERATED ALWAYS AS (
+                translate(lower(razao_social), 'áàâãäéèêëíìîïóòôõöúùûüýÿçñ', 'aaaaaeeeeiiiiooooouuuuyycn')
+            ) STORED,
+            ADD COLUMN IF NOT EXISTS nome_fantasia_norm TEXT GENERATED ALWAYS AS (
+                translate(lower(nome_fantasia), 'áàâãäéèêëíìîïóòôõöúùûüýÿçñ', 'aaaaaeeeeiiiiooooouuuuyycn')
+            ) STORED,
+            ADD COLUMN IF NOT EXISTS cidade_norm TEXT GENERATED ALWAYS AS (
+                translate(lower(cidade), 'áàâãäéèêëíìîïóòôõöúùûüýÿçñ', 'aaaaaeeeeiiiiooooouuuuyycn')
+            ) STORED;
+
+        CREATE INDEX IF NOT EXISTS idx_operadoras_razao_social_trgm
+            ON operadoras USING gin (razao_social_norm gin_trgm_ops);
+        CREATE INDEX IF NOT EXISTS idx_operadoras_nome_fantasia_trgm
+            ON operadoras USING gin (nome_fantasia_norm gin_trgm_ops);
+        CREATE INDEX IF NOT EXISTS idx_operadoras_cidade_trgm
+            ON operadoras USING gin (cidade_norm gin_trgm_ops);
+    END IF;
+
+    IF to_regclass('public.operadoras_ativas') IS NOT NULL THEN
+        ALTER TABLE operadoras_ativas
+            ADD COLUMN IF NOT EXISTS cidade_norm TEXT GENERATED ALWAYS AS (
+                translate(lower(cidade), 'áàâãäéèêëíìîïóòôõöúùûüýÿçñ', 'aaaaaeeeeiiiiooooouuuuyycn')
+            ) STORED;
+
+        CREATE INDEX IF NOT EXISTS idx_operadoras_ativas_cidade_trgm
+            ON operadoras_ativas USING gin (cidade_norm gin_trgm_ops);
+    END IF;
+END;
+$$;
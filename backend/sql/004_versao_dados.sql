@@ -0,0 +1,7 @@
+-- Registro das cargas concluídas pelo ETL. A API acompanha a maior versão para
+-- saber quando recarregar o catálogo em memória e invalidar caches.
+CREATE TABLE IF NOT EXISTS etl_versao_dados (
+    versao SERIAL PRIMARY KEY,
+    origem VARCHAR(50) NOT NULL,
+    concluida_em TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
@@ -0,0 +1,14 @@
+-- Índices que sustentam a paginação por chave (data_demonstracao, id) das
+-- rotas /demonstracoes/periodo e /demonstracoes/saldo-negativo.
+-- requer: demonstracoes_contabeis
+DO $$
+BEGIN
+    IF to_regclass('public.demonstracoes_contabeis') IS NOT NULL THEN
+        CREATE INDEX IF NOT EXISTS idx_demonstracoes_data_id
+            ON demonstracoes_contabeis (data_demonstracao, id);
+        CREATE INDEX IF NOT EXISTS idx_demonstracoes_saldo_negativo
+            ON demonstracoes_contabeis (data_demonstracao DESC, id DESC)
+            WHERE saldo_final < 0;
+    END IF;
+END;
+$$;
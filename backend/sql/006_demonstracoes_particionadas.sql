@@ -0,0 +1,14 @@
+-- demonstracoes_contabeis passou a ser particionada por trimestre pelo ETL, com
+-- chave primária (data_demonstracao, id): o índice de paginação criado em 005
+-- duplica a chave primária em todas as partições e deixa de ser necessário.
+-- requer: demonstracoes_contabeis
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM pg_partitioned_table
+        WHERE partrelid = to_regclass('public.demonstracoes_contabeis')
+    ) THEN
+        DROP INDEX IF EXISTS idx_demonstracoes_data_id;
+    END IF;
+END;
+$$;
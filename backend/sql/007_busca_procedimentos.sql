@@ -0,0 +1,21 @@
+-- Busca textual em rol_procedimentos: tsvector em português, sem acentos, sobre
+-- procedimento (peso A), subgrupo (B), grupo (C) e capitulo (D), com índice GIN.
+-- A tabela é criada por ETL/transform_data.py, que também cria a coluna e o
+-- índice; aqui eles só são criados se a tabela já existir.
+-- requer: rol_procedimentos
+DO $$
+BEGIN
+    IF to_regclass('public.rol_procedimentos') IS NOT NULL THEN
+        ALTER TABLE rol_procedimentos
+            ADD COLUMN IF NOT EXISTS busca tsvector GENERATED ALWAYS AS (
+                setweight(to_tsvector('portuguese', translate(lower(coalesce(procedimento, '')), 'áàâãäéèêëíìîïóòôõöúùûüýÿçñ', 'aaaaaeeeeiiiiooooouuuuyycn')), 'A')
+                || setweight(to_tsvector('portuguese', translate(lower(coalesce(subgrupo, '')), 'áàâãäéèêëíìîïóòôõöúùûüýÿçñ', 'aaaaaeeeeiiiiooooouuuuyycn')), 'B')
+                || setweight(to_tsvector('portuguese', translate(lower(coalesce(grupo, '')), 'áàâãäéèêëíìîïóòôõöúùûüýÿçñ', 'aaaaaeeeeiiiiooooouuuuyycn')), 'C')
+                || setweight(to_tsvector('portuguese', translate(lower(coalesce(capitulo, '')), 'áàâãäéèêëíìîïóòôõöúùûüýÿçñ', 'aaaaaeeeeiiiiooooouuuuyycn')), 'D')
+            ) STORED;
+
+        CREATE INDEX IF NOT EXISTS idx_rol_procedimentos_busca
+            ON rol_procedimentos USING gin (busca);
+    END IF;
+END;
+$$;
@@ -1,5 +1,8 @@
 import uvicorn
 import os
+import argparse
+import glob
+import tempfile
 from dotenv import load_dotenv
 import multiprocessing
 
@@ -11,14 +14,131 @@ host = os.getenv("API_HOST", "0.0.0.0")
 port = int(os.getenv("API_PORT", "8000"))
 reload = os.getenv("DEBUG", "True").lower() == "true"
 
+# Conexões deixadas livres no Postgres para o ETL, migrações e administração
+CONEXOES_RESERVADAS = int(os.getenv("DB_CONEXOES_RESERVADAS", "10"))
+
+
+def max_conexoes_banco(db_config):
+    """max_connections do Postgres (DB_MAX_CONEXOES sobrepõe a consulta ao banco)"""
+    if os.getenv("DB_MAX_CONEXOES"):
+        return int(os.getenv("DB_MAX_CONEXOES"))
+    import psycopg
+    try:
+        with psycopg.connect(**db_config, connect_timeout=5) as conn:
+            return int(conn.execute("SHOW max_connections").fetchone()[0])
+    except psycopg.Error as e:
+        print(f"Não foi possível consultar max_connections ({e}); mantendo DB_POOL_MAX")
+        return None
+
+
+def dimensionar_pool(workers):
+    """
+    Ajusta POOL_CONFIG para que workers * DB_POOL_MAX fique abaixo de
+    max_connections - DB_CONEXOES_RESERVADAS. Precisa rodar antes de carregar main.
+    """
+    from config import DB_CONFIG, POOL_CONFIG
+
+    limite = max_conexoes_banco(DB_CONFIG)
+    if limite is not None:
+        por_worker = max(1, (limite - CONEXOES_RESERVADAS) // workers)
+        if POOL_CONFIG['max_size'] > por_worker:
+            print(
+                f"DB_POOL_MAX reduzido de {POOL_CONFIG['max_size']} para {por_worker} por worker "
+                f"(max_connections={limite}, {workers} workers, {CONEXOES_RESERVADAS} reservadas)"
+            )
+            POOL_CONFIG['max_size'] = por_worker
+    POOL_CONFIG['min_size'] = min(POOL_CONFIG['min_size'], POOL_CONFIG['max_size'])
+    return POOL_CONFIG
+
+
+def preparar_metricas_multiprocesso():
+    """
+    Diretório dos arquivos de métricas compartilhados pelos workers
+    (PROMETHEUS_MULTIPROC_DIR). Precisa ser definido antes de o
+    prometheus_client ser importado e começar vazio a cada subida.
+    """
+    diretorio = os.environ.get("PROMETHEUS_MULTIPROC_DIR") or os.path.join(
+        tempfile.gettempdir(), f"api_metricas_{port}"
+    )
+    os.makedirs(diretorio, exist_ok=True)
+    for arquivo in glob.glob(os.path.join(diretorio, "*.db")):
+        os.remove(arquivo)
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = diretorio
+    return diretorio
+
+
+def worker_encerrado(server, worker):
+    """Hook child_exit do gunicorn: descarta as métricas de gauge do worker que saiu"""
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
+
+
+def iniciar_producao(workers):
+    """
+    Gunicorn com N workers uvicorn. A aplicação é carregada no processo mestre
+    (preload) e herdada pelos workers; o pool de conexões de cada worker é aberto
+    no lifespan, depois do fork. SIGHUP troca os workers sem derrubar conexões
+    em andamento.
+    """
+    from gunicorn.app.base import BaseApplication
+
+    class ServidorProducao(BaseApplication):
+        def __init__(self, opcoes):
+            self.opcoes = opcoes
+            super().__init__()
+
+        def load_config(self):
+            for chave, valor in self.opcoes.items():
+                self.cfg.set(chave, valor)
+
+        def load(self):
+            from main import app
+            return app
+
+    # Lido por config.API_WORKERS e exibido na rota /
+    os.environ["API_WORKERS"] = str(workers)
+    pool = dimensionar_pool(workers)
+    preparar_metricas_multiprocesso()
+
+    print(f"Iniciando servidor em http://{host}:{port} com {workers} workers (pool de até {pool['max_size']} conexões cada)")
+    print("Envie SIGHUP ao processo mestre para reiniciar os workers; CTRL+C para parar")
+
+    ServidorProducao({
+        "bind": f"{host}:{port}",
+        "workers": workers,
+        "worker_class": "uvicorn.workers.UvicornWorker",
+        "preload_app": True,
+        "graceful_timeout": int(os.getenv("API_GRACEFUL_TIMEOUT", "30")),
+        "timeout": int(os.getenv("API_TIMEOUT", "60")),
+        "keepalive": int(os.getenv("API_KEEPALIVE", "5")),
+        "child_exit": worker_encerrado,
+    }).run()
+
+
 if __name__ == "__main__":
-    print(f"Iniciando servidor em http://{host}:{port}")
-    print("Pressione CTRL+C para parar o servidor")
-    
-    # Inicia o servidor
-    uvicorn.run(
-        "main:app",
-        host=host,
-        port=port,
-        reload=reload
-    ) 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Inicia a API de operadoras")
+    parser.add_argument(
+        "--producao", action="store_true",
+        default=os.getenv("API_PRODUCAO", "False").lower() == "true",
+        help="vários workers (gunicorn + uvicorn), sem reload"
+    )
+    parser.add_argument(
+        "--workers", type=int,
+        default=int(os.getenv("API_WORKERS") or multiprocessing.cpu_count()),
+        help="número de workers no modo produção (padrão: número de CPUs)"
+    )
+    args = parser.parse_args()
+
+    if args.producao:
+        iniciar_producao(args.workers)
+    else:
+        print(f"Iniciando servidor em http://{host}:{port}")
+        print("Pressione CTRL+C para parar o servidor")
+
+        # Inicia o servidor
+        uvicorn.run(
+            "main:app",
+            host=host,
+            port=port,
+            reload=reload
+        )
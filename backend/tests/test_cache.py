@@ -0,0 +1,105 @@
+"""
+Cache de respostas: despejo LRU, expiração pelo TTL, chave com os parâmetros
+normalizados e a versão dos dados, e invalidação quando a versão muda.
+"""
+import asyncio
+
+import pytest
+
+import cache
+from cache import CacheRespostas, em_cache, invalidar_cache
+
+
+class Relogio:
+    def __init__(self):
+        self.agora = 1000.0
+
+    def __call__(self):
+        return self.agora
+
+
+@pytest.fixture
+def relogio(monkeypatch):
+    relogio = Relogio()
+    monkeypatch.setattr(cache.time, 'monotonic', relogio)
+    return relogio
+
+
+def test_lru_despeja_o_menos_usado():
+    respostas = CacheRespostas(max_itens=2, ttl=60)
+    respostas.guardar('a', 1)
+    respostas.guardar('b', 2)
+    assert respostas.obter('a') == (True, 1)
+    respostas.guardar('c', 3)
+
+    assert respostas.obter('b') == (False, None)
+    assert respostas.obter('a') == (True, 1)
+    assert respostas.obter('c') == (True, 3)
+    assert respostas.estatisticas() == {
+        'itens': 2,
+        'max_itens': 2,
+        'acertos': 3,
+        'falhas': 1,
+        'remocoes': 1,
+        'taxa_acerto': 0.75,
+    }
+
+
+def test_ttl_expira_o_item(relogio):
+    respostas = CacheRespostas(max_itens=10, ttl=60)
+    respostas.guardar('a', 1)
+    relogio.agora += 59
+    assert respostas.obter('a') == (True, 1)
+    relogio.agora += 1
+    assert respostas.obter('a') == (False, None)
+    assert respostas.estatisticas()['itens'] == 0
+
+
+def test_guardar_de_novo_renova_a_validade(relogio):
+    respostas = CacheRespostas(max_itens=10, ttl=60)
+    respostas.guardar('a', 1)
+    relogio.agora += 50
+    respostas.guardar('a', 2)
+    relogio.agora += 50
+    assert respostas.obter('a') == (True, 2)
+
+
+def test_estatisticas_sem_consultas():
+    assert CacheRespostas(max_itens=1, ttl=1).estatisticas()['taxa_acerto'] == 0.0
+
+
+@pytest.fixture
+def cache_vazio(monkeypatch):
+    respostas = CacheRespostas(max_itens=10, ttl=60)
+    versao = {'versao': 1, 'concluida_em': None}
+    monkeypatch.setattr(cache, 'cache_respostas', respostas)
+    monkeypatch.setattr(cache, 'versao_atual', lambda: versao)
+    return versao
+
+
+def test_em_cache_chave_por_parametros_e_versao(cache_vazio):
+    chamadas = []
+
+    @em_cache
+    async def rota(uf=None, limite=10):
+        chamadas.append((uf, limite))
+        return {'uf': uf, 'limite': limite, 'chamada': len(chamadas)}
+
+    async def cenario():
+        primeira = await rota(uf='SP', limite=10)
+        # Espaços nas pontas e a ordem dos argumentos não mudam a chave
+        assert await rota(limite=10, uf=' SP ') is primeira
+        assert (await rota(uf='RJ', limite=10))['chamada'] == 2
+
+        cache_vazio['versao'] = 2
+        assert (await rota(uf='SP', limite=10))['chamada'] == 3
+
+    asyncio.run(cenario())
+    assert chamadas == [('SP', 10), ('RJ', 10), ('SP', 10)]
+    assert rota.__name__ == 'rota'
+
+
+def test_invalidar_cache_esvazia(cache_vazio):
+    cache.cache_respostas.guardar('a', 1)
+    asyncio.run(invalidar_cache({'versao': 2, 'concluida_em': None}))
+    assert cache.cache_respostas.obter('a') == (False, None)
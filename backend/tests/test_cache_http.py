@@ -0,0 +1,152 @@
+"""
+Requisições condicionais: ETag fraco derivado da versão dos dados, comparação
+do If-None-Match e do If-Modified-Since, e 304 só para respostas 2xx.
+"""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from starlette.applications import Starlette
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+import cache_http
+from cache_http import (
+    _etag_confere,
+    _nao_modificado_desde,
+    gerar_etag,
+    politica_cache,
+    requisicao_condicional,
+)
+
+CONCLUIDA_EM = datetime(2024, 5, 10, 12, 30, 15, 123456, tzinfo=timezone.utc)
+
+
+def test_politica_cache_por_prefixo():
+    assert politica_cache('/operadoras') == cache_http.CACHE_CONTROL['/operadoras']
+    assert politica_cache('/operadoras/123/despesas') == cache_http.CACHE_CONTROL['/operadoras']
+    assert politica_cache('/operadoras-ativas') == cache_http.CACHE_CONTROL['/operadoras-ativas']
+    assert politica_cache('/operadorasx') is None
+    assert politica_cache('/health') is None
+
+
+def test_etag_fraco_por_versao_e_url():
+    etag = gerar_etag(3, '/operadoras', 'uf=SP')
+    assert etag.startswith('W/"v3-') and etag.endswith('"')
+    assert gerar_etag(3, '/operadoras', 'uf=SP') == etag
+    assert gerar_etag(4, '/operadoras', 'uf=SP') != etag
+    assert gerar_etag(3, '/operadoras', 'uf=RJ') != etag
+
+
+@pytest.mark.parametrize('if_none_match, confere', [
+    ('W/"v3-abc"', True),
+    ('"v3-abc"', True),
+    ('"v2-abc", W/"v3-abc"', True),
+    (' * ', True),
+    ('W/"v2-abc"', False),
+    ('v3-abc', False),
+    ('', False),
+])
+def test_etag_confere_com_comparacao_fraca(if_none_match, confere):
+    assert _etag_confere(if_none_match, 'W/"v3-abc"') is confere
+
+
+@pytest.mark.parametrize('if_modified_since, nao_modificado', [
+    ('Fri, 10 May 2024 12:30:15 GMT', True),
+    ('Fri, 10 May 2024 12:30:16 GMT', True),
+    ('Fri, 10 May 2024 12:30:14 GMT', False),
+    ('Fri, 10 May 2024 12:30:15', True),
+    ('ontem', False),
+    ('', False),
+])
+def test_nao_modificado_desde(if_modified_since, nao_modificado):
+    assert _nao_modificado_desde(if_modified_since, CONCLUIDA_EM) is nao_modificado
+
+
+async def listar(request):
+    if request.query_params.get('uf') == 'XX':
+        return JSONResponse({'detail': 'UF inválida'}, status_code=422)
+    return JSONResponse({'uf': request.query_params.get('uf')})
+
+
+@pytest.fixture
+def versao(monkeypatch):
+    versao = {'versao': 3, 'concluida_em': CONCLUIDA_EM}
+    monkeypatch.setattr(cache_http, 'versao_atual', lambda: versao)
+    return versao
+
+
+@pytest.fixture
+def cliente(versao):
+    app = Starlette(routes=[Route('/operadoras', listar), Route('/health', listar)])
+    app.add_middleware(BaseHTTPMiddleware, dispatch=requisicao_condicional)
+    return TestClient(app)
+
+
+def test_200_com_cabecalhos_de_cache(cliente):
+    resposta = cliente.get('/operadoras', params={'uf': 'SP'})
+    assert resposta.status_code == 200
+    assert resposta.headers['etag'] == gerar_etag(3, '/operadoras', 'uf=SP')
+    assert resposta.headers['cache-control'] == politica_cache('/operadoras')
+    assert resposta.headers['last-modified'] == 'Fri, 10 May 2024 12:30:15 GMT'
+    assert resposta.headers['vary'] == 'Accept-Encoding'
+
+
+def test_304_com_o_mesmo_etag(cliente):
+    etag = cliente.get('/operadoras', params={'uf': 'SP'}).headers['etag']
+    resposta = cliente.get('/operadoras', params={'uf': 'SP'}, headers={'If-None-Match': etag})
+    assert resposta.status_code == 304
+    assert resposta.content == b''
+    assert resposta.headers['etag'] == etag
+
+    # Cliente que removeu o W/ continua recebendo 304
+    resposta = cliente.get('/operadoras', params={'uf': 'SP'}, headers={'If-None-Match': etag[2:]})
+    assert resposta.status_code == 304
+
+
+def test_nova_versao_invalida_o_etag(cliente, versao):
+    etag = cliente.get('/operadoras').headers['etag']
+    versao['versao'] = 4
+    resposta = cliente.get('/operadoras', headers={'If-None-Match': etag})
+    assert resposta.status_code == 200
+    assert resposta.headers['etag'] != etag
+
+
+def test_if_none_match_tem_precedencia(cliente):
+    resposta = cliente.get('/operadoras', headers={
+        'If-None-Match': 'W/"outro"',
+        'If-Modified-Since': 'Fri, 10 May 2024 12:30:15 GMT',
+    })
+    assert resposta.status_code == 200
+
+    resposta = cliente.get('/operadoras', headers={'If-Modified-Since': 'Fri, 10 May 2024 12:30:15 GMT'})
+    assert resposta.status_code == 304
+
+
+def test_erro_da_rota_nao_vira_304(cliente):
+    etag = gerar_etag(3, '/operadoras', 'uf=XX')
+    resposta = cliente.get('/operadoras', params={'uf': 'XX'}, headers={'If-None-Match': etag})
+    assert resposta.status_code == 422
+    assert 'etag' not in resposta.headers
+
+    resposta = cliente.get('/operadoras/nao-existe', headers={'If-None-Match': '*'})
+    assert resposta.status_code == 404
+
+
+def test_sem_politica_ou_sem_carga_passa_direto(cliente, versao):
+    assert 'etag' not in cliente.get('/health').headers
+
+    versao['versao'] = 0
+    resposta = cliente.get('/operadoras', headers={'If-None-Match': '*'})
+    assert resposta.status_code == 200
+    assert 'etag' not in resposta.headers
+
+
+def test_sem_data_da_carga_nao_envia_last_modified(cliente, versao):
+    versao['concluida_em'] = None
+    resposta = cliente.get('/operadoras', headers={
+        'If-Modified-Since': (CONCLUIDA_EM + timedelta(days=1)).strftime('%a, %d %b %Y %H:%M:%S GMT'),
+    })
+    assert resposta.status_code == 200
+    assert 'last-modified' not in resposta.headers
@@ -0,0 +1,133 @@
+"""
+Catálogo de operadoras em memória: buscas por chave, busca textual sem acento
+ordenada pela similaridade (como o pg_trgm) e facetas com os filtros cruzados.
+"""
+import pytest
+
+from catalogo import CatalogoOperadoras, chave_nome, similaridade
+
+
+def operadora(registro_ans, nome_fantasia, razao_social, cidade, uf, modalidade, ativa=True, cnpj=None):
+    return {
+        'registro_ans': registro_ans,
+        'cnpj': cnpj or registro_ans.rjust(14, '0'),
+        'razao_social': razao_social,
+        'nome_fantasia': nome_fantasia,
+        'modalidade': modalidade,
+        'cidade': cidade,
+        'uf': uf,
+        'is_ativa': ativa,
+    }
+
+
+LINHAS = [
+    operadora('1', 'Unimed Campinas', 'UNIMED CAMPINAS COOPERATIVA', 'Campinas', 'SP', 'Cooperativa Médica'),
+    operadora('2', 'Unimed São Paulo', 'UNIMED SAO PAULO', 'São Paulo', 'sp ', 'Cooperativa Médica'),
+    operadora('3', 'Bradesco Saúde', 'BRADESCO SAUDE S.A.', 'Rio de Janeiro', 'RJ', 'Seguradora', ativa=False),
+    operadora('4', 'Amil', 'AMIL ASSISTENCIA MEDICA', 'São Paulo', 'SP', 'Medicina de Grupo'),
+    operadora('5', 'Odonto Sul', 'ODONTO SUL LTDA', 'Porto Alegre', 'RS', 'Odontologia de Grupo'),
+]
+
+
+@pytest.fixture
+def catalogo():
+    return CatalogoOperadoras(LINHAS, versao=7)
+
+
+def test_similaridade_como_pg_trgm():
+    assert similaridade('unimed', 'unimed') == 1.0
+    assert similaridade('unimed', 'bradesco') == 0.0
+    assert similaridade('', 'unimed') == 0.0
+    # {"  u", " un", "uni", "nim", "ime", "med", "ed "} contra {"  u", " un", "uni", "ni "}
+    assert similaridade('unimed', 'uni') == pytest.approx(3 / 8)
+
+
+def test_buscas_por_chave(catalogo):
+    assert len(catalogo) == 5
+    assert catalogo.versao == 7
+    assert catalogo.buscar_cnpj('00000000000003')['nome_fantasia'] == 'Bradesco Saúde'
+    assert catalogo.buscar_registro_ans('4')['nome_fantasia'] == 'Amil'
+    assert catalogo.buscar_cnpj('99999999999999') is None
+
+
+def test_primeira_ocorrencia_do_cnpj_prevalece():
+    repetida = operadora('9', 'Outra', 'OUTRA', 'Campinas', 'SP', 'Seguradora', cnpj='00000000000001')
+    catalogo = CatalogoOperadoras(LINHAS + [repetida])
+    assert catalogo.buscar_cnpj('00000000000001')['registro_ans'] == '1'
+
+
+def test_buscar_uf_normaliza_e_pagina(catalogo):
+    nomes = [linha['nome_fantasia'] for linha in catalogo.buscar_uf(' sp')]
+    assert nomes == ['Amil', 'Unimed Campinas', 'Unimed São Paulo']
+
+    primeira = catalogo.buscar_uf('SP', limite=2)
+    resto = catalogo.buscar_uf('SP', apos=chave_nome(primeira[-1]))
+    assert [linha['registro_ans'] for linha in primeira + resto] == ['4', '1', '2']
+    assert catalogo.buscar_uf('AM') == []
+
+
+def test_buscar_texto_ignora_acento_e_caixa(catalogo):
+    nomes = [linha['nome_fantasia'] for linha in catalogo.buscar_texto('cidade', 'SAO PAULO')]
+    assert nomes == ['Amil', 'Unimed São Paulo']
+    assert [linha['registro_ans'] for linha in catalogo.buscar_texto('nome_fantasia', 'saúde')] == ['3']
+    # Termos curtos não têm trigramas: varredura simples
+    assert [linha['registro_ans'] for linha in catalogo.buscar_texto('razao_social', 'sa')] == ['2', '3']
+    assert catalogo.buscar_texto('nome_fantasia', 'hapvida') == []
+
+
+def test_buscar_texto_ordena_pela_similaridade(catalogo):
+    linhas = catalogo.buscar_texto('razao_social', 'unimed campinas')
+    assert [linha['registro_ans'] for linha in linhas] == ['1']
+
+    linhas = catalogo.buscar_texto('nome_fantasia', 'unimed')
+    # Mesma relevância: desempata por nome_fantasia e registro ANS
+    assert [linha['registro_ans'] for linha in linhas] == ['1', '2']
+
+    linhas = catalogo.buscar_texto('razao_social', 'unimed sao')
+    assert [linha['registro_ans'] for linha in linhas] == ['2']
+
+
+def test_buscar_texto_pagina_pela_chave(catalogo):
+    chave = CatalogoOperadoras.chave_texto('cidade', 'paulo')
+    todas = catalogo.buscar_texto('cidade', 'paulo')
+    primeira = catalogo.buscar_texto('cidade', 'paulo', limite=1)
+    resto = catalogo.buscar_texto('cidade', 'paulo', apos=chave(primeira[-1]))
+    assert primeira + resto == todas
+    assert len(todas) == 2
+
+
+def test_facetas_sem_filtro(catalogo):
+    resultado = catalogo.facetas()
+    assert resultado['total'] == 5
+    assert resultado['facetas']['uf'] == [
+        {'valor': 'SP', 'total': 3},
+        {'valor': 'RJ', 'total': 1},
+        {'valor': 'RS', 'total': 1},
+    ]
+    assert resultado['facetas']['cidade'][0] == {'valor': 'São Paulo', 'total': 2}
+
+
+def test_facetas_ignoram_o_proprio_filtro(catalogo):
+    resultado = catalogo.facetas(uf='sp', modalidade='Cooperativa Médica')
+    assert resultado['total'] == 2
+    # A faceta de UF aplica só o filtro de modalidade, e vice-versa
+    assert resultado['facetas']['uf'] == [{'valor': 'SP', 'total': 2}]
+    assert resultado['facetas']['modalidade'] == [
+        {'valor': 'Cooperativa Médica', 'total': 2},
+        {'valor': 'Medicina de Grupo', 'total': 1},
+    ]
+    assert resultado['facetas']['cidade'] == [
+        {'valor': 'Campinas', 'total': 1},
+        {'valor': 'São Paulo', 'total': 1},
+    ]
+
+
+def test_facetas_por_cidade_e_situacao(catalogo):
+    resultado = catalogo.facetas(cidade='sao paulo', ativa=True)
+    assert resultado['total'] == 2
+
+    resultado = catalogo.facetas(ativa=False)
+    assert resultado['total'] == 1
+    assert resultado['facetas']['uf'] == [{'valor': 'RJ', 'total': 1}]
+
+    assert catalogo.facetas(limite=1)['facetas']['uf'] == [{'valor': 'SP', 'total': 3}]
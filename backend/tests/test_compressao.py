@@ -0,0 +1,111 @@
+"""
+Compressão negociada: escolha entre br e gzip pelo Accept-Encoding e o
+middleware ASGI com respostas completas, pequenas, binárias e em streaming.
+"""
+import gzip
+import json
+
+import brotli
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from compressao import Compressao, escolher_codificacao
+
+MINIMO = 256
+DADOS = [{'registro_ans': str(i), 'nome_fantasia': f'Operadora {i}'} for i in range(100)]
+
+
+@pytest.mark.parametrize('accept_encoding, codificacao', [
+    ('gzip, deflate, br', 'br'),
+    ('gzip', 'gzip'),
+    ('GZIP;q=0.5', 'gzip'),
+    ('br;q=0, gzip', 'gzip'),
+    ('br;q=0, gzip;q=0', None),
+    ('*', 'br'),
+    ('*;q=0, gzip', 'gzip'),
+    ('gzip;q=abc', None),
+    ('identity', None),
+    ('', None),
+])
+def test_escolher_codificacao(accept_encoding, codificacao):
+    assert escolher_codificacao(accept_encoding) == codificacao
+
+
+async def json_grande(request):
+    return JSONResponse(DADOS)
+
+
+async def json_pequeno(request):
+    return JSONResponse({'status': 'ok'})
+
+
+async def binario(request):
+    return Response(b'\x00' * 4096, media_type='application/octet-stream')
+
+
+async def ndjson(request):
+    async def linhas():
+        for item in DADOS:
+            yield json.dumps(item) + '\n'
+    return StreamingResponse(linhas(), media_type='application/x-ndjson')
+
+
+@pytest.fixture
+def cliente():
+    app = Starlette(routes=[
+        Route('/grande', json_grande),
+        Route('/pequeno', json_pequeno),
+        Route('/binario', binario),
+        Route('/ndjson', ndjson),
+    ])
+    app.add_middleware(Compressao, minimo=MINIMO)
+    return TestClient(app)
+
+
+def corpo_bruto(cliente, caminho, accept_encoding):
+    """Corpo como saiu do servidor, sem a descompressão automática do httpx"""
+    with cliente.stream('GET', caminho, headers={'Accept-Encoding': accept_encoding}) as resposta:
+        return resposta, b''.join(resposta.iter_raw())
+
+
+@pytest.mark.parametrize('accept_encoding, descomprimir', [
+    ('br', brotli.decompress),
+    ('gzip', gzip.decompress),
+])
+def test_json_grande_comprimido(cliente, accept_encoding, descomprimir):
+    resposta, corpo = corpo_bruto(cliente, '/grande', accept_encoding)
+    assert resposta.headers['content-encoding'] == accept_encoding
+    assert resposta.headers['vary'] == 'Accept-Encoding'
+    assert int(resposta.headers['content-length']) == len(corpo)
+    assert json.loads(descomprimir(corpo)) == DADOS
+
+
+def test_sem_accept_encoding_nao_comprime(cliente):
+    resposta, corpo = corpo_bruto(cliente, '/grande', 'identity')
+    assert 'content-encoding' not in resposta.headers
+    assert json.loads(corpo) == DADOS
+
+
+def test_abaixo_do_minimo_ou_binario_passa_direto(cliente):
+    resposta, corpo = corpo_bruto(cliente, '/pequeno', 'br')
+    assert 'content-encoding' not in resposta.headers
+    assert json.loads(corpo) == {'status': 'ok'}
+
+    resposta, corpo = corpo_bruto(cliente, '/binario', 'gzip')
+    assert 'content-encoding' not in resposta.headers
+    assert corpo == b'\x00' * 4096
+
+
+@pytest.mark.parametrize('accept_encoding, descomprimir', [
+    ('br', brotli.decompress),
+    ('gzip', gzip.decompress),
+])
+def test_streaming_comprimido_sem_content_length(cliente, accept_encoding, descomprimir):
+    resposta, corpo = corpo_bruto(cliente, '/ndjson', accept_encoding)
+    assert resposta.headers['content-encoding'] == accept_encoding
+    assert 'content-length' not in resposta.headers
+    linhas = descomprimir(corpo).decode('utf-8').splitlines()
+    assert [json.loads(linha) for linha in linhas] == DADOS
@@ -0,0 +1,24 @@
+"""Vagas de exportação simultânea: reserva sem espera e liberação idempotente"""
+from exportacao import LimiteExportacoes
+
+
+def test_reserva_ate_o_limite_sem_esperar():
+    limite = LimiteExportacoes(2)
+    primeira = limite.reservar()
+    segunda = limite.reservar()
+    assert primeira is not None and segunda is not None
+    assert limite.reservar() is None
+
+    primeira.liberar()
+    assert limite.em_uso == 1
+    assert limite.reservar() is not None
+
+
+def test_liberar_mais_de_uma_vez_libera_uma_vaga():
+    limite = LimiteExportacoes(1)
+    vaga = limite.reservar()
+    vaga.liberar()
+    vaga.liberar()
+    assert limite.em_uso == 0
+    assert limite.reservar() is not None
+    assert limite.reservar() is None
@@ -0,0 +1,52 @@
+"""
+normalize_text() do banco (translate em sql/*.sql) e catalogo.normalize_text
+devem normalizar igual: as buscas usam um ou outro conforme o catálogo em
+memória esteja carregado.
+"""
+import glob
+import os
+import re
+
+import pytest
+
+from catalogo import normalize_text
+
+SQL_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'sql')
+
+# translate(<expr>, 'origem', 'destino') nas migrações
+PADRAO_TRANSLATE = re.compile(r"translate\(.*?,\s*'([^']+)',\s*'([^']+)'\s*\)", re.DOTALL)
+
+
+def mapas_sql():
+    mapas = []
+    for caminho in sorted(glob.glob(os.path.join(SQL_DIR, '*.sql'))):
+        with open(caminho, encoding='utf-8') as f:
+            for origem, destino in PADRAO_TRANSLATE.findall(f.read()):
+                mapas.append(pytest.param(origem, destino, id=os.path.basename(caminho)))
+    return mapas
+
+
+def normalizar_como_sql(texto, origem, destino):
+    """translate(lower(texto), origem, destino) do Postgres"""
+    return texto.lower().translate(str.maketrans(origem, destino))
+
+
+def test_ha_mapas_nas_migracoes():
+    assert any(param.id == '001_normalize_text.sql' for param in mapas_sql())
+
+
+@pytest.mark.parametrize('origem, destino', mapas_sql())
+def test_mapa_sql_igual_ao_catalogo(origem, destino):
+    assert len(origem) == len(destino)
+    for letra in origem + origem.upper():
+        assert normalizar_como_sql(letra, origem, destino) == normalize_text(letra), letra
+
+
+@pytest.mark.parametrize('texto, esperado', [
+    ('São Paulo', 'sao paulo'),
+    ('GOIÂNIA', 'goiania'),
+    ('Assistência Médica Ñandú Ltda', 'assistencia medica nandu ltda'),
+    ('Pöhl & Çia', 'pohl & cia'),
+])
+def test_normalize_text(texto, esperado):
+    assert normalize_text(texto) == esperado
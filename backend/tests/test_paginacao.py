@@ -0,0 +1,56 @@
+"""
+Cursor opaco da paginação por chave: ida e volta e rejeição (400) de cursores
+malformados ou com valores do tipo errado, antes de chegarem às consultas.
+"""
+from datetime import date
+
+import pytest
+from fastapi import HTTPException
+
+from paginacao import codificar_cursor, decodificar_cursor, montar_pagina
+
+
+def test_ida_e_volta_converte_os_tipos():
+    cursor = codificar_cursor([0.25, 'Unimed', '123456'])
+    assert decodificar_cursor(cursor, (float, str, str)) == [0.25, 'Unimed', '123456']
+
+    cursor = codificar_cursor([date(2024, 3, 31), 42])
+    assert decodificar_cursor(cursor, (date, int)) == [date(2024, 3, 31), 42]
+
+
+def test_relevancia_inteira_vira_float():
+    assert decodificar_cursor(codificar_cursor([1, '', '1']), (float, str, str)) == [1.0, '', '1']
+
+
+def test_sem_cursor():
+    assert decodificar_cursor(None, (int,)) is None
+    assert decodificar_cursor('', (int,)) is None
+
+
+@pytest.mark.parametrize('cursor, tipos', [
+    ('WyJhIiwiYiIsImMiXQ', (float, str, str)),     # ["a","b","c"]
+    (codificar_cursor([0.5, 'a']), (float, str, str)),
+    (codificar_cursor({'a': 1}), (int,)),
+    (codificar_cursor([True, 1]), (date, int)),
+    (codificar_cursor(['31/03/2024', 1]), (date, int)),
+    (codificar_cursor(['2024-03-31', '1']), (date, int)),
+    (codificar_cursor([1.5]), (int,)),
+    (codificar_cursor([None, 'a', 'b']), (float, str, str)),
+    ('não-é-base64', (int,)),
+    ('e30', (int,)),                                # {}
+])
+def test_cursor_invalido_responde_400(cursor, tipos):
+    with pytest.raises(HTTPException) as erro:
+        decodificar_cursor(cursor, tipos)
+    assert erro.value.status_code == 400
+    assert erro.value.detail == "Cursor inválido"
+
+
+def test_montar_pagina_usa_linha_excedente_como_indicador():
+    linhas = [{'id': i, '_aux': i} for i in range(4)]
+    pagina = montar_pagina(linhas, 3, lambda linha: [linha['id']], ocultar=('_aux',))
+    assert pagina['items'] == [{'id': 0}, {'id': 1}, {'id': 2}]
+    assert decodificar_cursor(pagina['next_cursor'], (int,)) == [2]
+
+    ultima = montar_pagina(linhas[:2], 3, lambda linha: [linha['id']])
+    assert ultima['next_cursor'] is None
@@ -0,0 +1,99 @@
+"""
+Paginação por cursor das buscas textuais no banco (caminho sem catálogo) com
+empates de similaridade: todas as linhas devem sair uma única vez.
+
+Usa o banco configurado em DB_* e precisa de similarity() (pg_trgm) e
+normalize_text(); sem eles o teste é ignorado. Os dados ficam em tabelas
+temporárias com o nome das reais, desfeitas no rollback.
+"""
+import psycopg
+import pytest
+from psycopg.rows import dict_row
+
+from config import DB_CONFIG
+from paginacao import decodificar_cursor, montar_pagina
+from repositorio import ORDEM_TEXTO, QUERIES_ATIVAS_POR_CIDADE, QUERIES_TEXTO, _parametros_texto
+
+LIMITE = 4
+
+
+@pytest.fixture
+def conexao():
+    try:
+        conn = psycopg.connect(**DB_CONFIG, connect_timeout=3, row_factory=dict_row)
+    except psycopg.OperationalError as e:
+        pytest.skip(f"Banco indisponível: {e}")
+    with conn:
+        funcoes = conn.execute(
+            "SELECT to_regproc('similarity') IS NOT NULL AND to_regproc('normalize_text') IS NOT NULL as ok"
+        ).fetchone()
+        if not funcoes['ok']:
+            pytest.skip("similarity() ou normalize_text() não disponível no banco")
+
+        # Tabelas temporárias encobrem as reais (pg_temp vem antes no search_path)
+        conn.execute("""
+            CREATE TEMP TABLE operadoras_ativas (
+                registro_ans TEXT, cnpj TEXT, razao_social TEXT, nome_fantasia TEXT,
+                modalidade TEXT, logradouro TEXT, numero TEXT, complemento TEXT,
+                bairro TEXT, cidade TEXT, uf TEXT, cep TEXT, telefone TEXT,
+                email TEXT, representante TEXT, data_registro_ans DATE,
+                cidade_norm TEXT
+            )
+        """)
+        conn.execute("""
+            CREATE TEMP TABLE operadoras (
+                registro_ans TEXT, cnpj TEXT, razao_social TEXT, nome_fantasia TEXT,
+                modalidade TEXT, logradouro TEXT, numero TEXT, complemento TEXT,
+                bairro TEXT, cidade TEXT, uf TEXT, cep TEXT,
+                razao_social_norm TEXT, nome_fantasia_norm TEXT, cidade_norm TEXT
+            )
+        """)
+        # Várias operadoras por cidade: similaridades empatadas dentro de cada cidade
+        cidades = ['São Paulo'] * 11 + ['São Paulo de Olivença'] * 5 + ['Paulo Afonso'] * 3
+        for i, cidade in enumerate(cidades):
+            valores = {'registro': f"{900000 + i}", 'nome': f"Operadora {i % 3}", 'cidade': cidade}
+            for tabela in ('operadoras', 'operadoras_ativas'):
+                conn.execute(f"""
+                    INSERT INTO {tabela} (registro_ans, nome_fantasia, razao_social, cidade, cidade_norm)
+                    VALUES (%(registro)s, %(nome)s, %(nome)s, %(cidade)s, normalize_text(%(cidade)s))
+                """, valores)
+        conn.execute("""
+            UPDATE operadoras SET
+                nome_fantasia_norm = normalize_text(nome_fantasia),
+                razao_social_norm = normalize_text(razao_social)
+        """)
+        yield conn
+        conn.rollback()
+
+
+def paginar(conn, queries, termo, ordem):
+    """Percorre as páginas como a rota: limite + 1 linhas e cursor codificado/decodificado"""
+    vistos = []
+    apos = None
+    for _ in range(50):
+        linhas = conn.execute(queries(apos is not None), _parametros_texto(termo, apos, LIMITE + 1)).fetchall()
+        pagina = montar_pagina(
+            linhas, LIMITE,
+            lambda linha: [linha['_relevancia'], linha[ordem] or '', linha['registro_ans']],
+            ocultar=('_relevancia',)
+        )
+        vistos.extend(linha['registro_ans'] for linha in pagina['items'])
+        if pagina['next_cursor'] is None:
+            return vistos
+        apos = decodificar_cursor(pagina['next_cursor'], (float, str, str))
+    pytest.fail("Paginação não terminou: o cursor se repete")
+
+
+def test_ativas_por_cidade_com_empates(conexao):
+    vistos = paginar(conexao, lambda com_cursor: QUERIES_ATIVAS_POR_CIDADE[com_cursor], 'paulo', 'nome_fantasia')
+    assert sorted(vistos) == [f"{900000 + i}" for i in range(19)]
+
+
+@pytest.mark.parametrize('coluna, termo', [
+    ('cidade', 'paulo'),
+    ('nome_fantasia', 'operadora'),
+    ('razao_social', 'operadora'),
+])
+def test_operadoras_por_texto_com_empates(conexao, coluna, termo):
+    vistos = paginar(conexao, lambda com_cursor: QUERIES_TEXTO[(coluna, com_cursor)], termo, ORDEM_TEXTO[coluna])
+    assert sorted(vistos) == [f"{900000 + i}" for i in range(19)]
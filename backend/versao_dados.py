@@ -0,0 +1,96 @@
+"""
+Versão dos dados carregados pelo ETL.
+
+Cada carga concluída pelo ETL é registrada em etl_versao_dados. A API consulta
+essa tabela periodicamente e avisa os interessados (catálogo em memória, cache
+de respostas, etc.) quando a versão muda.
+"""
+import asyncio
+import logging
+
+from config import VERSAO_DADOS_INTERVALO
+from database import buscar_um
+
+logger = logging.getLogger(__name__)
+
+VERSAO_INICIAL = {'versao': 0, 'concluida_em': None}
+
+_versao = None
+_ouvintes = []
+_tarefa = None
+
+
+def versao_atual():
+    """Retorna a última versão conhecida: {'versao': int, 'concluida_em': datetime com fuso}"""
+    return _versao or VERSAO_INICIAL
+
+
+def registrar_ouvinte(ouvinte):
+    """
+    Registra uma corrotina ouvinte(versao) chamada sempre que a versão dos dados
+    muda (e uma vez na subida da API)
+    """
+    _ouvintes.append(ouvinte)
+    return ouvinte
+
+
+async def verificar_versao():
+    """
+    Lê a versão mais recente no banco e notifica os ouvintes se ela mudou.
+    A nova versão só é adotada se todos os ouvintes tiverem sucesso, para que
+    uma falha seja tentada de novo na próxima verificação.
+    """
+    global _versao
+    linha = await buscar_um("""
+        SELECT versao, concluida_em AT TIME ZONE current_setting('TimeZone') as concluida_em
+        FROM etl_versao_dados
+        ORDER BY versao DESC
+        LIMIT 1
+    """)
+    nova = linha or VERSAO_INICIAL
+    if _versao is not None and nova['versao'] == _versao['versao']:
+        return _versao
+
+    logger.info("Versão dos dados: %s", nova['versao'])
+    sucesso = True
+    for ouvinte in _ouvintes:
+        try:
+            await ouvinte(nova)
+        except Exception:
+            sucesso = False
+            logger.exception("Erro ao atualizar %s para a versão %s", ouvinte.__name__, nova['versao'])
+
+    if sucesso:
+        _versao = nova
+    return versao_atual()
+
+
+async def _monitorar():
+    while True:
+        await asyncio.sleep(VERSAO_DADOS_INTERVALO)
+        try:
+            await verificar_versao()
+        except Exception:
+            logger.exception("Erro ao verificar a versão dos dados")
+
+
+async def iniciar_monitoramento():
+    """Faz a primeira verificação e agenda as seguintes em segundo plano"""
+    global _tarefa
+    try:
+        await verificar_versao()
+    except Exception:
+        logger.exception("Erro ao verificar a versão dos dados")
+    _tarefa = asyncio.create_task(_monitorar())
+
+
+async def parar_monitoramento():
+    global _tarefa
+    if _tarefa is None:
+        return
+    _tarefa.cancel()
+    try:
+        await _tarefa
+    except asyncio.CancelledError:
+        pass
+    _tarefa = None